@@ -0,0 +1,285 @@
+# benchmarks/bench.py
+#
+# Run from the repository root:
+#     python -m benchmarks.bench --output bench_results.json
+#     python -m benchmarks.bench --compare old.json new.json
+
+import argparse
+import gc
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from game.dungeon_generation import generate_dungeon
+from game.dungeon_mesh import build_floor_mesh, build_wall_mesh
+from game.maze_generation import ALGORITHMS, generate_maze, spawn_cells, torch_faces
+from game.pathfinding import GridPathfinder, HierarchicalPathfinder, Node, a_star_search
+from game.simulation import Simulation
+from game.tile_grid import PLAYER_START, TileGrid
+
+
+def generated_layout(size, seed):
+    """Generate a size x size maze with a player start, reproducibly."""
+    random.seed(seed)
+    layout, start_x, start_y = generate_dungeon(size, size)
+    layout[start_y][start_x] = PLAYER_START
+    return layout
+
+
+def walkable_cells(grid):
+    return [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y)]
+
+
+def timed(function, repeat=1):
+    """Return (best seconds, result of the last call) over repeat runs."""
+    best = math.inf
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def peak_memory(function):
+    """Return the peak traced allocation in bytes while running function."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_pathfinding(sizes, queries, seed):
+    results = []
+    for size in sizes:
+        layout = generated_layout(size, seed)
+        grid = TileGrid.from_layout(layout)
+        cells = walkable_cells(grid)
+        rng = random.Random(seed)
+        pairs = [(rng.choice(cells), rng.choice(cells)) for _ in range(queries)]
+        pathfinder = GridPathfinder(grid)
+
+        seconds, _ = timed(lambda: [pathfinder.find_path(start, end) for start, end in pairs])
+        results.append({
+            'benchmark': 'pathfinding.grid_a_star',
+            'params': {'size': size, 'queries': queries},
+            'metrics': {'seconds': seconds, 'queries_per_second': queries / seconds},
+        })
+
+        build_seconds, hierarchical = timed(lambda: HierarchicalPathfinder(grid))
+        seconds, _ = timed(lambda: [hierarchical.find_path(start, end) for start, end in pairs])
+        next_seconds, _ = timed(lambda: [hierarchical.next_waypoint(start, end) for start, end in pairs])
+        results.append({
+            'benchmark': 'pathfinding.hierarchical',
+            'params': {'size': size, 'queries': queries, 'cluster_size': hierarchical.cluster_size},
+            'metrics': {
+                'build_seconds': build_seconds,
+                'seconds': seconds,
+                'queries_per_second': queries / seconds,
+                'next_waypoint_seconds': next_seconds,
+            },
+        })
+
+        # The legacy Node grid has to be rebuilt for every query, which is part of its cost
+        legacy_queries = max(queries // 10, 1)
+
+        def legacy():
+            for start, end in pairs[:legacy_queries]:
+                nodes = [[Node(x, y, tile != 0) for x, tile in enumerate(row)] for y, row in enumerate(layout)]
+                a_star_search(nodes, nodes[start[1]][start[0]], nodes[end[1]][end[0]], grid.width, grid.height)
+
+        seconds, _ = timed(legacy)
+        results.append({
+            'benchmark': 'pathfinding.legacy_a_star',
+            'params': {'size': size, 'queries': legacy_queries},
+            'metrics': {'seconds': seconds, 'queries_per_second': legacy_queries / seconds},
+        })
+    return results
+
+
+def bench_generation(sizes, seed):
+    results = []
+    for size in sizes:
+        seconds, _ = timed(lambda: generated_layout(size, seed), repeat=3)
+        results.append({
+            'benchmark': 'dungeon.generate',
+            'params': {'size': size},
+            'metrics': {'seconds': seconds, 'peak_bytes': peak_memory(lambda: generated_layout(size, seed))},
+        })
+        for algorithm in ALGORITHMS:
+            seconds, maze = timed(lambda: generate_maze(size, size, algorithm, seed), repeat=3)
+            post_seconds, _ = timed(lambda: (spawn_cells(maze.tiles), torch_faces(maze.tiles, maze.width, maze.height)))
+            results.append({
+                'benchmark': 'dungeon.generate_maze',
+                'params': {'size': size, 'algorithm': algorithm},
+                'metrics': {'seconds': seconds, 'post_process_seconds': post_seconds},
+            })
+    return results
+
+
+def bench_dungeon_build(sizes, seed):
+    results = []
+    for size in sizes:
+        layout = generated_layout(size, seed)
+
+        def build_meshes():
+            walls = build_wall_mesh(layout, 4, 4)
+            floors = build_floor_mesh(layout, 4, 0.025)
+            return walls.quad_count + floors.quad_count
+
+        seconds, quads = timed(build_meshes, repeat=3)
+        results.append({
+            'benchmark': 'dungeon.merged_mesh_data',
+            'params': {'size': size},
+            'metrics': {'seconds': seconds, 'quads': quads, 'peak_bytes': peak_memory(build_meshes)},
+        })
+        results.append(bench_create_dungeon_entities(layout, size))
+    return results
+
+
+def bench_create_dungeon_entities(layout, size):
+    """Time the ursina scene build; reported as skipped where ursina or an offscreen window is unavailable."""
+    result = {'benchmark': 'dungeon.create_dungeon_entities', 'params': {'size': size}}
+    try:
+        from ursina import Ursina, destroy
+        from game.dungeon_build import create_dungeon_entities
+        if not hasattr(bench_create_dungeon_entities, 'app'):
+            bench_create_dungeon_entities.app = Ursina(window_type='offscreen')
+    except Exception as error:  # ursina missing, or no display/GL context on this machine
+        result['skipped'] = f'{type(error).__name__}: {error}'
+        return result
+
+    layout = [[1 if tile == PLAYER_START else tile for tile in row] for row in layout]
+    metrics = {}
+    for merge_static in (False, True):
+        name = 'merged' if merge_static else 'per_tile'
+
+        def build():
+            entities, _, _ = create_dungeon_entities(
+                layout, wall_texture=None, floor_texture=None, roof_texture=None, torch_frames=[None],
+                merge_static=merge_static, static_colliders=not merge_static
+            )
+            return entities
+
+        seconds, entities = timed(build)
+        metrics[f'{name}_seconds'] = seconds
+        metrics[f'{name}_entities'] = len(entities)
+        for entity in entities:
+            destroy(entity)
+        metrics[f'{name}_peak_bytes'] = peak_memory(lambda: [destroy(entity) for entity in build()])
+    result['metrics'] = metrics
+    return result
+
+
+def bench_enemy_swarm(counts, ticks, seed, size=81):
+    results = []
+    layout = generated_layout(size, seed)
+    for count in counts:
+        simulation = Simulation(layout, seed=seed, controller=None)
+        # Fixed population: no spawn ramp, the player just stands there
+        simulation.spawner.pending = 0
+        simulation.next_spawn_time = math.inf
+        simulation.player.reduce_health = lambda amount: None
+        rng = random.Random(seed)
+        for _ in range(count):
+            x, z = rng.choice(simulation.spawner.spawn_positions)
+            simulation.spawner.spawn(x, z)
+
+        tick_times = []
+        for _ in range(ticks):
+            started = time.perf_counter()
+            simulation.tick()
+            tick_times.append(time.perf_counter() - started)
+        tick_times.sort()
+        results.append({
+            'benchmark': 'enemies.headless_tick',
+            'params': {'enemies': count, 'ticks': ticks, 'size': size},
+            'metrics': {
+                'mean_ms': statistics.fmean(tick_times) * 1000,
+                'p95_ms': tick_times[int(len(tick_times) * 0.95) - 1] * 1000,
+                'max_ms': tick_times[-1] * 1000,
+            },
+        })
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+    }
+
+
+def compare(old_path, new_path):
+    """Print metric ratios (new / old) for benchmarks present in both result files."""
+    with open(old_path) as file:
+        old = {(r['benchmark'], json.dumps(r['params'], sort_keys=True)): r for r in json.load(file)['results']}
+    with open(new_path) as file:
+        new = json.load(file)['results']
+    for result in new:
+        key = (result['benchmark'], json.dumps(result['params'], sort_keys=True))
+        if key not in old or 'metrics' not in result or 'metrics' not in old[key]:
+            continue
+        for metric, value in result['metrics'].items():
+            before = old[key]['metrics'].get(metric)
+            if before:
+                print(f"{result['benchmark']} {key[1]} {metric}: {before:.4g} -> {value:.4g} ({value / before:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pathfinding, dungeon build and enemy swarm benchmarks.')
+    parser.add_argument('--output', help='Write results as JSON to this file (default: stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='Compare two result files and exit')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--quick', action='store_true', help='Smaller sizes for a fast smoke run')
+    parser.add_argument('--only', choices=('pathfinding', 'generation', 'build', 'enemies'), action='append')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.quick:
+        maze_sizes, generation_sizes, queries, ticks = (21, 41), (51, 101), 50, 30
+    else:
+        maze_sizes, generation_sizes, queries, ticks = (21, 41, 81, 161), (51, 101, 201, 401), 500, 300
+    selected = set(args.only or ('pathfinding', 'generation', 'build', 'enemies'))
+
+    results = []
+    if 'pathfinding' in selected:
+        results += bench_pathfinding(maze_sizes, queries, args.seed)
+    if 'generation' in selected:
+        results += bench_generation(generation_sizes, args.seed)
+    if 'build' in selected:
+        results += bench_dungeon_build(generation_sizes[:3], args.seed)
+    if 'enemies' in selected:
+        results += bench_enemy_swarm((10, 100, 1000), ticks, args.seed)
+
+    report = json.dumps({'meta': metadata(), 'results': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(report + '\n')
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,10 +2,13 @@ from ursina import *
 import time
 import math
 
+from game import events
+
 class BaseEnemy(Entity):
-    def __init__(self, player, position=(0, 0, 0), texture=None, **kwargs):
+    def __init__(self, player, position=(0, 0, 0), texture=None, flow_field=None, **kwargs):
         super().__init__(position=position, texture=texture, **kwargs)
         self.player = player
+        self.flow_field = flow_field  # Shared FlowField toward the player, None to chase in a straight line
         self.health = 100
         self.speed = 2.5
         self.attack_range = 1.5
@@ -17,16 +20,27 @@ class BaseEnemy(Entity):
         self.collider = BoxCollider(self, center=Vec3(0, self.scale_y / 2, 0), size=self.scale)
 
     def update(self):
+        self.apply_gravity()
+        self.move_towards_player()
+
+    def apply_gravity(self):
         self.velocity_y += self.gravity * time.dt
         self.position += Vec3(0, self.velocity_y * time.dt, 0)
         if self.position.y < self.scale_y / 2:
             self.position = Vec3(self.position.x, self.scale_y / 2, self.position.z)
             self.velocity_y = 0
-        self.move_towards_player()
 
     def move_towards_player(self):
         direction = (self.player.position - self.position).normalized()
         direction.y = 0
+        if self.flow_field:
+            # Follow the shared distance field around walls; only go straight for the player inside their cell
+            step = self.flow_field.direction_from(self.position.x, self.position.z)
+            if step:
+                direction = Vec3(step[0], 0, step[1])
+            elif self.flow_field.distance_at(*self.flow_field.grid.world_to_cell(self.position.x, self.position.z)) != 0:
+                # Cut off from the player: a straight line would walk through walls, so hold position
+                direction = Vec3(0, 0, 0)
         distance_to_player = distance_xz(self.position, self.player.position)
         if distance_to_player > self.attack_range:
             self.position += direction * self.speed * time.dt
@@ -38,16 +52,19 @@ class BaseEnemy(Entity):
         if current_time - self.last_attack_time >= self.attack_cooldown:
             self.player.reduce_health(self.attack_damage)
             self.last_attack_time = current_time
-            print(f"Enemy attacked player. Player health: {self.player.health}")
+            if events.HIT.enabled:
+                events.emit(events.HIT, source='enemy', target='player')
 
     def take_damage(self, amount):
         self.health -= amount
-        print(f"Enemy took {amount} damage. Remaining health: {self.health}")
+        if events.DAMAGE.enabled:
+            events.emit(events.DAMAGE, target='enemy', amount=amount, health=self.health)
         if self.health <= 0:
             self.die()
 
     def die(self):
-        print(f"Enemy at {self.position} died.")
+        if events.DEATH.enabled:
+            events.emit(events.DEATH, x=round(self.x, 2), z=round(self.z, 2))
         self.enabled = False
         destroy(self)
 
@@ -0,0 +1,16 @@
+#version 140
+in vec2 texcoord;
+in float view_distance;
+out vec4 fragColor;
+uniform sampler2D p3d_Texture0;
+uniform vec4 fog_color;
+uniform float fog_density;
+
+void main() {
+    vec4 color = texture(p3d_Texture0, texcoord);
+    if (color.a < 0.5) {
+        discard;  // Cut-out sprites, so instances need no sorting
+    }
+    float fog = clamp(exp(-fog_density * view_distance), 0.0, 1.0);  // Same falloff as the scene's exponential fog
+    fragColor = vec4(mix(fog_color.rgb, color.rgb, fog), color.a);
+}
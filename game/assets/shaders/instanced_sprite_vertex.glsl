@@ -0,0 +1,40 @@
+#version 140
+// One draw call for every sprite of a kind: instance i reads two texels of instance_data,
+//   2i:     world x, y, z of the sprite center, heading in radians
+//   2i + 1: animation phase in frames, atlas row, unused, unused
+// The quad is turned toward the camera around the world up axis and the atlas
+// frame is picked from time * frame_rate + phase.
+in vec4 p3d_Vertex;
+in vec2 p3d_MultiTexCoord0;
+uniform mat4 p3d_ModelViewMatrix;  // The renderer node sits at the origin, so this is the view matrix
+uniform mat4 p3d_ProjectionMatrix;
+uniform samplerBuffer instance_data;
+uniform vec2 sprite_size;
+uniform vec2 atlas_grid;  // Columns (frames), rows (animations)
+uniform float frame_rate;
+uniform float time;
+out vec2 texcoord;
+out float view_distance;
+
+void main() {
+    vec4 placement = texelFetch(instance_data, gl_InstanceID * 2);
+    vec4 animation = texelFetch(instance_data, gl_InstanceID * 2 + 1);
+
+    vec3 right = vec3(p3d_ModelViewMatrix[0][0], p3d_ModelViewMatrix[1][0], p3d_ModelViewMatrix[2][0]);
+    right = normalize(vec3(right.x, 0.0, right.z));
+    vec3 world = placement.xyz + right * (p3d_Vertex.x * sprite_size.x) + vec3(0.0, p3d_Vertex.y * sprite_size.y, 0.0);
+    vec4 view = p3d_ModelViewMatrix * vec4(world, 1.0);
+    gl_Position = p3d_ProjectionMatrix * view;
+    view_distance = length(view.xyz);
+
+    // Mirror the sprite when the enemy faces against the camera's right
+    vec2 uv = p3d_MultiTexCoord0;
+    vec2 facing = vec2(sin(placement.w), cos(placement.w));
+    if (dot(facing, right.xz) < 0.0) {
+        uv.x = 1.0 - uv.x;
+    }
+
+    float column = mod(floor(time * frame_rate + animation.x), atlas_grid.x);
+    float row = animation.y;
+    texcoord = vec2((column + uv.x) / atlas_grid.x, 1.0 - (row + 1.0 - uv.y) / atlas_grid.y);
+}
@@ -1,50 +1,12 @@
 from ursina import *
 import random
 
-# Function to generate the dungeon layout
-def generate_dungeon(width, height, corridor_width=1, manual_layout=None):
-    if manual_layout:
-        return manual_layout, 1, 1
-    if width % (corridor_width + 1) != 1:
-        width += (corridor_width + 1) - (width % (corridor_width + 1))
-    if height % (corridor_width + 1) != 1:
-        height += (corridor_width + 1) - (height % (corridor_width + 1))
-    dungeon = [[0 for _ in range(width)] for _ in range(height)]
-    start_x = random.randrange(corridor_width, width, corridor_width + 1)
-    start_y = random.randrange(corridor_width, height, corridor_width + 1)
-    carve_out_area(dungeon, start_x, start_y, corridor_width)
-    stack = [(start_x, start_y)]
-    while stack:
-        x, y = stack[-1]
-        directions = []
-        if x > corridor_width: directions.append((- (corridor_width + 1), 0))
-        if x < width - (corridor_width + 1): directions.append((corridor_width + 1, 0))
-        if y > corridor_width: directions.append((0, - (corridor_width + 1)))
-        if y < height - (corridor_width + 1): directions.append((0, corridor_width + 1))
-        neighbors = []
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if dungeon[ny][nx] == 0: neighbors.append((nx, ny, dx, dy))
-        if neighbors:
-            nx, ny, dx, dy = random.choice(neighbors)
-            for i in range(corridor_width + 1):
-                ix = x + (dx // (corridor_width + 1)) * i
-                iy = y + (dy // (corridor_width + 1)) * i
-                carve_out_area(dungeon, ix, iy, corridor_width)
-            stack.append((nx, ny))
-        else:
-            stack.pop()
-    return dungeon, start_x, start_y
-
-# Function to carve out paths
-def carve_out_area(dungeon, x, y, corridor_width):
-    half_width = corridor_width // 2
-    for dx in range(-half_width, half_width + 1):
-        for dy in range(-half_width, half_width + 1):
-            nx = x + dx
-            ny = y + dy
-            if 0 <= ny < len(dungeon) and 0 <= nx < len(dungeon[0]):
-                dungeon[ny][nx] = 1  # Mark as path
+from game.dungeon_mesh import FLOOR_TILES, build_floor_mesh, build_wall_mesh, chunk_bounds
+from game.dungeon_generation import carve_out_area, generate_dungeon, place_torches
+from game.level_format import FLOOR_MESH, WALL_MESH
+from game.lightmap import load_or_bake_lightmap
+from game.tile_grid import TileGrid
+from game.world_streaming import ChunkStreamer
 
 # Create torch glow effect
 def create_torch_glow(torch_entity):
@@ -59,8 +21,184 @@ def create_torch_glow(torch_entity):
     )
     return torch_glow
 
-def create_dungeon_entities(dungeon_map, wall_texture, floor_texture, roof_texture, torch_frames, cell_size=2, floor_tile_size=2, player=None, debug_mode=False):
+def create_torch(torch_position, torch_rotation_y, torch_frames, player=None, torch_system=None, light_manager=None):
+    """Create a torch sprite with its point light.
+
+    A TorchSystem takes over its animation and facing. With a LightManager the
+    torch gets no light of its own and is registered as a light source instead.
+    """
+    torch = Entity(
+        model='quad',  # Use quad for torches
+        texture=torch_frames[0],  # First frame for initialization
+        scale=(1, 2),  # Adjust scale for the torch
+        position=Vec3(*torch_position),
+        rotation=Vec3(0, torch_rotation_y, 0),
+        always_on_top=False,
+        double_sided=True  # Ensure torch is visible from both sides
+    )
+
+    if torch_system:
+        torch_system.add(torch)
+    elif player:  # Only make the torch look at the player if player is provided
+        torch.look_at(player.position)
+
+    if light_manager:
+        light_manager.register(torch, *torch_position)
+        torch.torch_light = None
+        return torch
+
+    # Create and attach the torch light with more contrast
+    torch_light = PointLight(
+        parent=torch,  # Make the light follow the torch
+        position=(0, 0.5, 0),  # Offset the light slightly above the torch
+        color=color.rgb(255, 140, 0),  # Warm torch color
+        attenuation=(0.1, 0.05, 0.02),  # More dramatic light falloff
+        radius=3  # Lower radius for higher contrast
+    )
+
+    # Ensure that the torch light is properly parented
+    torch.torch_light = torch_light
+    return torch
+
+def create_merged_entity(mesh_data, texture, collider='mesh', tile_bounds=None):
+    """Turn MeshData into a single static Entity (one scene node, one draw call).
+
+    tile_bounds records the chunk the mesh covers so it can be culled by chunk.
+    """
+    entity = Entity(
+        model=Mesh(
+            vertices=mesh_data.vertices,
+            triangles=mesh_data.triangles,
+            uvs=mesh_data.uvs,
+            normals=mesh_data.normals,
+            colors=mesh_data.colors or None,
+        ),
+        texture=texture,
+        collider=collider,
+        double_sided=True  # Winding-agnostic; the back of a wall face is always inside solid rock
+    )
+    entity.tile_bounds = tile_bounds
+    return entity
+
+def bake_torch_lighting(dungeon_map, torch_positions, tile_size, **bake_options):
+    """Bake (or load from the disk cache) the static torch light for the walls and floors."""
+    grid = TileGrid.from_layout(dungeon_map, tile_size)
+    light_cells = [grid.world_to_cell(x, z) for x, _, z in torch_positions]
+    return load_or_bake_lightmap(grid, light_cells, **bake_options)
+
+def create_merged_static_geometry(dungeon_map, wall_texture, floor_texture, cell_size=2, floor_tile_size=2, chunk_size=16, collider='mesh', lightmap=None):
+    """Build walls and floors as merged chunk meshes instead of one cube per tile (vertex lit by lightmap, if any)."""
+    entities = []
+    tile_size = cell_size * floor_tile_size
+    height = len(dungeon_map)
+    width = len(dungeon_map[0])
+
+    for bounds in chunk_bounds(width, height, chunk_size):
+        wall_mesh = build_wall_mesh(dungeon_map, tile_size, wall_height=cell_size * 2, bounds=bounds, lightmap=lightmap)
+        if wall_mesh.quad_count:
+            entities.append(create_merged_entity(wall_mesh, wall_texture, collider, bounds))
+        floor_mesh = build_floor_mesh(dungeon_map, tile_size, floor_y=0.025, bounds=bounds, lightmap=lightmap)
+        if floor_mesh.quad_count:
+            entities.append(create_merged_entity(floor_mesh, floor_texture, collider, bounds))
+
+    return entities
+
+def create_roof(width, height, roof_texture, cell_size=2, floor_tile_size=2):
+    total_dungeon_width = width * cell_size * floor_tile_size
+    total_dungeon_height = height * cell_size * floor_tile_size
+    return Entity(
+        model='cube',
+        texture=roof_texture,
+        texture_scale=(total_dungeon_width, total_dungeon_height),
+        scale=(total_dungeon_width, 0.1, total_dungeon_height),
+        position=(total_dungeon_width / 2, cell_size * 2, total_dungeon_height / 2)
+    )
+
+def create_ground(width, height, cell_size=2, floor_tile_size=2):
+    """A single invisible ground box keeps the first person controller's ground check working."""
+    tile_size = cell_size * floor_tile_size
+    total_dungeon_width = width * tile_size
+    total_dungeon_height = height * tile_size
+    return Entity(
+        model='cube',
+        collider='box',
+        visible=False,
+        scale=(total_dungeon_width, 0.05, total_dungeon_height),
+        position=(total_dungeon_width / 2 - tile_size / 2, 0, total_dungeon_height / 2 - tile_size / 2)
+    )
+
+def create_streamed_dungeon(dungeon_map, wall_texture, floor_texture, roof_texture, torch_frames, cell_size=2, floor_tile_size=2, chunk_size=16, load_radius=24, player=None, culler=None, torch_system=None, light_manager=None, bake_lighting=False, placements=None, lightmap=None):
+    """Stream walls, floors and torches in chunks around the player instead of building the whole map.
+
+    Only the roof and the ground box are created up front. Chunks have no engine
+    colliders, so walls must be handled through GridCollision. Returns the
+    ChunkStreamer, the floor positions and a list that always holds the torches
+    currently built. With a VisibilityCuller, chunks and torches are registered
+    with it as they are built and dropped from it when destroyed. bake_lighting
+    bakes the static torch light into the chunk meshes' vertex colors; torch
+    placements and a lightmap prepared elsewhere can be passed in instead.
+    """
+    tile_size = cell_size * floor_tile_size
+    height = len(dungeon_map)
+    width = len(dungeon_map[0])
+
+    floor_positions = [
+        (x * tile_size, 0, y * tile_size)
+        for y in range(height) for x in range(width) if dungeon_map[y][x] in FLOOR_TILES
+    ]
+
+    # Torch spots are rolled once for the whole map so a chunk looks the same every time it is rebuilt
+    torch_placements = {}
+    if placements is None:
+        placements = place_torches(dungeon_map, tile_size)
+    for x, y, torch_position, torch_rotation_y in placements:
+        torch_placements.setdefault((x // chunk_size, y // chunk_size), []).append((torch_position, torch_rotation_y))
+    if lightmap is None and bake_lighting:
+        lightmap = bake_torch_lighting(dungeon_map, [p[2] for p in placements], tile_size)
+    torches = []
+
+    def build_chunk(bounds):
+        wall_mesh = build_wall_mesh(dungeon_map, tile_size, wall_height=cell_size * 2, bounds=bounds, lightmap=lightmap)
+        if wall_mesh.quad_count:
+            wall = create_merged_entity(wall_mesh, wall_texture, collider=None, tile_bounds=bounds)
+            if culler:
+                culler.register_chunk(wall, bounds)
+            yield wall
+        floor_mesh = build_floor_mesh(dungeon_map, tile_size, floor_y=0.025, bounds=bounds, lightmap=lightmap)
+        if floor_mesh.quad_count:
+            floor = create_merged_entity(floor_mesh, floor_texture, collider=None, tile_bounds=bounds)
+            if culler:
+                culler.register_chunk(floor, bounds)
+            yield floor
+        for torch_position, torch_rotation_y in torch_placements.get((bounds[0] // chunk_size, bounds[1] // chunk_size), ()):
+            torch = create_torch(torch_position, torch_rotation_y, torch_frames, player, torch_system, light_manager)
+            torches.append(torch)
+            if culler:
+                culler.register_position(torch, torch_position[0], torch_position[2])
+            yield torch
+
+    def set_enabled(entity, enabled):
+        entity.enabled = enabled
+
+    def destroy_entity(entity):
+        if hasattr(entity, 'torch_light'):
+            torches.remove(entity)
+            if light_manager:
+                light_manager.unregister(entity)
+        if culler:
+            culler.unregister(entity)
+        destroy(entity)
+
+    create_roof(width, height, roof_texture, cell_size, floor_tile_size)
+    create_ground(width, height, cell_size, floor_tile_size)
+    streamer = ChunkStreamer(width, height, chunk_size, build_chunk, set_enabled, destroy_entity, load_radius=load_radius)
+    return streamer, floor_positions, torches
+
+def create_dungeon_entities(dungeon_map, wall_texture, floor_texture, roof_texture, torch_frames, cell_size=2, floor_tile_size=2, player=None, debug_mode=False, merge_static=False, merge_chunk_size=16, static_colliders=True, torch_system=None, light_manager=None, bake_lighting=False):
+    # With static_colliders=False, walls and floors get no engine colliders; use GridCollision for them instead
+    # With bake_lighting (merged geometry only), the static torch light is baked into the meshes' vertex colors
     entities = []
+    static_collider = 'box' if static_colliders else None
     torches = []  # List to store torch entities for later updates
     torch_height = 2.5
     torch_offset = 0.2
@@ -78,93 +216,86 @@ def create_dungeon_entities(dungeon_map, wall_texture, floor_texture, roof_textu
             world_z = y * cell_size * floor_tile_size
 
             if tile == 0:
-                wall = Entity(
-                    model='cube',
-                    texture=wall_texture,
-                    collider='box',
-                    scale=(cell_size * floor_tile_size, cell_size * 2, cell_size * floor_tile_size),
-                    position=(world_x, cell_size, world_z),
-                )
-                entities.append(wall)
-
-                if random.random() < torch_probability:  # Random chance to place a torch
-                    torch_position = None
-                    torch_rotation = None
-
-                    if x > 0 and dungeon_map[y][x - 1] == 1:
-                        torch_position = Vec3(world_x - cell_size * floor_tile_size / 2 - torch_offset, torch_height, world_z)
-                        torch_rotation = Vec3(0, -90, 0)
-                    elif x < width - 1 and dungeon_map[y][x + 1] == 1:
-                        torch_position = Vec3(world_x + cell_size * floor_tile_size / 2 + torch_offset, torch_height, world_z)
-                        torch_rotation = Vec3(0, 90, 0)
-                    elif y > 0 and dungeon_map[y - 1][x] == 1:
-                        torch_position = Vec3(world_x, torch_height, world_z - cell_size * floor_tile_size / 2 - torch_offset)
-                        torch_rotation = Vec3(0, 0, 0)
-                    elif y < height - 1 and dungeon_map[y + 1][x] == 1:
-                        torch_position = Vec3(world_x, torch_height, world_z + cell_size * floor_tile_size / 2 + torch_offset)
-                        torch_rotation = Vec3(0, 180, 0)
-
-                    if torch_position:
-                        torch = Entity(
-                            model='quad',  # Use quad for torches
-                            texture=torch_frames[0],  # First frame for initialization
-                            scale=(1, 2),  # Adjust scale for the torch
-                            position=torch_position,
-                            rotation=torch_rotation,
-                            always_on_top=False,
-                            double_sided=True  # Ensure torch is visible from both sides
-                        )
-
-                        if player:  # Only make the torch look at the player if player is provided
-                            torch.look_at(player.position)
-
-                        # Create and attach the torch light with more contrast
-                        torch_light = PointLight(
-                            parent=torch,  # Make the light follow the torch
-                            position=(0, 0.5, 0),  # Offset the light slightly above the torch
-                            color=color.rgb(255, 140, 0),  # Warm torch color
-                            attenuation=(0.1, 0.05, 0.02),  # More dramatic light falloff
-                            radius=3  # Lower radius for higher contrast
-                        )
-
-                        # Ensure that the torch light is properly parented
-                        torch.torch_light = torch_light
-                        entities.append(torch)
-                        torches.append(torch)  # Add to the list of torches
+                if not merge_static:
+                    wall = Entity(
+                        model='cube',
+                        texture=wall_texture,
+                        collider=static_collider,
+                        scale=(cell_size * floor_tile_size, cell_size * 2, cell_size * floor_tile_size),
+                        position=(world_x, cell_size, world_z),
+                    )
+                    entities.append(wall)
 
             if tile == 1 or tile == 3:
-                floor = Entity(
-                    model='cube',
-                    texture=floor_texture,
-                    collider='box',
-                    scale=(cell_size * floor_tile_size, 0.05, cell_size * floor_tile_size),
-                    position=(world_x, 0, world_z),  # Set Y to 0 to make sure the floor is at ground level
-                )
-                entities.append(floor)
+                if not merge_static:
+                    floor = Entity(
+                        model='cube',
+                        texture=floor_texture,
+                        collider=static_collider,
+                        scale=(cell_size * floor_tile_size, 0.05, cell_size * floor_tile_size),
+                        position=(world_x, 0, world_z),  # Set Y to 0 to make sure the floor is at ground level
+                    )
+                    entities.append(floor)
                 floor_positions.append((world_x, 0, world_z))  # Update floor Y position to match the floor entity
 
+    placements = place_torches(dungeon_map, cell_size * floor_tile_size, torch_probability, torch_height, torch_offset)
+    for _, _, torch_position, torch_rotation_y in placements:
+        torch = create_torch(torch_position, torch_rotation_y, torch_frames, player, torch_system, light_manager)
+        entities.append(torch)
+        torches.append(torch)  # Add to the list of torches
 
-    total_dungeon_width = width * cell_size * floor_tile_size
-    total_dungeon_height = height * cell_size * floor_tile_size
+    if merge_static:
+        lightmap = None
+        if bake_lighting:
+            lightmap = bake_torch_lighting(dungeon_map, [p[2] for p in placements], cell_size * floor_tile_size)
+        entities.extend(create_merged_static_geometry(
+            dungeon_map, wall_texture, floor_texture, cell_size, floor_tile_size, merge_chunk_size,
+            collider='mesh' if static_colliders else None, lightmap=lightmap
+        ))
 
-    roof = Entity(
-        model='cube',
-        texture=roof_texture,
-        texture_scale=(total_dungeon_width, total_dungeon_height),
-        scale=(total_dungeon_width, 0.1, total_dungeon_height),
-        position=(total_dungeon_width / 2, cell_size * 2, total_dungeon_height / 2)
-    )
-    entities.append(roof)
+    entities.append(create_roof(width, height, roof_texture, cell_size, floor_tile_size))
+    if not static_colliders:
+        entities.append(create_ground(width, height, cell_size, floor_tile_size))
 
     return entities, floor_positions, torches  # Return the torches list
 
-def flicker_torch_lights(torches, time_passed, min_intensity=0.5, max_intensity=1.0, flicker_speed=0.1):
-    """Simulate torch light flickering by adjusting light intensity randomly."""
-    from random import uniform
+def iter_dungeon_entities(chunk_meshes, torch_placements, width, height, wall_texture, floor_texture, roof_texture, torch_frames, cell_size=2, floor_tile_size=2, torches=None, player=None, torch_system=None, light_manager=None, culler=None):
+    """Create the scene from prepared chunk meshes and torch placements, yielding after every entity.
+
+    Meant to be drained a few entities per frame (see FrameBudgetBuilder), so a
+    big level can be built without freezing the window. Built torches are
+    appended to torches; walls and floors get no engine colliders.
+    """
+    textures = {WALL_MESH: wall_texture, FLOOR_MESH: floor_texture}
+    for bounds, kind, mesh_data in chunk_meshes:
+        entity = create_merged_entity(mesh_data, textures[kind], collider=None, tile_bounds=bounds)
+        if culler:
+            culler.register_chunk(entity, bounds)
+        yield entity
+
+    for _, _, torch_position, torch_rotation_y in torch_placements:
+        torch = create_torch(torch_position, torch_rotation_y, torch_frames, player, torch_system, light_manager)
+        if torches is not None:
+            torches.append(torch)
+        if culler:
+            culler.register_position(torch, torch_position[0], torch_position[2])
+        yield torch
+
+    yield create_roof(width, height, roof_texture, cell_size, floor_tile_size)
+    yield create_ground(width, height, cell_size, floor_tile_size)
+
+def create_dungeon_from_level(level, wall_texture, floor_texture, roof_texture, torch_frames, player=None, torch_system=None, light_manager=None):
+    """Build the scene from a packed Level without re-deriving anything from the tiles.
 
-    for torch in torches:
-        if hasattr(torch, 'torch_light'):
-            # Use time_passed to scale the flicker speed
-            random_intensity = uniform(min_intensity, max_intensity)
-            torch.torch_light.color = color.rgb(255, int(140 * random_intensity), 0)  # Flicker the light's intensity
-            torch.torch_light.attenuation = (1, flicker_speed * random_intensity * time_passed, 0.05)  # Adjust falloff with flicker
+    Walls and floors come from the stored chunk meshes (no engine colliders, use
+    GridCollision), torches from the stored placements. Returns the same
+    (entities, floor_positions, torches) as create_dungeon_entities.
+    """
+    torches = []
+    cell_size = level.wall_height / 2
+    entities = list(iter_dungeon_entities(
+        level.chunk_meshes(), level.torch_placements(), level.width, level.height,
+        wall_texture, floor_texture, roof_texture, torch_frames, cell_size, level.tile_size / cell_size,
+        torches, player, torch_system, light_manager
+    ))
+    return entities, level.floor_positions(), torches
@@ -0,0 +1,64 @@
+# game/dungeon_generation.py
+
+import hashlib
+import random
+
+from game.maze_generation import EAST, NORTH, SOUTH, WEST, generate_maze, torch_faces
+
+# Function to generate the dungeon layout
+def generate_dungeon(width, height, corridor_width=1, manual_layout=None, algorithm='backtracker', seed=None):
+    """Return (layout, start_x, start_y); see game.maze_generation for the algorithms.
+
+    Without a seed, the module-level random state is used, as before.
+    """
+    if manual_layout:
+        return manual_layout, 1, 1
+    maze = generate_maze(
+        width, height, algorithm=algorithm, corridor_width=corridor_width,
+        rng=random if seed is None else random.Random(seed)
+    )
+    return maze.to_layout(), maze.start[0], maze.start[1]
+
+# Function to carve out paths
+def carve_out_area(dungeon, x, y, corridor_width):
+    half_width = corridor_width // 2
+    for dx in range(-half_width, half_width + 1):
+        for dy in range(-half_width, half_width + 1):
+            nx = x + dx
+            ny = y + dy
+            if 0 <= ny < len(dungeon) and 0 <= nx < len(dungeon[0]):
+                dungeon[ny][nx] = 1  # Mark as path
+
+def layout_seed(dungeon_map):
+    """A seed derived from the layout itself, so the same map always rolls the same torches."""
+    digest = hashlib.sha1(f'{len(dungeon_map[0])}x{len(dungeon_map)}:'.encode())
+    digest.update(bytes(tile for row in dungeon_map for tile in row))
+    return int.from_bytes(digest.digest()[:8], 'little')
+
+# Function to pick torch spots on wall faces next to a floor tile
+def place_torches(dungeon_map, tile_size, probability=0.25, torch_height=2.5, torch_offset=0.2, rng=None):
+    """Return (x, y, position, rotation_y) for each torch, rolling the probability once per eligible wall face.
+
+    Without an rng the rolls are seeded from layout_seed(), so a layout always
+    gets the same torches (and the same lightmap cache key).
+    """
+    if rng is None:
+        rng = random.Random(layout_seed(dungeon_map))
+    height = len(dungeon_map)
+    width = len(dungeon_map[0])
+    half = tile_size / 2
+    offsets = {
+        WEST: (-half - torch_offset, 0, -90),
+        EAST: (half + torch_offset, 0, 90),
+        NORTH: (0, -half - torch_offset, 0),
+        SOUTH: (0, half + torch_offset, 180),
+    }
+    tiles = bytes(tile for row in dungeon_map for tile in row)
+    placements = []
+    for index, direction in torch_faces(tiles, width, height):
+        if rng.random() >= probability:
+            continue
+        x, y = index % width, index // width
+        dx, dz, rotation_y = offsets[direction]
+        placements.append((x, y, (x * tile_size + dx, torch_height, y * tile_size + dz), rotation_y))
+    return placements
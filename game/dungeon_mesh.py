@@ -0,0 +1,163 @@
+# game/dungeon_mesh.py
+
+from game.tile_grid import WALL
+
+FLOOR_TILES = (1, 3)
+
+
+class MeshData:
+    """Plain vertex/triangle/uv/normal (and optional color) lists, ready to hand to ursina's Mesh."""
+
+    def __init__(self):
+        self.vertices = []
+        self.triangles = []
+        self.uvs = []
+        self.normals = []
+        self.colors = []  # Baked vertex colors; left empty for unlit meshes
+
+    @property
+    def quad_count(self):
+        return len(self.vertices) // 4
+
+    def add_quad(self, corners, normal, uv_size, color=None):
+        """Append a quad given its four corners in order around the face; the texture repeats uv_size times."""
+        index = len(self.vertices)
+        u, v = uv_size
+        self.vertices.extend(corners)
+        self.uvs.extend(((0, 0), (u, 0), (u, v), (0, v)))
+        self.normals.extend((normal,) * 4)
+        if color is not None:
+            self.colors.extend((color,) * 4)
+        self.triangles.extend((index, index + 1, index + 2, index, index + 2, index + 3))
+
+
+def _region(dungeon_map, bounds):
+    height = len(dungeon_map)
+    width = len(dungeon_map[0])
+    if bounds is None:
+        return 0, 0, width, height, width, height
+    x0, y0, x1, y1 = bounds
+    return max(x0, 0), max(y0, 0), min(x1, width), min(y1, height), width, height
+
+
+def _is_open(dungeon_map, x, y, width, height):
+    """A wall face is visible if the neighbouring tile exists and is not a wall."""
+    return 0 <= x < width and 0 <= y < height and dungeon_map[y][x] != WALL
+
+
+def build_wall_mesh(dungeon_map, tile_size, wall_height, bounds=None, lightmap=None):
+    """Merge the visible wall faces inside bounds (x0, y0, x1, y1) into long quads.
+
+    Faces between two adjacent walls, or facing out of the map, are never seen
+    and are skipped. Consecutive faces along a row or column are merged into a
+    single quad whose texture repeats once per tile. With a Lightmap, each face
+    is colored with the light of the tile it looks into, and runs only merge
+    while that light stays the same.
+    """
+    level_at = lightmap.level_at if lightmap else (lambda x, y: 0)
+    color_at = lightmap.color_at if lightmap else (lambda x, y: None)
+    mesh = MeshData()
+    x0, y0, x1, y1, width, height = _region(dungeon_map, bounds)
+    half = tile_size / 2
+
+    # Faces looking along -z / +z, merged along x
+    for y in range(y0, y1):
+        row = dungeon_map[y]
+        z_center = y * tile_size
+        for dy, z, normal in ((-1, z_center - half, (0, 0, -1)), (1, z_center + half, (0, 0, 1))):
+            x = x0
+            while x < x1:
+                if row[x] != WALL or not _is_open(dungeon_map, x, y + dy, width, height):
+                    x += 1
+                    continue
+                start = x
+                level = level_at(x, y + dy)
+                while (x < x1 and row[x] == WALL and _is_open(dungeon_map, x, y + dy, width, height)
+                       and level_at(x, y + dy) == level):
+                    x += 1
+                left = start * tile_size - half
+                right = x * tile_size - half
+                mesh.add_quad(
+                    ((left, 0, z), (right, 0, z), (right, wall_height, z), (left, wall_height, z)),
+                    normal, (x - start, 1), color_at(start, y + dy)
+                )
+
+    # Faces looking along -x / +x, merged along z
+    for x in range(x0, x1):
+        x_center = x * tile_size
+        for dx, face_x, normal in ((-1, x_center - half, (-1, 0, 0)), (1, x_center + half, (1, 0, 0))):
+            y = y0
+            while y < y1:
+                if dungeon_map[y][x] != WALL or not _is_open(dungeon_map, x + dx, y, width, height):
+                    y += 1
+                    continue
+                start = y
+                level = level_at(x + dx, y)
+                while (y < y1 and dungeon_map[y][x] == WALL and _is_open(dungeon_map, x + dx, y, width, height)
+                       and level_at(x + dx, y) == level):
+                    y += 1
+                near = start * tile_size - half
+                far = y * tile_size - half
+                mesh.add_quad(
+                    ((face_x, 0, near), (face_x, 0, far), (face_x, wall_height, far), (face_x, wall_height, near)),
+                    normal, (y - start, 1), color_at(x + dx, start)
+                )
+
+    return mesh
+
+
+def floor_rectangles(dungeon_map, bounds=None, lightmap=None):
+    """Greedily cover the floor tiles inside bounds with as few rectangles (x, y, w, h) as possible.
+
+    With a Lightmap, a rectangle only covers tiles with the same light level.
+    """
+    x0, y0, x1, y1, _, _ = _region(dungeon_map, bounds)
+    level_at = lightmap.level_at if lightmap else (lambda x, y: 0)
+    covered = set()
+    rectangles = []
+
+    for y in range(y0, y1):
+        for x in range(x0, x1):
+            if dungeon_map[y][x] not in FLOOR_TILES or (x, y) in covered:
+                continue
+            level = level_at(x, y)
+
+            def mergeable(i, j):
+                return dungeon_map[j][i] in FLOOR_TILES and (i, j) not in covered and level_at(i, j) == level
+
+            # Grow along x first, then add rows while the whole span is still uncovered floor
+            w = 1
+            while x + w < x1 and mergeable(x + w, y):
+                w += 1
+            h = 1
+            while y + h < y1 and all(mergeable(i, y + h) for i in range(x, x + w)):
+                h += 1
+            for j in range(y, y + h):
+                for i in range(x, x + w):
+                    covered.add((i, j))
+            rectangles.append((x, y, w, h))
+
+    return rectangles
+
+
+def build_floor_mesh(dungeon_map, tile_size, floor_y, bounds=None, lightmap=None):
+    """Build upward-facing floor quads, one per greedy rectangle (colored from the Lightmap, if any)."""
+    mesh = MeshData()
+    half = tile_size / 2
+    for x, y, w, h in floor_rectangles(dungeon_map, bounds, lightmap):
+        left = x * tile_size - half
+        right = (x + w) * tile_size - half
+        near = y * tile_size - half
+        far = (y + h) * tile_size - half
+        mesh.add_quad(
+            ((left, floor_y, near), (right, floor_y, near), (right, floor_y, far), (left, floor_y, far)),
+            (0, 1, 0), (w, h), lightmap.color_at(x, y) if lightmap else None
+        )
+    return mesh
+
+
+def chunk_bounds(width, height, chunk_size):
+    """Yield (x0, y0, x1, y1) tile bounds covering the map in chunk_size squares."""
+    for y0 in range(0, height, chunk_size):
+        for x0 in range(0, width, chunk_size):
+            yield x0, y0, min(x0 + chunk_size, width), min(y0 + chunk_size, height)
@@ -0,0 +1,177 @@
+# game/enemy_ai.py
+#
+# Enemy behaviour on top of the EnemyManager (see NOTREADME.md):
+#
+#     CHASE  - the player is perceived: follow the shared flow field toward them
+#     ATTACK - the player is perceived and within attack range
+#     SEARCH - the player was lost: walk a planned path to their last known position
+#     IDLE   - nothing to go on: wander between random nearby cells
+#
+# Movement for every state happens in EnemyManager.step() each frame. The
+# expensive decisions (perception and path planning) happen here, a fixed
+# number of enemies per frame in round-robin order, so their cost does not
+# grow with the number of enemies alive.
+
+import random
+
+from game.flow_field import UNREACHABLE
+from game.pathfinding import GridPathfinder
+
+# CHASE is 0 so zero-filled manager slots behave like the plain chasers they were before
+CHASE, ATTACK, SEARCH, IDLE = range(4)
+STATE_NAMES = ('chase', 'attack', 'search', 'idle')
+
+
+class AIScheduler:
+    """Time-sliced perception and replanning for the enemies of an EnemyManager.
+
+    Each tick() visits at most thinks_per_frame enemies (continuing where the
+    previous tick stopped) and plans at most replans_per_frame paths. An enemy
+    that thought recently is skipped until think_interval has passed; one that
+    needs a path while the replan budget is spent simply retries on its next visit.
+
+    Perception is line of sight within sight_range (can_see(world_x, world_z),
+    e.g. the player's VisibilityMap, which is symmetric) or hearing: being within
+    hearing_range steps of the player on the manager's flow field.
+
+    With a BatchPlanner (game/parallel_planning.py) paths are planned on worker
+    processes instead: plan() only queues a request, tick() submits the batch and
+    the paths are applied on a later tick. Enemies wait in their state meanwhile,
+    and replans_per_frame can be raised since a replan costs the main thread little.
+    Perception still runs here, so thinks_per_frame bounds the AI either way.
+    """
+
+    def __init__(self, manager, grid, can_see=None, pathfinder=None, rng=None, thinks_per_frame=8,
+                 replans_per_frame=2, think_interval=0.25, sight_range=40.0, hearing_range=4,
+                 search_time=8.0, wander_radius=4, planner=None):
+        self.manager = manager
+        self.grid = grid
+        self.can_see = can_see  # can_see(world_x, world_z) -> bool, None = sight is only limited by range
+        self.pathfinder = pathfinder or GridPathfinder(grid)
+        self.rng = rng or random.Random()
+        self.thinks_per_frame = thinks_per_frame
+        self.replans_per_frame = replans_per_frame
+        self.think_interval = think_interval
+        self.sight_range = sight_range  # World units
+        self.hearing_range = hearing_range  # Tiles along the flow field
+        self.search_time = search_time  # Seconds an enemy looks for the player before giving up
+        self.wander_radius = wander_radius  # Tiles
+        self.planner = planner
+        self.waiting = {}  # Entity -> number of its latest request while the planner works on it
+        self.requests = 0
+        self.cursor = 0
+        self.replans = 0  # Paths planned (or requested) during the last tick, for profiling
+
+    def tick(self, now, target_x, target_z):
+        """Let the next few enemies perceive the target and update their state and path."""
+        if self.planner is not None:
+            self.apply_planned()
+        count = self.manager.count
+        self.replans = 0
+        if count:
+            next_think = self.manager.next_think
+            cursor = self.cursor % count
+            for _ in range(min(self.thinks_per_frame, count)):
+                slot = cursor
+                cursor = (cursor + 1) % count
+                if next_think[slot] <= now:
+                    self.think(slot, now, target_x, target_z)
+            self.cursor = cursor
+        if self.planner is not None:
+            self.planner.flush()
+
+    def apply_planned(self):
+        """Hand finished paths from the planner to enemies that are still alive and still want one."""
+        manager = self.manager
+        grid = self.grid
+        for (entity, request), path in self.planner.collect():
+            if self.waiting.get(entity) != request:
+                continue  # Superseded by a newer request, or no longer waiting
+            del self.waiting[entity]
+            slot = entity.enemy_slot
+            if slot is None or manager.entities[slot] is not entity or manager.state[slot] < SEARCH:
+                continue  # Died, or spotted the player while the path was planned
+            manager.paths[slot] = [grid.cell_to_world(x, y) for x, y in reversed(path)]
+
+    def perceives(self, x, z, target_x, target_z):
+        manager = self.manager
+        dx = target_x - x
+        dz = target_z - z
+        if dx * dx + dz * dz <= self.sight_range * self.sight_range and (self.can_see is None or self.can_see(x, z)):
+            return True
+        flow_field = manager.flow_field
+        if flow_field is None or not self.hearing_range:
+            return False
+        distance = flow_field.distance_at(*self.grid.world_to_cell(x, z))
+        return distance != UNREACHABLE and distance <= self.hearing_range
+
+    def think(self, slot, now, target_x, target_z):
+        manager = self.manager
+        x, z = manager.x[slot], manager.z[slot]
+        manager.next_think[slot] = now + self.think_interval
+
+        if self.perceives(x, z, target_x, target_z):
+            self.waiting.pop(manager.entities[slot], None)
+            dx = target_x - x
+            dz = target_z - z
+            in_range = dx * dx + dz * dz <= manager.attack_range * manager.attack_range
+            manager.state[slot] = ATTACK if in_range else CHASE
+            manager.goal_x[slot] = target_x  # Last known position
+            manager.goal_z[slot] = target_z
+            manager.state_until[slot] = now + self.search_time
+            manager.paths[slot] = None
+            return
+
+        state = manager.state[slot]
+        if state == CHASE or state == ATTACK:
+            # Lost the player: head for where they were last perceived
+            state = SEARCH
+            manager.state[slot] = SEARCH
+            manager.state_until[slot] = now + self.search_time
+            manager.paths[slot] = None
+
+        if manager.entities[slot] in self.waiting:
+            return  # A path is on its way from the planner
+        path = manager.paths[slot]
+        if state == SEARCH:
+            if now >= manager.state_until[slot] or path == []:
+                state = IDLE  # Gave up, or reached the last known position without finding anyone
+                manager.state[slot] = IDLE
+                manager.paths[slot] = path = None
+            elif path is None:
+                self.plan(slot, now, self.grid.world_to_cell(manager.goal_x[slot], manager.goal_z[slot]))
+                return
+
+        if state == IDLE and not path:
+            self.plan(slot, now, self.wander_cell(x, z))
+
+    def plan(self, slot, now, goal):
+        """Plan a path for slot to a goal cell, or retry on the next visit if the replan budget is spent."""
+        manager = self.manager
+        if self.replans >= self.replans_per_frame:
+            manager.next_think[slot] = now
+            return
+        self.replans += 1
+        grid = self.grid
+        start = grid.world_to_cell(manager.x[slot], manager.z[slot])
+        entity = manager.entities[slot]
+        if self.planner is not None and goal is not None and entity is not None:
+            self.requests += 1
+            self.waiting[entity] = self.requests
+            self.planner.request((entity, self.requests), start, goal)
+            return
+        path = self.pathfinder.find_path(start, goal) if goal is not None else []
+        # Stored reversed as world waypoints so the manager can pop() the next one
+        manager.paths[slot] = [grid.cell_to_world(x, y) for x, y in reversed(path)]
+
+    def wander_cell(self, x, z, attempts=8):
+        """A random walkable cell within wander_radius tiles, or None if none was found."""
+        grid = self.grid
+        cx, cy = grid.world_to_cell(x, z)
+        radius = self.wander_radius
+        randint = self.rng.randint
+        for _ in range(attempts):
+            cell = (cx + randint(-radius, radius), cy + randint(-radius, radius))
+            if cell != (cx, cy) and grid.is_walkable(*cell):
+                return cell
+        return None
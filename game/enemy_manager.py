@@ -0,0 +1,336 @@
+# game/enemy_manager.py
+
+import math
+from array import array
+
+from game.enemy_ai import ATTACK, SEARCH
+
+
+class EnemyManager:
+    """Structure-of-arrays store that steps every enemy in a single pass per frame.
+
+    Position, velocity, health, knockback and attack cooldown for all enemies live
+    in parallel flat arrays, packed densely in slots [0, count). Entities (if any)
+    are only handed their final transform in sync_entities(), so the manager also
+    works without a renderer.
+
+    The AI state columns (see game/enemy_ai.py) are written by an AIScheduler;
+    without one every enemy stays in CHASE and simply follows the flow field.
+
+    With a grid (by default the flow field's), every displacement is clamped to
+    walkable tiles: a move that would end inside a wall slides along it on one
+    axis, or is dropped.
+    """
+
+    COLUMNS = ('x', 'y', 'z', 'velocity_y', 'health', 'knockback', 'knockback_x', 'knockback_z',
+               'last_attack_time', 'heading', 'state', 'goal_x', 'goal_z', 'next_think', 'state_until',
+               'previous_x', 'previous_y', 'previous_z')
+
+    def __init__(self, flow_field=None, attack_callback=None, spatial_hash=None, capacity=64, grid=None):
+        self.flow_field = flow_field
+        self.grid = grid if grid is not None else flow_field.grid if flow_field is not None else None
+        self.attack_callback = attack_callback  # Called as attack_callback(slot, damage)
+        self.spatial_hash = spatial_hash  # Optional SpatialHash the enemy entities are kept registered in
+
+        # Shared enemy parameters (same values as BaseEnemy/SimpleSpriteEnemy)
+        self.speed = 2.5
+        self.attack_range = 1.5
+        self.attack_damage = 10
+        self.attack_cooldown = 1.5
+        self.gravity = -9.81
+        self.ground_y = 1.25  # Half of the sprite height, so the quad stands on the floor
+        self.knockback_decay = 10
+        self.max_health = 100
+        self.radius = 0.75  # Half the sprite width, used for hit tests
+        self.separation_radius = 1.0  # Enemies closer than this push apart (needs spatial_hash)
+        self.separation_strength = 2.0
+        self.wander_speed = 0.5  # Fraction of speed used while idle
+
+        self.count = 0
+        self.capacity = 0
+        self.entities = []
+        self.paths = []  # Per slot: reversed world (x, z) waypoints for SEARCH/IDLE, None when unplanned
+        for name in self.COLUMNS:
+            setattr(self, name, array('d'))
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        extra = capacity - self.capacity
+        for name in self.COLUMNS:
+            getattr(self, name).extend(array('d', [0.0]) * extra)
+        self.entities.extend([None] * extra)
+        self.paths.extend([None] * extra)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count
+
+    def add(self, x, y, z, entity=None, health=None):
+        """Register an enemy and return its slot."""
+        if self.count == self.capacity:
+            self._grow(max(self.capacity * 2, 16))
+        slot = self.count
+        self.count += 1
+        for name in self.COLUMNS:
+            getattr(self, name)[slot] = 0.0
+        self.x[slot] = self.previous_x[slot] = x
+        self.y[slot] = self.previous_y[slot] = y
+        self.z[slot] = self.previous_z[slot] = z
+        self.health[slot] = self.max_health if health is None else health
+        self.goal_x[slot] = x  # Nothing known about the player yet
+        self.goal_z[slot] = z
+        self.entities[slot] = entity
+        self.paths[slot] = None
+        if entity is not None:
+            entity.enemy_slot = slot
+            if self.spatial_hash is not None:
+                self.spatial_hash.insert(entity, x, z)
+        return slot
+
+    def remove(self, slot):
+        """Drop an enemy, moving the last one into its slot to keep the arrays dense."""
+        last = self.count - 1
+        entity = self.entities[slot]
+        if entity is not None:
+            entity.enemy_slot = None
+            if self.spatial_hash is not None:
+                self.spatial_hash.remove(entity)
+        if slot != last:
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[slot] = column[last]
+            moved = self.entities[last]
+            self.entities[slot] = moved
+            self.paths[slot] = self.paths[last]
+            if moved is not None:
+                moved.enemy_slot = slot
+        self.entities[last] = None
+        self.paths[last] = None
+        self.count = last
+
+    def damage(self, slot, amount):
+        """Apply damage to an enemy. Returns True if it dropped to zero health."""
+        self.health[slot] -= amount
+        return self.health[slot] <= 0
+
+    def apply_knockback(self, slot, direction_x, direction_z, force):
+        length = math.hypot(direction_x, direction_z)
+        if length == 0:
+            return
+        self.knockback[slot] = force
+        self.knockback_x[slot] = direction_x / length
+        self.knockback_z[slot] = direction_z / length
+
+    def snapshot(self):
+        """Remember the current positions as the previous tick's, for interpolated syncs."""
+        count = self.count
+        self.previous_x[:count] = self.x[:count]
+        self.previous_y[:count] = self.y[:count]
+        self.previous_z[:count] = self.z[:count]
+
+    def walkable_at(self, x, z):
+        grid = self.grid
+        return grid is None or grid.is_walkable(*grid.world_to_cell(x, z))
+
+    def slide(self, from_x, from_z, to_x, to_z):
+        """Where a move from a walkable position toward (to_x, to_z) ends without entering a wall."""
+        walkable_at = self.walkable_at
+        if walkable_at(to_x, to_z) or not walkable_at(from_x, from_z):
+            return to_x, to_z  # Already stuck in a wall (e.g. spawned there): let it walk out
+        if walkable_at(to_x, from_z):
+            return to_x, from_z
+        if walkable_at(from_x, to_z):
+            return from_x, to_z
+        return from_x, from_z
+
+    def step(self, dt, target_x, target_z, now):
+        """Advance gravity, knockback, movement and attacks for every enemy.
+
+        CHASE/ATTACK enemies follow the flow field toward the target, and hold
+        position where the field cannot reach it; SEARCH and IDLE enemies walk
+        their planned path (idle ones at wander_speed). Any enemy within attack
+        range of the target attacks it.
+        """
+        xs, ys, zs = self.x, self.y, self.z
+        velocity_y = self.velocity_y
+        knockback, knockback_x, knockback_z = self.knockback, self.knockback_x, self.knockback_z
+        last_attack_time = self.last_attack_time
+        heading = self.heading
+        states = self.state
+        paths = self.paths
+        flow_field = self.flow_field
+        flow_direction = flow_field.direction_from if flow_field else None
+        grid = self.grid
+        if grid is not None:
+            walkable = grid.walkable
+            grid_width = grid.width
+            grid_height = grid.height
+            tile_size = grid.tile_size
+            half_tile = tile_size / 2
+        floor = math.floor
+        gravity_step = self.gravity * dt
+        ground_y = self.ground_y
+        move = self.speed * dt
+        wander_move = move * self.wander_speed
+        decay = self.knockback_decay * dt
+        attack_range = self.attack_range
+        attack_cooldown = self.attack_cooldown
+        attack_damage = self.attack_damage
+        attack_callback = self.attack_callback
+        entities = self.entities
+        spatial_hash = self.spatial_hash
+        separation_radius = self.separation_radius
+        separation_step = self.separation_strength * dt
+        hypot = math.hypot
+        atan2 = math.atan2
+        degrees = math.degrees
+
+        for slot in range(self.count):
+            # Gravity
+            vy = velocity_y[slot] + gravity_step
+            y = ys[slot] + vy * dt
+            if y < ground_y:
+                y = ground_y
+                vy = 0.0
+            ys[slot] = y
+            velocity_y[slot] = vy
+
+            x = start_x = xs[slot]
+            z = start_z = zs[slot]
+            dx = target_x - x
+            dz = target_z - z
+            distance = hypot(dx, dz)
+            face_x = face_z = None  # Set when walking a path; otherwise face the target
+
+            if knockback[slot] > 0:
+                force = knockback[slot]
+                x += knockback_x[slot] * force * dt
+                z += knockback_z[slot] * force * dt
+                knockback[slot] = force - decay
+            elif distance > attack_range:
+                state = states[slot]
+                moved = False
+                if state <= ATTACK:
+                    step = flow_direction(x, z) if flow_direction else None
+                    if step:
+                        x += step[0] * move
+                        z += step[1] * move
+                        moved = True
+                    elif flow_field is None or flow_field.distance_at(*flow_field.grid.world_to_cell(x, z)) == 0:
+                        # In the target's own cell (or no field at all): close in directly
+                        x += dx / distance * move
+                        z += dz / distance * move
+                        moved = True
+                    # Otherwise the field cannot reach the target from here; walking straight would cross walls
+                else:
+                    path = paths[slot]
+                    if path:
+                        waypoint_x, waypoint_z = path[-1]
+                        face_x = waypoint_x - x
+                        face_z = waypoint_z - z
+                        gap = hypot(face_x, face_z)
+                        walk = move if state == SEARCH else wander_move
+                        if gap <= walk:
+                            x, z = waypoint_x, waypoint_z
+                            path.pop()
+                        else:
+                            x += face_x / gap * walk
+                            z += face_z / gap * walk
+                        moved = True
+
+                if moved and spatial_hash is not None and separation_radius > 0:
+                    # Push away from neighbours so the swarm does not collapse into one sprite
+                    entity = entities[slot]
+                    for other in spatial_hash.query_radius(x, z, separation_radius):
+                        if other is entity:
+                            continue
+                        other_x, other_z = spatial_hash.positions[other]
+                        away_x = x - other_x
+                        away_z = z - other_z
+                        gap = hypot(away_x, away_z)
+                        if gap > 0:
+                            push = (separation_radius - gap) / separation_radius * separation_step
+                            x += away_x / gap * push
+                            z += away_z / gap * push
+            elif now - last_attack_time[slot] >= attack_cooldown:
+                last_attack_time[slot] = now
+                if attack_callback:
+                    attack_callback(slot, attack_damage)
+
+            if grid is not None and (x != start_x or z != start_z):
+                # Pursuit, knockback and separation all end on a walkable tile
+                cell_x = floor((x + half_tile) / tile_size)
+                cell_z = floor((z + half_tile) / tile_size)
+                if not (0 <= cell_x < grid_width and 0 <= cell_z < grid_height and walkable[cell_z * grid_width + cell_x]):
+                    x, z = self.slide(start_x, start_z, x, z)
+            xs[slot] = x
+            zs[slot] = z
+            if spatial_hash is not None and entities[slot] is not None:
+                spatial_hash.move(entities[slot], x, z)
+            if face_x is None:
+                heading[slot] = degrees(atan2(target_x - x, target_z - z))  # Face the target, like look_at_2d(..., 'y')
+            elif face_x or face_z:
+                heading[slot] = degrees(atan2(face_x, face_z))
+
+    def sync_entities(self, visibility=None, alpha=None):
+        """Copy the simulated transforms onto the enemy entities.
+
+        With a VisibilityMap, enemies standing in cells the player cannot see are
+        hidden and their transforms are not pushed to the scene graph. With alpha
+        (0..1, from a FixedTimestepScheduler), positions are blended between the
+        last snapshot() and the current tick.
+        """
+        xs, ys, zs, heading = self.x, self.y, self.z, self.heading
+        previous_x, previous_y, previous_z = self.previous_x, self.previous_y, self.previous_z
+        entities = self.entities
+        for slot in range(self.count):
+            entity = entities[slot]
+            if entity is None:
+                continue
+            if visibility is not None:
+                visible = visibility.is_visible_world(xs[slot], zs[slot])
+                if entity.visible != visible:
+                    entity.visible = visible
+                if not visible:
+                    continue
+            if alpha is None:
+                entity.position = (xs[slot], ys[slot], zs[slot])
+            else:
+                x0, y0, z0 = previous_x[slot], previous_y[slot], previous_z[slot]
+                entity.position = (x0 + (xs[slot] - x0) * alpha, y0 + (ys[slot] - y0) * alpha, z0 + (zs[slot] - z0) * alpha)
+            entity.rotation_y = heading[slot]
+
+
+class HeadlessEnemy:
+    """Renderer-free stand-in for SimpleSpriteEnemy; all of its state lives in the EnemyManager."""
+
+    def __init__(self, manager, x, y, z, on_death=None):
+        self.manager = manager
+        self.enemy_slot = None
+        self.enabled = True
+        self.recycle = None
+        self.on_death = on_death
+        manager.add(x, y, z, entity=self)
+
+    def take_damage(self, amount):
+        if self.enemy_slot is None:
+            return
+        if self.manager.damage(self.enemy_slot, amount):
+            self.die()
+
+    def apply_knockback(self, direction_x, direction_z, force):
+        if self.enemy_slot is not None:
+            self.manager.apply_knockback(self.enemy_slot, direction_x, direction_z, force)
+
+    def die(self):
+        self.manager.remove(self.enemy_slot)
+        if self.on_death:
+            self.on_death(self)
+        if self.recycle is not None:
+            self.recycle(self)
+        else:
+            self.enabled = False
+
+    def respawn(self, x, y, z):
+        self.enabled = True
+        self.manager.add(x, y, z, entity=self)
@@ -0,0 +1,229 @@
+# game/events.py
+#
+# Typed game events with level filtering, per-type rate limiting and a
+# background writer thread. Every call site guards on the event type's
+# `enabled` flag, so with logging off (the default) a hot path pays one
+# attribute check and builds no message:
+#
+#     if events.DAMAGE.enabled:
+#         events.emit(events.DAMAGE, target='enemy', amount=damage, health=self.health)
+#
+# configure() turns logging on, e.g. events.configure(events.INFO, path='events.log').
+
+import atexit
+import json
+import queue
+import sys
+import threading
+import time
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: 'debug', INFO: 'info', WARNING: 'warning'}
+
+
+class EventType:
+    """A kind of event: its level and how many per second are written before the rest are aggregated."""
+
+    __slots__ = ('name', 'level', 'rate_limit', 'enabled')
+
+    def __init__(self, name, level=INFO, rate_limit=None):
+        self.name = name
+        self.level = level
+        self.rate_limit = rate_limit  # Records per second, None = unlimited
+        self.enabled = False  # Set by configure(); checked by call sites before emitting
+
+    def __repr__(self):
+        return f'EventType({self.name!r})'
+
+
+HIT = EventType('hit', DEBUG, rate_limit=20)  # An attack or projectile hit something (or nothing)
+DAMAGE = EventType('damage', DEBUG, rate_limit=20)  # Health lost by an enemy or the player
+DEATH = EventType('death', INFO, rate_limit=20)
+SPAWN = EventType('spawn', DEBUG, rate_limit=20)
+PROJECTILE_EXPIRE = EventType('projectile_expire', DEBUG, rate_limit=10)
+PLAYER_ACTION = EventType('player_action', DEBUG)  # Weapon switches, attacks, shots
+GAME_OVER = EventType('game_over', WARNING)
+LEVEL_LOAD_FAILED = EventType('level_load_failed', WARNING)  # Level preparation raised; the game quits
+
+EVENT_TYPES = [HIT, DAMAGE, DEATH, SPAWN, PROJECTILE_EXPIRE, PLAYER_ACTION, GAME_OVER, LEVEL_LOAD_FAILED]
+
+
+class BackgroundWriter:
+    """Writes formatted records to a stream from a daemon thread, one batch at a time.
+
+    put() only appends to a queue; the thread wakes up every flush_interval
+    seconds (or when batch_size records are waiting) and writes them with a
+    single write() and flush(). on_flush, if set, is called from the thread on
+    every wake-up, before the batch is collected.
+    """
+
+    def __init__(self, stream, flush_interval=0.5, batch_size=256, on_flush=None):
+        self.stream = stream
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self._queue = queue.SimpleQueue()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='event-writer', daemon=True)
+        self._thread.start()
+
+    def put(self, line):
+        self._queue.put(line)
+
+    def _run(self):
+        get = self._queue.get
+        while True:
+            if self.on_flush is not None:
+                self.on_flush()
+            batch = []
+            try:
+                batch.append(get(timeout=self.flush_interval))
+                while len(batch) < self.batch_size:
+                    batch.append(get(block=False))
+            except queue.Empty:
+                pass
+            if batch:
+                self.stream.write('\n'.join(batch) + '\n')
+                self.stream.flush()
+            elif self._closing.is_set():
+                return
+
+    def close(self):
+        """Write what is queued and stop the thread."""
+        self._closing.set()
+        self._thread.join()
+
+
+class _RateWindow:
+    __slots__ = ('started', 'written', 'suppressed', 'totals')
+
+    def __init__(self, started):
+        self.started = started
+        self.written = 0
+        self.suppressed = 0
+        self.totals = {}  # Sums of the numeric fields of the suppressed events
+
+
+class EventLog:
+    """Filters, rate limits and formats events, then hands them to a writer.
+
+    Each event type may write rate_limit records per one-second window; the
+    events past that are counted, their numeric fields summed, and written as
+    one aggregate record when the window closes. A window closes when the next
+    event of its type arrives, or when close_expired() runs; configure() has the
+    writer thread call it on every flush, so a burst followed by silence still
+    gets its aggregate record within a flush interval.
+    """
+
+    def __init__(self, writer, level=INFO, format='json', clock=time.monotonic):
+        self.writer = writer
+        self.level = level
+        self.format = format  # 'json' (one object per line) or 'text'
+        self.clock = clock
+        self._windows = {}  # Event type -> its open _RateWindow
+        self._lock = threading.Lock()  # emit() and the writer thread's close_expired() share the windows
+
+    def emit(self, event_type, **fields):
+        if event_type.level < self.level:
+            return
+        now = self.clock()
+        limit = event_type.rate_limit
+        if limit is not None:
+            with self._lock:
+                window = self._windows.get(event_type)
+                if window is None or now - window.started >= 1.0:
+                    if window is not None and window.suppressed:
+                        self._write_aggregate(event_type, window, now)
+                    window = self._windows[event_type] = _RateWindow(now)
+                if window.written >= limit:
+                    window.suppressed += 1
+                    totals = window.totals
+                    for key, value in fields.items():
+                        if isinstance(value, (int, float)) and not isinstance(value, bool):
+                            totals[key] = totals.get(key, 0) + value
+                    return
+                window.written += 1
+        self._write(now, event_type, fields)
+
+    def close_expired(self):
+        """Close the windows that are a second old, writing their aggregate records."""
+        now = self.clock()
+        with self._lock:
+            for event_type, window in list(self._windows.items()):
+                if now - window.started >= 1.0:
+                    del self._windows[event_type]
+                    if window.suppressed:
+                        self._write_aggregate(event_type, window, now)
+
+    def flush_aggregates(self):
+        """Write the aggregate records of the open windows (e.g. before shutting down)."""
+        now = self.clock()
+        with self._lock:
+            for event_type, window in self._windows.items():
+                if window.suppressed:
+                    self._write_aggregate(event_type, window, now)
+            self._windows.clear()
+
+    def _write_aggregate(self, event_type, window, now):
+        self._write(now, event_type, {'suppressed': window.suppressed, 'window': round(now - window.started, 3),
+                                      **{f'{key}_total': value for key, value in window.totals.items()}})
+
+    def _write(self, now, event_type, fields):
+        if self.format == 'json':
+            line = json.dumps({'t': round(now, 4), 'event': event_type.name,
+                               'level': LEVEL_NAMES.get(event_type.level, event_type.level), **fields}, default=str)
+        else:
+            details = ' '.join(f'{key}={value}' for key, value in fields.items())
+            line = f'{now:.3f} {LEVEL_NAMES.get(event_type.level, event_type.level):<7} {event_type.name} {details}'
+        self.writer.put(line)
+
+
+_log = None
+_opened_stream = None  # File opened by configure(path=...), closed again by shutdown()
+
+
+def configure(level=INFO, path=None, stream=None, format='json', flush_interval=0.5):
+    """Start logging events at level and above to a file (path) or stream (default stderr).
+
+    Pass level=OFF to stop logging. Returns the EventLog, or None when off.
+    """
+    global _log, _opened_stream
+    shutdown()
+    if level >= OFF:
+        return None
+    if path is not None:
+        stream = _opened_stream = open(path, 'a', encoding='utf-8')
+    writer = BackgroundWriter(stream or sys.stderr, flush_interval)
+    _log = EventLog(writer, level=level, format=format)
+    writer.on_flush = _log.close_expired
+    for event_type in EVENT_TYPES:
+        event_type.enabled = event_type.level >= level
+    return _log
+
+
+def emit(event_type, **fields):
+    """Log an event; call sites check event_type.enabled first so nothing is built while logging is off."""
+    if _log is not None:
+        _log.emit(event_type, **fields)
+
+
+def shutdown():
+    """Flush pending records and aggregates, stop the writer and disable every event type."""
+    global _log, _opened_stream
+    for event_type in EVENT_TYPES:
+        event_type.enabled = False
+    log, _log = _log, None
+    if log is None:
+        return
+    log.flush_aggregates()
+    log.writer.close()
+    if _opened_stream is not None:
+        _opened_stream.close()
+        _opened_stream = None
+
+
+atexit.register(shutdown)
@@ -0,0 +1,59 @@
+# game/fixed_timestep.py
+
+import time
+
+
+class FixedTimestepScheduler:
+    """Runs a tick(dt) callback at a fixed rate, independent of the render frame rate.
+
+    Each frame's elapsed time is added to an accumulator, and whole ticks are
+    run while it holds at least one tick. After a long frame this means several
+    catch-up ticks, bounded two ways:
+    - max_ticks_per_frame caps the number of ticks run in one frame.
+    - tick_budget caps the seconds spent running them.
+    Whatever is left over when a limit is hit is dropped (counted in
+    dropped_ticks), so the simulation slows down instead of spiralling.
+
+    alpha is how far the accumulator is into the next tick (0..1). Renderers
+    blend the previous and current tick's state with it, see
+    EnemyManager.sync_entities().
+    """
+
+    def __init__(self, tick, tick_rate=30, max_ticks_per_frame=4, tick_budget=None, clock=time.perf_counter):
+        self.tick = tick  # Called as tick(dt) with the fixed dt
+        self.dt = 1 / tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.tick_budget = tick_budget  # Seconds of ticking allowed per frame, None = only the tick cap
+        self.clock = clock
+        self.accumulator = 0.0
+        self.tick_count = 0
+        self.dropped_ticks = 0
+        self.time = 0.0  # Simulated seconds, advanced by dt per tick
+
+    @property
+    def tick_rate(self):
+        return 1 / self.dt
+
+    @property
+    def alpha(self):
+        return min(self.accumulator / self.dt, 1.0)
+
+    def advance(self, frame_dt):
+        """Run the ticks owed after a frame of frame_dt seconds; returns how many ran."""
+        dt = self.dt
+        self.accumulator += frame_dt
+        ran = 0
+        deadline = self.clock() + self.tick_budget if self.tick_budget is not None else None
+        while self.accumulator >= dt:
+            if ran >= self.max_ticks_per_frame or (deadline is not None and ran and self.clock() >= deadline):
+                # Behind schedule: drop whole ticks but keep the fraction for interpolation
+                dropped = int(self.accumulator / dt)
+                self.dropped_ticks += dropped
+                self.accumulator -= dropped * dt
+                break
+            self.tick(dt)
+            self.accumulator -= dt
+            self.time += dt
+            self.tick_count += 1
+            ran += 1
+        return ran
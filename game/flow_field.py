@@ -0,0 +1,100 @@
+# game/flow_field.py
+
+from array import array
+from collections import deque
+
+UNREACHABLE = -1
+
+
+class FlowField:
+    """Distance field (Dijkstra map) toward a single target cell, shared by every enemy.
+
+    The field is only rebuilt when the target moves into a different cell, so the
+    chase cost is one BFS over the grid per player cell change instead of one
+    search per enemy. Enemies then read their next step from the field in O(1).
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.distance = array('i', [UNREACHABLE]) * grid.size
+        self.target = None
+
+    def update(self, target_cell):
+        """Recompute the field if the target moved to another cell. Returns True if it was rebuilt."""
+        if target_cell == self.target:
+            return False
+        self.target = target_cell
+        self._rebuild(target_cell)
+        return True
+
+    def _rebuild(self, target_cell):
+        grid = self.grid
+        width = grid.width
+        size = grid.size
+        walkable = grid.walkable
+        distance = self.distance
+        distance[:] = array('i', [UNREACHABLE]) * size
+
+        tx, ty = target_cell
+        if not grid.is_walkable(tx, ty):
+            return
+        start = ty * width + tx
+        distance[start] = 0
+        queue = deque((start,))
+        popleft = queue.popleft
+        append = queue.append
+
+        while queue:
+            current = popleft()
+            next_distance = distance[current] + 1
+            cx = current % width
+            for neighbor, valid in (
+                (current - 1, cx > 0),
+                (current + 1, cx < width - 1),
+                (current - width, current >= width),
+                (current + width, current < size - width),
+            ):
+                if valid and walkable[neighbor] and distance[neighbor] == UNREACHABLE:
+                    distance[neighbor] = next_distance
+                    append(neighbor)
+
+    def distance_at(self, x, y):
+        if not self.grid.in_bounds(x, y):
+            return UNREACHABLE
+        return self.distance[y * self.grid.width + x]
+
+    def next_step(self, x, y):
+        """Return the neighboring cell one step closer to the target, or None at the target / when unreachable."""
+        grid = self.grid
+        if not grid.in_bounds(x, y):
+            return None
+        width = grid.width
+        distance = self.distance
+        current = distance[y * width + x]
+        if current <= 0:
+            return None
+
+        index = y * width + x
+        if x > 0 and distance[index - 1] == current - 1:
+            return x - 1, y
+        if x < width - 1 and distance[index + 1] == current - 1:
+            return x + 1, y
+        if y > 0 and distance[index - width] == current - 1:
+            return x, y - 1
+        if y < grid.height - 1 and distance[index + width] == current - 1:
+            return x, y + 1
+        return None
+
+    def direction_from(self, world_x, world_z):
+        """Return a normalized (dx, dz) world direction toward the next cell, or None if there is no step to take."""
+        grid = self.grid
+        step = self.next_step(*grid.world_to_cell(world_x, world_z))
+        if step is None:
+            return None
+        target_x, target_z = grid.cell_to_world(*step)
+        dx = target_x - world_x
+        dz = target_z - world_z
+        length = (dx * dx + dz * dz) ** 0.5
+        if length == 0:
+            return None
+        return dx / length, dz / length
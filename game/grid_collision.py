@@ -0,0 +1,136 @@
+# game/grid_collision.py
+
+import math
+
+
+class RayHit:
+    """Result of a grid ray cast, shaped like ursina's HitInfo where it matters."""
+
+    def __init__(self, hit=False, distance=math.inf, point=None, normal=None, cell=None):
+        self.hit = hit
+        self.distance = distance
+        self.point = point
+        self.normal = normal
+        self.cell = cell  # Wall cell that was hit, None for floor/ceiling hits
+
+
+NO_HIT = RayHit()
+
+
+class GridCollision:
+    """Static collision queries answered straight from the tile grid.
+
+    Walls are full-height boxes filling their tile, the floor is a plane at floor_y
+    and the roof a plane at wall_height. None of this needs engine colliders, and a
+    ray cast only visits the tiles the ray actually crosses.
+    """
+
+    def __init__(self, grid, wall_height=4, floor_y=0.025):
+        self.grid = grid
+        self.wall_height = wall_height
+        self.floor_y = floor_y
+
+    def cell_at(self, world_x, world_z):
+        return self.grid.world_to_cell(world_x, world_z)
+
+    def is_walkable(self, x, y):
+        return self.grid.is_walkable(x, y)
+
+    def point_in_wall(self, world_x, world_y, world_z):
+        """True if the point is inside a wall tile (anything outside the map counts as wall)."""
+        if world_y < self.floor_y or world_y > self.wall_height:
+            return False
+        return not self.grid.is_walkable(*self.grid.world_to_cell(world_x, world_z))
+
+    def aabb_overlaps_wall(self, min_x, min_z, max_x, max_z):
+        """True if the X/Z box touches any wall tile."""
+        grid = self.grid
+        half = grid.tile_size / 2
+        tile_size = grid.tile_size
+        x0 = math.floor((min_x + half) / tile_size)
+        x1 = math.floor((max_x + half) / tile_size)
+        y0 = math.floor((min_z + half) / tile_size)
+        y1 = math.floor((max_z + half) / tile_size)
+        for y in range(y0, y1 + 1):
+            for x in range(x0, x1 + 1):
+                if not grid.is_walkable(x, y):
+                    return True
+        return False
+
+    def circle_overlaps_wall(self, world_x, world_z, radius):
+        return self.aabb_overlaps_wall(world_x - radius, world_z - radius, world_x + radius, world_z + radius)
+
+    def raycast(self, origin, direction, distance=math.inf, hit_floor=True):
+        """Cast a ray through the grid (DDA traversal) and return the first wall/floor/roof hit.
+
+        origin and direction are (x, y, z) sequences; direction need not be normalized.
+        """
+        ox, oy, oz = origin[0], origin[1], origin[2]
+        dx, dy, dz = direction[0], direction[1], direction[2]
+        length = math.sqrt(dx * dx + dy * dy + dz * dz)
+        if length == 0:
+            return NO_HIT
+        dx, dy, dz = dx / length, dy / length, dz / length
+
+        # Distance to the floor or roof plane, whichever the ray is heading for
+        vertical_t = math.inf
+        vertical_normal = None
+        if dy < 0 and hit_floor:
+            vertical_t = max((self.floor_y - oy) / dy, 0)
+            vertical_normal = (0, 1, 0)
+        elif dy > 0:
+            vertical_t = max((self.wall_height - oy) / dy, 0)
+            vertical_normal = (0, -1, 0)
+        limit = min(distance, vertical_t)
+
+        grid = self.grid
+        tile_size = grid.tile_size
+        half = tile_size / 2
+        cx = math.floor((ox + half) / tile_size)
+        cz = math.floor((oz + half) / tile_size)
+        if not grid.is_walkable(cx, cz):
+            return RayHit(True, 0.0, (ox, oy, oz), None, (cx, cz))
+
+        step_x = 1 if dx > 0 else -1
+        step_z = 1 if dz > 0 else -1
+        if dx != 0:
+            boundary_x = (cx + (1 if dx > 0 else 0)) * tile_size - half
+            t_max_x = (boundary_x - ox) / dx
+            t_delta_x = tile_size / abs(dx)
+        else:
+            t_max_x = t_delta_x = math.inf
+        if dz != 0:
+            boundary_z = (cz + (1 if dz > 0 else 0)) * tile_size - half
+            t_max_z = (boundary_z - oz) / dz
+            t_delta_z = tile_size / abs(dz)
+        else:
+            t_max_z = t_delta_z = math.inf
+
+        while True:
+            if t_max_x < t_max_z:
+                t = t_max_x
+                if t > limit or t == math.inf:
+                    break
+                cx += step_x
+                t_max_x += t_delta_x
+                normal = (-step_x, 0, 0)
+            else:
+                t = t_max_z
+                if t > limit or t == math.inf:
+                    break
+                cz += step_z
+                t_max_z += t_delta_z
+                normal = (0, 0, -step_z)
+            if not grid.is_walkable(cx, cz):
+                return RayHit(True, t, (ox + dx * t, oy + dy * t, oz + dz * t), normal, (cx, cz))
+
+        if vertical_t <= distance:
+            t = vertical_t
+            return RayHit(True, t, (ox + dx * t, oy + dy * t, oz + dz * t), vertical_normal, None)
+        return NO_HIT
+
+    def segment_hit(self, start, end, hit_floor=True):
+        """Ray cast limited to the segment start -> end."""
+        direction = (end[0] - start[0], end[1] - start[1], end[2] - start[2])
+        length = math.sqrt(direction[0] ** 2 + direction[1] ** 2 + direction[2] ** 2)
+        return self.raycast(start, direction, length, hit_floor)
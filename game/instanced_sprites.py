@@ -0,0 +1,140 @@
+# game/instanced_sprites.py
+
+import math
+import os
+import random
+from array import array
+
+from panda3d.core import Filename, GeomEnums, OmniBoundingVolume, Shader, Texture
+from ursina import Entity, Vec3, Vec4, scene
+
+from game import events
+from game.enemy_manager import HeadlessEnemy
+
+SHADER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'shaders')
+FLOATS_PER_INSTANCE = 8  # Two RGBA32F texels, see instanced_sprite_vertex.glsl
+
+
+def load_instanced_sprite_shader():
+    return Shader.load(
+        Shader.SL_GLSL,
+        vertex=Filename.from_os_specific(os.path.join(SHADER_DIR, 'instanced_sprite_vertex.glsl')),
+        fragment=Filename.from_os_specific(os.path.join(SHADER_DIR, 'instanced_sprite_fragment.glsl')),
+    )
+
+
+class InstancedEnemy(HeadlessEnemy):
+    """An enemy with no Entity of its own: its state lives in the EnemyManager and an InstancedSpriteRenderer draws it.
+
+    Offers what the player's attacks and the spawner use on SimpleSpriteEnemy
+    (position, take_damage, apply_knockback with a direction vector, recycling).
+    """
+
+    def __init__(self, manager, x, y, z, on_death=None, animation_phase=None):
+        super().__init__(manager, x, y, z, on_death=on_death)
+        self.animation_phase = random.random() * 16 if animation_phase is None else animation_phase
+
+    @property
+    def position(self):
+        slot = self.enemy_slot
+        if slot is None:
+            return Vec3(0, 0, 0)
+        manager = self.manager
+        return Vec3(manager.x[slot], manager.y[slot], manager.z[slot])
+
+    @property
+    def health(self):
+        return self.manager.health[self.enemy_slot] if self.enemy_slot is not None else 0
+
+    def take_damage(self, amount):
+        if self.enemy_slot is None:
+            return
+        killed = self.manager.damage(self.enemy_slot, amount)
+        if events.DAMAGE.enabled:
+            events.emit(events.DAMAGE, target='enemy', amount=amount, health=self.health)
+        if killed:
+            if events.DEATH.enabled:
+                position = self.position
+                events.emit(events.DEATH, x=round(position.x, 2), z=round(position.z, 2))
+            self.die()
+
+    def apply_knockback(self, direction, force):
+        super().apply_knockback(direction.x, direction.z, force)
+
+
+class InstancedSpriteRenderer:
+    """Draws every enemy of an EnemyManager as one instanced quad: one draw call for the whole swarm.
+
+    Each frame the positions (interpolated by alpha), headings and animation
+    rows of the visible enemies are packed into a float buffer texture; the
+    vertex shader billboards each instance and picks its atlas frame, so an
+    animation step costs no Python at all. The atlas holds frames in columns and
+    animations in rows; state_rows maps enemy AI states to rows.
+    """
+
+    def __init__(self, atlas, columns=1, rows=1, sprite_size=(1.5, 2.5), frame_rate=10, capacity=256,
+                 state_rows=None, fog_color=(0, 0, 0, 1), fog_density=0.05, parent=scene):
+        self.columns = columns
+        self.rows = rows
+        self.state_rows = state_rows or {}
+        self.time = 0.0
+        self.instance_count = 0
+        self.entity = Entity(model='quad', texture=atlas, parent=parent, name='instanced_sprites')
+        self.entity.setShader(load_instanced_sprite_shader())
+        # Instances are placed by the shader, so the quad's own bounds mean nothing to the culler
+        self.entity.node().set_bounds(OmniBoundingVolume())
+        self.entity.node().set_final(True)
+        self.entity.set_shader_input('sprite_size', sprite_size)
+        self.entity.set_shader_input('atlas_grid', (columns, rows))
+        self.entity.set_shader_input('frame_rate', float(frame_rate))
+        self.entity.set_shader_input('time', 0.0)
+        self.entity.set_shader_input('fog_color', Vec4(*fog_color))
+        self.entity.set_shader_input('fog_density', float(fog_density))
+        self.buffer = Texture('instance_data')
+        self.capacity = 0
+        self._reserve(capacity)
+        self.entity.visible = False  # An instance count of 0 would mean "not instanced", so hide instead
+
+    def _reserve(self, capacity):
+        if capacity <= self.capacity:
+            return
+        self.capacity = capacity
+        self.buffer.setup_buffer_texture(capacity * 2, Texture.T_float, Texture.F_rgba32, GeomEnums.UH_dynamic)
+        self.data = array('f', bytes(4 * FLOATS_PER_INSTANCE * capacity))
+        self.entity.set_shader_input('instance_data', self.buffer)
+
+    def update(self, manager, dt, alpha=None, visibility=None):
+        """Upload the visible enemies of manager and advance the shared animation clock."""
+        self.time += dt
+        self.entity.set_shader_input('time', self.time)
+        if manager.count > self.capacity:
+            self._reserve(max(manager.count, self.capacity * 2))
+
+        xs, ys, zs, heading = manager.x, manager.y, manager.z, manager.heading
+        previous_x, previous_y, previous_z = manager.previous_x, manager.previous_y, manager.previous_z
+        states = manager.state
+        entities = manager.entities
+        state_rows = self.state_rows
+        data = self.data
+        radians = math.radians
+        offset = 0
+        for slot in range(manager.count):
+            x, y, z = xs[slot], ys[slot], zs[slot]
+            if alpha is not None:
+                x0, y0, z0 = previous_x[slot], previous_y[slot], previous_z[slot]
+                x, y, z = x0 + (x - x0) * alpha, y0 + (y - y0) * alpha, z0 + (z - z0) * alpha
+            if visibility is not None and not visibility.is_visible_world(x, z):
+                continue
+            data[offset] = x
+            data[offset + 1] = y
+            data[offset + 2] = z
+            data[offset + 3] = radians(heading[slot])
+            data[offset + 4] = getattr(entities[slot], 'animation_phase', slot)
+            data[offset + 5] = state_rows.get(int(states[slot]), 0)
+            offset += FLOATS_PER_INSTANCE
+
+        self.instance_count = offset // FLOATS_PER_INSTANCE
+        self.entity.visible = self.instance_count > 0
+        if self.instance_count:
+            self.buffer.set_ram_image(data.tobytes())
+            self.entity.set_instance_count(self.instance_count)
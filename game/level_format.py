@@ -0,0 +1,246 @@
+# game/level_format.py
+#
+# Packed level files: the tile grid plus everything the game would otherwise
+# derive from it at startup (spawn cells, torch placements, the distance field
+# from the player start, the baked lightmap and the merged chunk meshes).
+#
+# Layout: a fixed header, a section table, then 8-byte aligned little-endian
+# arrays. Loading maps the file and casts the sections in place.
+#
+#     python -m game.level_format build levels/manual.lvl
+#     python -m game.level_format build levels/maze.lvl --size 201 --seed 3 --algorithm wilson
+
+import argparse
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+
+from game.dungeon_generation import generate_dungeon, place_torches
+from game.dungeon_mesh import FLOOR_TILES, MeshData, build_floor_mesh, build_wall_mesh, chunk_bounds
+from game.flow_field import FlowField
+from game.lightmap import bake_lightmap
+from game.maze_generation import ALGORITHMS, spawn_cells
+from game.tile_grid import FLOOR, PLAYER_START, TileGrid, find_player_start
+
+MAGIC = b'DLVL'
+VERSION = 1
+HEADER = struct.Struct('<4sHHIIffIiiI')  # magic, version, flags, width, height, tile_size, wall_height, chunk_size, start x/y, sections
+SECTION = struct.Struct('<4scxxxQQ')  # name, array typecode, offset, item count
+ALIGN = 8
+
+WALL_MESH = 0
+FLOOR_MESH = 1
+
+if sys.byteorder != 'little':  # Sections are stored little-endian and cast in place
+    raise ImportError("level_format only supports little-endian machines")
+
+
+class Level:
+    """A level file mapped into memory. Sections are zero-copy memoryviews into the map."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.width, self.height, self.tile_size, self.wall_height,
+         self.chunk_size, start_x, start_y, section_count) = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a level file")
+        if version != VERSION:
+            self.close()
+            raise ValueError(f"{path} has level format version {version}, expected {VERSION}")
+        self.player_start = (start_x, start_y)
+
+        self._sections = {}
+        view = memoryview(self._map)
+        for i in range(section_count):
+            name, typecode, offset, count = SECTION.unpack_from(self._map, HEADER.size + i * SECTION.size)
+            typecode = typecode.decode()
+            size = array(typecode).itemsize
+            self._sections[name.decode()] = view[offset:offset + count * size].cast(typecode)
+        self._view = view
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for section in getattr(self, '_sections', {}).values():
+            section.release()
+        self._sections = {}
+        if getattr(self, '_view', None) is not None:
+            self._view.release()
+            self._view = None
+        self._map.close()
+        self._file.close()
+
+    def section(self, name):
+        return self._sections[name]
+
+    @property
+    def tiles(self):
+        """Row-major tile codes (the layout legend), one byte per tile."""
+        return self._sections['TILE']
+
+    def layout(self):
+        """The tiles as the list-of-lists layout the rest of the game takes."""
+        tiles = self.tiles
+        width = self.width
+        return [list(tiles[y * width:(y + 1) * width]) for y in range(self.height)]
+
+    def grid(self):
+        return TileGrid.from_tiles(self.width, self.height, self.tiles, self.tile_size)
+
+    @property
+    def spawn_cells(self):
+        """Indices of the floor tiles enemies may spawn on."""
+        return self._sections['SPWN']
+
+    def floor_positions(self):
+        width = self.width
+        tile_size = self.tile_size
+        return [((index % width) * tile_size, 0, (index // width) * tile_size) for index in self.spawn_cells]
+
+    def torch_placements(self):
+        """(x, y, (px, py, pz), rotation_y) per torch, as place_torches returns them."""
+        cells = self._sections['TRCI']
+        values = self._sections['TRCF']
+        return [
+            (cells[2 * i], cells[2 * i + 1], (values[4 * i], values[4 * i + 1], values[4 * i + 2]), values[4 * i + 3])
+            for i in range(len(cells) // 2)
+        ]
+
+    @property
+    def start_distance(self):
+        """BFS steps from the player start per tile (-1 = unreachable)."""
+        return self._sections['DIST']
+
+    @property
+    def lightmap_levels(self):
+        return self._sections.get('LMAP')
+
+    def chunk_meshes(self):
+        """Yield (bounds, kind, MeshData) for every stored chunk mesh, kind being WALL_MESH or FLOOR_MESH."""
+        chunks = self._sections['CHNK']
+        vertices = self._sections['MVTX']
+        uvs = self._sections['MUVS']
+        normals = self._sections['MNRM']
+        colors = self._sections['MCOL']
+        vertex = 0
+        for i in range(0, len(chunks), 6):
+            x0, y0, x1, y1, kind, quads = chunks[i:i + 6]
+            end = vertex + quads * 4
+            mesh = MeshData()
+            mesh.vertices = list(zip(vertices[vertex * 3:end * 3:3], vertices[vertex * 3 + 1:end * 3:3], vertices[vertex * 3 + 2:end * 3:3]))
+            mesh.uvs = list(zip(uvs[vertex * 2:end * 2:2], uvs[vertex * 2 + 1:end * 2:2]))
+            mesh.normals = list(zip(normals[vertex * 3:end * 3:3], normals[vertex * 3 + 1:end * 3:3], normals[vertex * 3 + 2:end * 3:3]))
+            if len(colors):
+                mesh.colors = list(zip(*(colors[vertex * 4 + c:end * 4:4] for c in range(4))))
+            mesh.triangles = [index for q in range(0, quads * 4, 4) for index in (q, q + 1, q + 2, q, q + 2, q + 3)]
+            vertex = end
+            yield (x0, y0, x1, y1), kind, mesh
+
+
+def write_level(path, dungeon_layout, tile_size=4, wall_height=4, chunk_size=16, torch_placements=None, bake_lighting=True):
+    """Derive everything the game needs from a layout once and pack it into a level file."""
+    layout = [list(row) for row in dungeon_layout]
+    start = find_player_start(layout)
+    if start is None:
+        raise ValueError("Player start position not found in dungeon layout!")
+    layout[start[1]][start[0]] = FLOOR
+    height = len(layout)
+    width = len(layout[0])
+
+    tiles = bytearray(tile for row in layout for tile in row)
+    grid = TileGrid.from_tiles(width, height, tiles, tile_size)
+    if torch_placements is None:
+        torch_placements = place_torches(layout, tile_size)
+
+    flow_field = FlowField(grid)
+    flow_field.update(start)
+
+    lightmap = None
+    if bake_lighting:
+        light_cells = [grid.world_to_cell(position[0], position[2]) for _, _, position, _ in torch_placements]
+        lightmap = bake_lightmap(grid, light_cells)
+
+    chunks = array('i')
+    vertices, uvs, normals, colors = array('f'), array('f'), array('f'), array('f')
+    for bounds in chunk_bounds(width, height, chunk_size):
+        for kind, mesh in (
+            (WALL_MESH, build_wall_mesh(layout, tile_size, wall_height, bounds, lightmap)),
+            (FLOOR_MESH, build_floor_mesh(layout, tile_size, 0.025, bounds, lightmap)),
+        ):
+            if not mesh.quad_count:
+                continue
+            chunks.extend((*bounds, kind, mesh.quad_count))
+            vertices.extend(value for vertex in mesh.vertices for value in vertex)
+            uvs.extend(value for uv in mesh.uvs for value in uv)
+            normals.extend(value for normal in mesh.normals for value in normal)
+            colors.extend(value for color in mesh.colors for value in color)
+
+    sections = [
+        ('TILE', array('B', tiles)),
+        ('SPWN', array('I', spawn_cells(tiles, FLOOR_TILES))),
+        ('TRCI', array('i', (value for x, y, _, _ in torch_placements for value in (x, y)))),
+        ('TRCF', array('f', (value for _, _, position, rotation in torch_placements for value in (*position, rotation)))),
+        ('DIST', flow_field.distance),
+        ('CHNK', chunks),
+        ('MVTX', vertices),
+        ('MUVS', uvs),
+        ('MNRM', normals),
+        ('MCOL', colors),
+    ]
+    if lightmap is not None:
+        sections.append(('LMAP', array('B', lightmap.levels)))
+
+    table_end = HEADER.size + SECTION.size * len(sections)
+    offset = (table_end + ALIGN - 1) // ALIGN * ALIGN
+    table = []
+    for name, data in sections:
+        table.append(SECTION.pack(name.encode(), data.typecode.encode(), offset, len(data)))
+        offset += (len(data) * data.itemsize + ALIGN - 1) // ALIGN * ALIGN
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, 0, width, height, tile_size, wall_height, chunk_size, *start, len(sections)))
+        file.write(b''.join(table))
+        for _, data in sections:
+            file.write(b'\0' * (-file.tell() % ALIGN))
+            file.write(data.tobytes())
+    os.replace(temporary, path)
+
+
+def load_level(path):
+    return Level(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build a packed level file.')
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    build = subcommands.add_parser('build', help='Bake a layout into a level file')
+    build.add_argument('output')
+    build.add_argument('--size', type=int, help='Generate a size x size maze instead of using the manual layout')
+    build.add_argument('--seed', type=int, default=0)
+    build.add_argument('--algorithm', choices=ALGORITHMS, default='backtracker')
+    build.add_argument('--tile-size', type=float, default=4)
+    build.add_argument('--chunk-size', type=int, default=16)
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    if args.size:
+        layout, start_x, start_y = generate_dungeon(args.size, args.size, algorithm=args.algorithm, seed=args.seed)
+        layout[start_y][start_x] = PLAYER_START
+    else:
+        from game.manual_dungeon_layout import dungeon_layout as layout
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    write_level(args.output, layout, tile_size=args.tile_size, chunk_size=args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+# game/level_loading.py
+
+import random
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from game.dungeon_generation import generate_dungeon, place_torches
+from game.dungeon_mesh import FLOOR_TILES, build_floor_mesh, build_wall_mesh, chunk_bounds
+from game.flow_field import FlowField
+from game.level_format import FLOOR_MESH, WALL_MESH, load_level
+from game.lightmap import Lightmap, load_or_bake_lightmap
+from game.maze_generation import spawn_cells
+from game.pathfinding import HierarchicalPathfinder
+from game.tile_grid import FLOOR, PLAYER_START, TileGrid, find_player_start
+
+
+class PreparedLevel:
+    """Everything derived from a layout before any entity exists; plain data, safe to build off the main thread."""
+
+    def __init__(self, layout, start, grid, flow_field, torch_placements, lightmap, chunk_meshes, floor_positions,
+                 pathfinder=None, chunk_size=16, wall_height=4):
+        self.layout = layout
+        self.start = start
+        self.grid = grid
+        self.flow_field = flow_field  # Already pointed at the player start
+        self.pathfinder = pathfinder  # HierarchicalPathfinder over grid, for enemy search/wander paths
+        self.torch_placements = torch_placements
+        self.lightmap = lightmap
+        self.chunk_meshes = chunk_meshes  # [(bounds, WALL_MESH or FLOOR_MESH, MeshData)], empty when streaming
+        self.floor_positions = floor_positions
+        self.chunk_size = chunk_size  # Tiles per side of a chunk mesh; visibility culling must use the same
+        self.wall_height = wall_height
+
+    @property
+    def width(self):
+        return self.grid.width
+
+    @property
+    def height(self):
+        return self.grid.height
+
+    @property
+    def tile_size(self):
+        return self.grid.tile_size
+
+
+def prepare_level(dungeon_layout, tile_size=4, wall_height=4, chunk_size=16, seed=None, bake_lighting=True, build_meshes=True):
+    """Do the CPU-heavy part of loading a layout: grid, chase field, path graph, torches, light bake and chunk meshes.
+
+    Pure Python and engine-free, so it can run in a worker thread or process.
+    Pass build_meshes=False when the world is streamed and builds its chunks itself.
+    Torches are rolled from seed, or from the layout itself when seed is None, so
+    a layout always gets the same torches and its light bake comes from the disk
+    cache after the first start.
+    """
+    layout = [list(row) for row in dungeon_layout]
+    start = find_player_start(layout)
+    if start is None:
+        raise ValueError("Player start position not found in dungeon layout!")
+    layout[start[1]][start[0]] = FLOOR
+
+    tiles = bytes(tile for row in layout for tile in row)
+    grid = TileGrid.from_tiles(len(layout[0]), len(layout), tiles, tile_size)
+    flow_field = FlowField(grid)
+    flow_field.update(start)
+    pathfinder = HierarchicalPathfinder(grid, cluster_size=chunk_size)
+
+    torch_placements = place_torches(layout, tile_size, rng=random.Random(seed) if seed is not None else None)
+    lightmap = None
+    if bake_lighting:
+        light_cells = [grid.world_to_cell(position[0], position[2]) for _, _, position, _ in torch_placements]
+        lightmap = load_or_bake_lightmap(grid, light_cells)
+
+    chunk_meshes = []
+    if build_meshes:
+        for bounds in chunk_bounds(grid.width, grid.height, chunk_size):
+            wall_mesh = build_wall_mesh(layout, tile_size, wall_height, bounds, lightmap)
+            if wall_mesh.quad_count:
+                chunk_meshes.append((bounds, WALL_MESH, wall_mesh))
+            floor_mesh = build_floor_mesh(layout, tile_size, 0.025, bounds, lightmap)
+            if floor_mesh.quad_count:
+                chunk_meshes.append((bounds, FLOOR_MESH, floor_mesh))
+
+    width = grid.width
+    floor_positions = [
+        ((index % width) * tile_size, 0, (index // width) * tile_size) for index in spawn_cells(tiles, FLOOR_TILES)
+    ]
+    return PreparedLevel(
+        layout, start, grid, flow_field, torch_placements, lightmap, chunk_meshes, floor_positions, pathfinder, chunk_size,
+        wall_height
+    )
+
+
+def prepare_generated_level(size, seed, algorithm='backtracker', **options):
+    """Generate a size x size maze from a seed and prepare it."""
+    layout, start_x, start_y = generate_dungeon(size, size, algorithm=algorithm, seed=seed)
+    layout[start_y][start_x] = PLAYER_START
+    return prepare_level(layout, seed=seed, **options)
+
+
+def prepare_level_file(path):
+    """Read a packed level file into a PreparedLevel; only the path graph is rebuilt."""
+    with load_level(path) as level:
+        grid = level.grid()
+        flow_field = FlowField(grid)
+        flow_field.target = level.player_start
+        flow_field.distance = array('i', level.start_distance.tobytes())
+        lightmap = None
+        if level.lightmap_levels is not None:
+            lightmap = Lightmap(level.width, level.height, bytearray(level.lightmap_levels))
+        return PreparedLevel(
+            level.layout(), level.player_start, grid, flow_field, level.torch_placements(), lightmap,
+            list(level.chunk_meshes()), level.floor_positions(), HierarchicalPathfinder(grid, cluster_size=level.chunk_size),
+            chunk_size=level.chunk_size, wall_height=level.wall_height
+        )
+
+
+class LevelLoader:
+    """Runs level preparation off the main thread and keeps prefetched levels until they are claimed.
+
+    Defaults to one worker thread; pass a ProcessPoolExecutor to keep the
+    preparation from competing with the render loop for the GIL.
+    """
+
+    def __init__(self, executor=None):
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-loader')
+        self.prefetched = {}
+
+    def submit(self, prepare, *args, **kwargs):
+        return self.executor.submit(prepare, *args, **kwargs)
+
+    def prefetch(self, key, prepare, *args, **kwargs):
+        """Start preparing a level (e.g. the next one) under key, unless it is already on its way."""
+        if key not in self.prefetched:
+            self.prefetched[key] = self.submit(prepare, *args, **kwargs)
+        return self.prefetched[key]
+
+    def claim(self, key):
+        """Return the Future for a prefetched level and forget it, or None if it was never requested."""
+        return self.prefetched.pop(key, None)
+
+    def shutdown(self):
+        for future in self.prefetched.values():
+            future.cancel()
+        self.executor.shutdown(wait=False)
+
+
+class FrameBudgetBuilder:
+    """Drains an iterator of build steps (e.g. a generator creating one entity per step) a few per frame.
+
+    Each process() call stops as soon as frame_budget seconds are spent, so the
+    window stays responsive while a level is being built.
+    """
+
+    def __init__(self, steps, total, frame_budget=0.008, clock=time.perf_counter):
+        self.steps = iter(steps)
+        self.total = max(total, 1)
+        self.done = 0
+        self.finished = False
+        self.frame_budget = frame_budget
+        self.clock = clock
+        self.results = []
+
+    @property
+    def progress(self):
+        return 1.0 if self.finished else min(self.done / self.total, 1.0)
+
+    def process(self):
+        """Run steps until the budget is spent. Returns True while steps remain."""
+        if self.finished:
+            return False
+        deadline = self.clock() + self.frame_budget
+        for result in self.steps:
+            self.results.append(result)
+            self.done += 1
+            if self.clock() >= deadline:
+                return True
+        self.finished = True
+        return False
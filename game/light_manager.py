@@ -0,0 +1,133 @@
+# game/light_manager.py
+
+import heapq
+
+
+class LightSlot:
+    __slots__ = ('light', 'owner', 'brightness', 'target')
+
+    def __init__(self, light):
+        self.light = light
+        self.owner = None
+        self.brightness = 0.0
+        self.target = 0.0
+
+
+class LightManager:
+    """Shares a fixed pool of real lights between any number of light sources.
+
+    Sources (torches) are registered with a world position. Whenever the player
+    changes cell, or sources come and go, the max_lights best sources are picked,
+    nearest first, with sources in cells the player cannot see pushed back by
+    hidden_penalty. Lights fade out of sources that drop from the set and fade
+    into the ones that join it, so the GPU cost is bounded by the pool size no
+    matter how many torches the map has.
+
+    apply_light(light, owner, x, y, z, brightness) pushes a slot's state to the
+    engine; brightness is 0 for a parked light.
+    """
+
+    def __init__(self, lights, apply_light, grid=None, visibility=None, fade_time=0.4, hidden_penalty=4.0, flicker=None):
+        self.slots = [LightSlot(light) for light in lights]
+        self.apply_light = apply_light
+        self.grid = grid
+        self.visibility = visibility
+        self.fade_rate = 1 / fade_time if fade_time > 0 else float('inf')
+        self.hidden_penalty = hidden_penalty
+        self.flicker = flicker  # Optional flicker(owner, time_passed) -> brightness multiplier
+        self.sources = {}  # owner -> (x, y, z, cell)
+        self.time_passed = 0.0
+        self._dirty = True
+        self._player_cell = None
+        self._wanted = set()
+
+        for slot in self.slots:
+            self.apply_light(slot.light, None, 0, 0, 0, 0)
+
+    @property
+    def max_lights(self):
+        return len(self.slots)
+
+    def register(self, owner, x, y, z):
+        cell = self.grid.world_to_cell(x, z) if self.grid else None
+        self.sources[owner] = (x, y, z, cell)
+        self._dirty = True
+
+    def unregister(self, owner):
+        if self.sources.pop(owner, None) is None:
+            return
+        for slot in self.slots:
+            if slot.owner == owner:
+                # The source is gone, so its light cannot fade out in place
+                slot.owner = None
+                slot.brightness = slot.target = 0.0
+                self.apply_light(slot.light, None, 0, 0, 0, 0)
+        self._wanted.discard(owner)
+        self._dirty = True
+
+    def _rank(self, player_x, player_z):
+        visibility = self.visibility
+        penalty = self.hidden_penalty
+
+        def score(item):
+            x, _, z, cell = item[1]
+            distance_sq = (x - player_x) ** 2 + (z - player_z) ** 2
+            if visibility is not None and cell is not None and not visibility.is_visible(*cell):
+                distance_sq *= penalty
+            return distance_sq
+
+        return {owner for owner, _ in heapq.nsmallest(len(self.slots), self.sources.items(), key=score)}
+
+    def _reassign(self, player_x, player_z):
+        self._wanted = wanted = self._rank(player_x, player_z)
+        for slot in self.slots:
+            if slot.owner is not None:
+                slot.target = 1.0 if slot.owner in wanted else 0.0
+        self._assign_free_slots()
+
+    def _assign_free_slots(self):
+        lit = {slot.owner for slot in self.slots if slot.owner is not None}
+        waiting = [owner for owner in self._wanted if owner not in lit]
+        for slot in self.slots:
+            if not waiting:
+                break
+            if slot.owner is None:
+                slot.owner = waiting.pop()
+                slot.brightness = 0.0
+                slot.target = 1.0
+
+    def update(self, dt, player_x, player_z):
+        """Re-rank if needed and advance the fades; touches only the pooled lights."""
+        self.time_passed += dt
+        player_cell = self.grid.world_to_cell(player_x, player_z) if self.grid else (player_x, player_z)
+        if self._dirty or player_cell != self._player_cell:
+            self._player_cell = player_cell
+            self._dirty = False
+            self._reassign(player_x, player_z)
+
+        step = dt * self.fade_rate
+        freed = False
+        for slot in self.slots:
+            if slot.owner is None:
+                continue
+            if slot.brightness < slot.target:
+                slot.brightness = min(slot.brightness + step, slot.target)
+            elif slot.brightness > slot.target:
+                slot.brightness = max(slot.brightness - step, slot.target)
+            if slot.brightness <= 0.0 and slot.target <= 0.0:
+                # Faded out: park the light and let a waiting source take it
+                slot.owner = None
+                self.apply_light(slot.light, None, 0, 0, 0, 0)
+                freed = True
+                continue
+            x, y, z, _ = self.sources[slot.owner]
+            brightness = slot.brightness
+            if self.flicker is not None:
+                brightness *= self.flicker(slot.owner, self.time_passed)
+            self.apply_light(slot.light, slot.owner, x, y, z, brightness)
+        if freed:
+            self._assign_free_slots()
+
+    @property
+    def lit_sources(self):
+        return [slot.owner for slot in self.slots if slot.owner is not None]
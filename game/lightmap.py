@@ -0,0 +1,131 @@
+# game/lightmap.py
+
+import hashlib
+import os
+
+from game.visibility import shadowcast
+
+LEVELS = 16  # Light is quantized so runs of equally lit tiles can still be merged into one quad
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'lightmaps')
+MAX_CACHED_LIGHTMAPS = 16  # Least recently used bakes beyond this are deleted
+
+
+class Lightmap:
+    """Baked torch light per floor tile, quantized to LEVELS steps (0 = ambient only).
+
+    Wall faces take the light of the open tile they face, so a wall between two
+    corridors is only lit on the side the torch can see.
+    """
+
+    def __init__(self, width, height, levels, ambient=0.15, tint=(1.0, 0.7, 0.4)):
+        self.width = width
+        self.height = height
+        self.levels = levels  # bytearray, one level per tile
+        self.ambient = ambient
+        self.tint = tint
+        self._colors = [self._color(level) for level in range(LEVELS)]
+
+    def _color(self, level):
+        light = level / (LEVELS - 1)
+        return tuple(min(self.ambient + light * channel, 1.0) for channel in self.tint) + (1.0,)
+
+    def level_at(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.levels[y * self.width + x]
+        return 0
+
+    def color_at(self, x, y):
+        """Vertex color (r, g, b, a) for a tile, or for a wall face looking into that tile."""
+        return self._colors[self.level_at(x, y)]
+
+
+def bake_lightmap(grid, light_cells, radius=6, intensity=1.0, ambient=0.15):
+    """Accumulate the light of every torch over the floor tiles it can see.
+
+    light_cells are the floor tiles the torches hang over. Occlusion comes from
+    the same symmetric shadowcasting as the visibility culling; falloff is a
+    smooth (1 - d / radius)^2.
+    """
+    width, height = grid.width, grid.height
+    walkable = grid.walkable
+    light = [0.0] * grid.size
+
+    def is_blocking(x, y):
+        return not (0 <= x < width and 0 <= y < height) or not walkable[y * width + x]
+
+    for source_x, source_y in light_cells:
+        if is_blocking(source_x, source_y):
+            continue
+        seen = set()
+
+        def reveal(x, y):
+            if is_blocking(x, y) or (x, y) in seen:
+                return
+            seen.add((x, y))
+            distance = ((x - source_x) ** 2 + (y - source_y) ** 2) ** 0.5
+            falloff = 1 - distance / radius
+            if falloff > 0:
+                light[y * width + x] += intensity * falloff * falloff
+
+        shadowcast((source_x, source_y), is_blocking, reveal, radius)
+
+    top = LEVELS - 1
+    levels = bytearray(min(int(value * top + 0.5), top) for value in light)
+    return Lightmap(width, height, levels, ambient)
+
+
+def lightmap_key(grid, light_cells, radius, intensity):
+    """Hash of everything the bake depends on: layout, torch cells and parameters."""
+    digest = hashlib.sha1()
+    digest.update(f'{grid.width}x{grid.height}:{radius}:{intensity}:{LEVELS}:'.encode())
+    digest.update(bytes(grid.walkable))
+    digest.update(repr(sorted(light_cells)).encode())
+    return digest.hexdigest()
+
+
+def prune_lightmap_cache(cache_dir=DEFAULT_CACHE_DIR, keep=MAX_CACHED_LIGHTMAPS):
+    """Delete all but the keep most recently used cached lightmaps."""
+    try:
+        entries = [entry for entry in os.scandir(cache_dir) if entry.name.endswith('.bin')]
+    except OSError:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def load_or_bake_lightmap(grid, light_cells, radius=6, intensity=1.0, ambient=0.15, cache_dir=DEFAULT_CACHE_DIR,
+                          max_cached=MAX_CACHED_LIGHTMAPS):
+    """Return the lightmap for this layout and torch set, baking and caching it on a miss.
+
+    Pass cache_dir=None to always bake. The cache keeps the max_cached most
+    recently used bakes; a hit refreshes the file's modification time.
+    """
+    if cache_dir is None:
+        return bake_lightmap(grid, light_cells, radius, intensity, ambient)
+
+    path = os.path.join(cache_dir, lightmap_key(grid, light_cells, radius, intensity) + '.bin')
+    try:
+        with open(path, 'rb') as file:
+            levels = bytearray(file.read())
+        if len(levels) == grid.size:
+            os.utime(path)
+            return Lightmap(grid.width, grid.height, levels, ambient)
+    except OSError:
+        pass
+
+    lightmap = bake_lightmap(grid, light_cells, radius, intensity, ambient)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(lightmap.levels)
+        os.replace(temporary, path)
+    except OSError as error:
+        print(f"Could not cache lightmap: {error}")
+    else:
+        prune_lightmap_cache(cache_dir, max_cached)
+    return lightmap
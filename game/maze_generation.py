@@ -0,0 +1,280 @@
+# game/maze_generation.py
+
+import random
+from itertools import compress
+
+from game.tile_grid import FLOOR, WALL
+
+ALGORITHMS = ('backtracker', 'wilson', 'rooms')
+
+# Wall face directions, in the order place_torches prefers them
+WEST, EAST, NORTH, SOUTH = range(4)
+
+
+class MazeGrid:
+    """Row-major tile codes in a bytearray; corridors and rooms are carved one row slice at a time."""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.tiles = bytearray(width * height)  # All WALL
+        self.start = None
+
+    def carve_rect(self, x0, y0, x1, y1, tile=FLOOR):
+        """Set every tile in the inclusive rectangle, clipped to the map."""
+        x0, x1 = max(min(x0, x1), 0), min(max(x0, x1), self.width - 1)
+        y0, y1 = max(min(y0, y1), 0), min(max(y0, y1), self.height - 1)
+        if x0 > x1 or y0 > y1:
+            return
+        span = bytes((tile,)) * (x1 - x0 + 1)
+        width = self.width
+        for y in range(y0, y1 + 1):
+            self.tiles[y * width + x0:y * width + x1 + 1] = span
+
+    def to_layout(self):
+        width = self.width
+        return [list(self.tiles[y * width:(y + 1) * width]) for y in range(self.height)]
+
+
+class Lattice:
+    """The maze cells of a MazeGrid: centers every corridor_width + 1 tiles, walls in between.
+
+    Cells are numbered row-major (index = row * columns + column).
+    """
+
+    def __init__(self, maze, corridor_width):
+        self.maze = maze
+        self.corridor_width = corridor_width
+        self.pitch = corridor_width + 1
+        self.half = corridor_width // 2
+        self.columns = len(range(corridor_width, maze.width, self.pitch))
+        self.rows = len(range(corridor_width, maze.height, self.pitch))
+        self.count = self.columns * self.rows
+
+    def center(self, cell):
+        column, row = cell % self.columns, cell // self.columns
+        return self.corridor_width + column * self.pitch, self.corridor_width + row * self.pitch
+
+    def cell_at(self, column, row):
+        return row * self.columns + column
+
+    def neighbors(self, cell):
+        columns = self.columns
+        column = cell % columns
+        result = []
+        if column > 0:
+            result.append(cell - 1)
+        if column < columns - 1:
+            result.append(cell + 1)
+        if cell >= columns:
+            result.append(cell - columns)
+        if cell < self.count - columns:
+            result.append(cell + columns)
+        return result
+
+    def carve_cell(self, cell):
+        x, y = self.center(cell)
+        self.maze.carve_rect(x - self.half, y - self.half, x + self.half, y + self.half)
+
+    def carve_passage(self, a, b):
+        """Carve both cells and everything between them (same row or column) as one rectangle."""
+        ax, ay = self.center(a)
+        bx, by = self.center(b)
+        if self.half == 0:
+            # One tile wide: a single slice along the row, or a strided slice down the column
+            maze = self.maze
+            width = maze.width
+            start, end = sorted((ay * width + ax, by * width + bx))
+            step = 1 if ay == by else width
+            maze.tiles[start:end + 1:step] = bytes((FLOOR,)) * ((end - start) // step + 1)
+            return
+        half = self.half
+        self.maze.carve_rect(min(ax, bx) - half, min(ay, by) - half, max(ax, bx) + half, max(ay, by) + half)
+
+
+def _padded_size(size, corridor_width):
+    # Same rounding as the original generator: the lattice must end on a cell
+    pitch = corridor_width + 1
+    if size % pitch != 1:
+        size += pitch - (size % pitch)
+    return size
+
+
+def backtracker(lattice, rng):
+    """Recursive backtracker (iterative DFS): long winding corridors, few dead ends."""
+    count, columns = lattice.count, lattice.columns
+    visited = bytearray(count)
+    carve_passage = lattice.carve_passage
+    choice = rng.choice
+    start = rng.randrange(count)
+    visited[start] = 1
+    lattice.carve_cell(start)
+    stack = [start]
+    pop, push = stack.pop, stack.append
+    last_row = count - columns
+    while stack:
+        current = stack[-1]
+        column = current % columns
+        options = []
+        if column > 0 and not visited[current - 1]:
+            options.append(current - 1)
+        if column < columns - 1 and not visited[current + 1]:
+            options.append(current + 1)
+        if current >= columns and not visited[current - columns]:
+            options.append(current - columns)
+        if current < last_row and not visited[current + columns]:
+            options.append(current + columns)
+        if not options:
+            pop()
+            continue
+        chosen = choice(options)
+        visited[chosen] = 1
+        carve_passage(current, chosen)
+        push(chosen)
+    return start
+
+
+def wilson(lattice, rng):
+    """Wilson's algorithm: loop-erased random walks give a uniform spanning tree (unbiased maze)."""
+    count = lattice.count
+    neighbors = lattice.neighbors
+    choice = rng.choice
+    in_maze = bytearray(count)
+    start = rng.randrange(count)
+    in_maze[start] = 1
+    lattice.carve_cell(start)
+
+    order = list(range(count))
+    rng.shuffle(order)
+    next_step = [0] * count
+    for first in order:
+        # Random walk until the maze is hit; overwriting next_step erases the loops
+        cell = first
+        while not in_maze[cell]:
+            step = choice(neighbors(cell))
+            next_step[cell] = step
+            cell = step
+        cell = first
+        while not in_maze[cell]:
+            in_maze[cell] = 1
+            lattice.carve_passage(cell, next_step[cell])
+            cell = next_step[cell]
+    return start
+
+
+def rooms_and_corridors(lattice, rng, room_attempts=None, min_room=2, max_room=5):
+    """Non-overlapping rectangular rooms (in lattice cells), joined in a chain by L-shaped corridors."""
+    columns, rows = lattice.columns, lattice.rows
+    cell_at = lattice.cell_at
+    if room_attempts is None:
+        room_attempts = max(lattice.count // 12, 4)
+    occupied = bytearray(lattice.count)
+    rooms = []
+    for _ in range(room_attempts):
+        w = rng.randint(min_room, max_room)
+        h = rng.randint(min_room, max_room)
+        if w > columns or h > rows:
+            continue
+        c0 = rng.randrange(columns - w + 1)
+        r0 = rng.randrange(rows - h + 1)
+        # Keep one lattice cell between rooms so they stay separate
+        left, right = max(c0 - 1, 0), min(c0 + w + 1, columns)
+        if any(any(occupied[r * columns + left:r * columns + right]) for r in range(max(r0 - 1, 0), min(r0 + h + 1, rows))):
+            continue
+        for r in range(r0, r0 + h):
+            occupied[r * columns + c0:r * columns + c0 + w] = b'\x01' * w
+        rooms.append((c0, r0, w, h))
+    if not rooms:
+        rooms.append((0, 0, min(min_room, columns), min(min_room, rows)))
+
+    half = lattice.half
+    for c0, r0, w, h in rooms:
+        x0, y0 = lattice.center(cell_at(c0, r0))
+        x1, y1 = lattice.center(cell_at(c0 + w - 1, r0 + h - 1))
+        lattice.maze.carve_rect(x0 - half, y0 - half, x1 + half, y1 + half)
+
+    # Chain the rooms in order of their centers so corridors stay short
+    centers = sorted((c0 + w // 2, r0 + h // 2) for c0, r0, w, h in rooms)
+    for (ac, ar), (bc, br) in zip(centers, centers[1:]):
+        corner = (bc, ar) if rng.random() < 0.5 else (ac, br)
+        lattice.carve_passage(cell_at(ac, ar), cell_at(*corner))
+        lattice.carve_passage(cell_at(*corner), cell_at(bc, br))
+    return cell_at(*centers[0])
+
+
+def generate_maze(width, height, algorithm='backtracker', seed=None, corridor_width=1, rng=None):
+    """Generate a MazeGrid with one of ALGORITHMS; the same seed always gives the same map.
+
+    rng may be passed instead of seed (any object with the random.Random API).
+    maze.start is the (x, y) tile of the first carved cell.
+    """
+    if rng is None:
+        rng = random.Random(seed)
+    width = _padded_size(width, corridor_width)
+    height = _padded_size(height, corridor_width)
+    maze = MazeGrid(width, height)
+    lattice = Lattice(maze, corridor_width)
+    if algorithm == 'backtracker':
+        start = backtracker(lattice, rng)
+    elif algorithm == 'wilson':
+        start = wilson(lattice, rng)
+    elif algorithm == 'rooms':
+        start = rooms_and_corridors(lattice, rng)
+    else:
+        raise ValueError(f"Unknown maze algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+    maze.start = lattice.center(start)
+    return maze
+
+
+# Bulk post-processing. A tile mask is a bytes object with one 0/1 byte per tile;
+# loaded into a Python int (one byte per tile, little-endian), shifting by 8 bits
+# moves the whole mask one tile and & / | combine masks without carries.
+
+def _to_int(mask):
+    return int.from_bytes(mask, 'little')
+
+
+def _to_mask(value, size):
+    return value.to_bytes(size, 'little')
+
+
+def mask_indices(mask):
+    """Indices of the set tiles of a 0/1 byte mask."""
+    return list(compress(range(len(mask)), mask))
+
+
+def spawn_cells(tiles, floor_codes=(FLOOR,)):
+    """Indices of the tiles whose code is in floor_codes."""
+    table = bytes(1 if code in floor_codes else 0 for code in range(256))
+    return mask_indices(bytes(tiles).translate(table))
+
+
+def torch_faces(tiles, width, height, floor_codes=(FLOOR,)):
+    """Wall tiles that can hold a torch, as a list of (index, direction) with direction WEST/EAST/NORTH/SOUTH.
+
+    Each wall tile gets at most one face: the first direction (in that order)
+    that has a floor tile next to it, matching place_torches.
+    """
+    size = width * height
+    floor_table = bytes(1 if code in floor_codes else 0 for code in range(256))
+    wall_table = bytes(1 if code == WALL else 0 for code in range(256))
+    floor = _to_int(bytes(tiles).translate(floor_table))
+    wall = _to_int(bytes(tiles).translate(wall_table))
+    ones = _to_int(b'\x01' * size)
+    not_first_column = _to_int((b'\x00' + b'\x01' * (width - 1)) * height)
+    not_last_column = _to_int((b'\x01' * (width - 1) + b'\x00') * height)
+
+    neighbors = (
+        (floor << 8) & not_first_column,  # Tile to the west is floor
+        (floor >> 8) & not_last_column,  # Tile to the east is floor
+        (floor << (8 * width)) & ones,  # Tile to the north (y - 1) is floor
+        floor >> (8 * width),  # Tile to the south (y + 1) is floor
+    )
+    faces = []
+    taken = 0
+    for direction, neighbor in enumerate(neighbors):
+        eligible = wall & neighbor & ~taken & ones
+        taken |= eligible
+        faces.extend((index, direction) for index in mask_indices(_to_mask(eligible, size)))
+    faces.sort()
+    return faces
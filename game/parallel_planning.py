@@ -0,0 +1,160 @@
+# game/parallel_planning.py
+#
+# Path planning for many enemies on a pool of worker processes. The walkability
+# grid and each batch of requests (start and goal cells, i.e. where the enemies
+# are and where they want to go) live in multiprocessing.shared_memory, so a
+# batch costs the workers no pickling beyond a name and a slice. Every worker
+# keeps its own GridPathfinder over the shared grid.
+#
+# Results come back on a later tick: the AIScheduler submits a batch at the end
+# of one tick and applies whatever finished at the start of the next.
+#
+# Only path planning moves to the workers. Perception (line of sight and
+# hearing) and the state changes stay on the main thread under the
+# AIScheduler's thinks_per_frame budget, since they read the player's
+# VisibilityMap and flow field, which change every tick. More cores therefore
+# mean more replans per tick, not more enemies thinking per tick.
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from game.pathfinding import GridPathfinder
+from game.tile_grid import TileGrid
+
+REQUEST_FIELDS = 4  # start x, start y, goal x, goal y
+REQUEST_ITEM_SIZE = array('i').itemsize
+
+_worker_memory = None
+_worker_pathfinder = None
+
+
+def _init_worker(grid_name, width, height, tile_size):
+    global _worker_memory, _worker_pathfinder
+    # Pool workers share the creating process' resource tracker, so attaching does not take ownership
+    _worker_memory = shared_memory.SharedMemory(name=grid_name)
+    grid = TileGrid(width, height, _worker_memory.buf[:width * height], tile_size)
+    _worker_pathfinder = GridPathfinder(grid)
+
+
+def _plan_slice(requests_name, first, count):
+    """Plan requests [first, first + count) of a batch; returns [(request index, path cells)]."""
+    memory = shared_memory.SharedMemory(name=requests_name)
+    requests = memory.buf.cast('i')
+    try:
+        find_path = _worker_pathfinder.find_path
+        results = []
+        for index in range(first, first + count):
+            offset = index * REQUEST_FIELDS
+            start_x, start_y, goal_x, goal_y = requests[offset:offset + REQUEST_FIELDS]
+            results.append((index, find_path((start_x, start_y), (goal_x, goal_y))))
+        return results
+    finally:
+        requests.release()
+        memory.close()
+
+
+class SharedGrid:
+    """A copy of a TileGrid's walkability in shared memory; call sync() after tiles change."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.memory = shared_memory.SharedMemory(create=True, size=max(grid.size, 1))
+        self.sync()
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def sync(self):
+        self.memory.buf[:self.grid.size] = bytes(self.grid.walkable)
+
+    def close(self):
+        self.memory.close()
+        self.memory.unlink()
+
+
+class BatchPlanner:
+    """Queues (key, start cell, goal cell) path requests and plans them in parallel, one batch in flight.
+
+    flush() writes the queued requests to shared memory and hands each worker an
+    equal slice; collect() returns [(key, path)] for a finished batch. Requests
+    queued while a batch is in flight wait for the next flush().
+
+    By default collect() does not block, so a slow batch is applied a few ticks
+    late. With wait=True it blocks until the batch is done, so results always
+    arrive exactly one tick later and seeded runs stay reproducible.
+    """
+
+    def __init__(self, grid, workers=None, min_slice=8, executor=None, wait=False):
+        self.workers = workers or os.cpu_count() or 1
+        self.wait = wait
+        self.min_slice = min_slice  # Smallest slice worth sending to a worker
+        self.shared_grid = SharedGrid(grid)
+        self.executor = executor or ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(self.shared_grid.name, grid.width, grid.height, grid.tile_size)
+        )
+        self.queued = []  # (key, start, goal)
+        self.in_flight = []  # Futures of the current batch
+        self.in_flight_keys = []
+        self._requests = None  # Shared request buffer, grown as needed
+        self.batches = 0
+
+    def __len__(self):
+        return len(self.queued) + len(self.in_flight_keys)
+
+    def request(self, key, start, goal):
+        self.queued.append((key, start, goal))
+
+    def _request_buffer(self, count):
+        size = max(count * REQUEST_FIELDS * REQUEST_ITEM_SIZE, 1)
+        if self._requests is None or self._requests.size < size:
+            if self._requests is not None:
+                self._requests.close()
+                self._requests.unlink()
+            self._requests = shared_memory.SharedMemory(create=True, size=size * 2)
+        return self._requests
+
+    def flush(self):
+        """Start planning the queued requests unless a batch is still running. Returns True if one started."""
+        if self.in_flight or not self.queued:
+            return False
+        batch, self.queued = self.queued, []
+        memory = self._request_buffer(len(batch))
+        values = array('i', (value for _, start, goal in batch for value in (*start, *goal)))
+        memory.buf[:len(values) * REQUEST_ITEM_SIZE] = values.tobytes()
+
+        slice_size = max(-(-len(batch) // self.workers), self.min_slice)
+        self.in_flight = [
+            self.executor.submit(_plan_slice, memory.name, first, min(slice_size, len(batch) - first))
+            for first in range(0, len(batch), slice_size)
+        ]
+        self.in_flight_keys = [key for key, _, _ in batch]
+        self.batches += 1
+        return True
+
+    def collect(self, wait=None):
+        """Return [(key, path cells)] once the batch in flight has finished (or [] while it is running)."""
+        if not self.in_flight:
+            return []
+        if wait is None:
+            wait = self.wait
+        if not wait and not all(future.done() for future in self.in_flight):
+            return []
+        keys = self.in_flight_keys
+        results = [(keys[index], path) for future in self.in_flight for index, path in future.result()]
+        self.in_flight = []
+        self.in_flight_keys = []
+        return results
+
+    def shutdown(self):
+        for future in self.in_flight:
+            future.cancel()
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.shared_grid.close()
+        if self._requests is not None:
+            self._requests.close()
+            self._requests.unlink()
+            self._requests = None
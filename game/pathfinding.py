@@ -1,6 +1,7 @@
 # game/pathfinding.py
 
 import heapq
+from array import array
 
 class Node:
     def __init__(self, x, y, walkable=True):
@@ -68,3 +69,384 @@ def a_star_search(grid, start, end, width, height):
                     heapq.heappush(open_set, neighbor)
 
     return []  # No path found
+
+
+class GridPathfinder:
+    """A* over a TileGrid with reusable, generation-stamped search buffers.
+
+    Per-cell costs and parents live in flat arrays indexed by cell. Instead of
+    clearing them before every query, each search bumps a generation counter and
+    a cell's entries only count if its stamp matches the current generation.
+    Stale heap entries are skipped when popped (lazy deletion), so there is no
+    membership scan of the open list.
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+        size = grid.size
+        self._g = array('i', bytes(4 * size))
+        self._parent = array('i', bytes(4 * size))
+        self._seen = array('I', bytes(4 * size))  # Generation that wrote g/parent
+        self._closed = array('I', bytes(4 * size))  # Generation that expanded the cell
+        self._generation = 0
+
+    def _next_generation(self):
+        self._generation += 1
+        if self._generation > 0xFFFFFFFF:
+            # Stamps wrapped around: clear them once and start over
+            size = self.grid.size
+            self._seen = array('I', bytes(4 * size))
+            self._closed = array('I', bytes(4 * size))
+            self._generation = 1
+        return self._generation
+
+    def find_path(self, start, end):
+        """Return the list of (x, y) cells from start (exclusive) to end (inclusive), or [] if unreachable."""
+        grid = self.grid
+        width = grid.width
+        size = grid.size
+        walkable = grid.walkable
+        sx, sy = start
+        ex, ey = end
+        if not grid.is_walkable(sx, sy) or not grid.is_walkable(ex, ey):
+            return []
+
+        start_index = sy * width + sx
+        end_index = ey * width + ex
+        if start_index == end_index:
+            return []
+
+        generation = self._next_generation()
+        g_cost = self._g
+        parent = self._parent
+        seen = self._seen
+        closed = self._closed
+
+        g_cost[start_index] = 0
+        parent[start_index] = -1
+        seen[start_index] = generation
+        open_set = [(abs(sx - ex) + abs(sy - ey), 0, start_index)]
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        while open_set:
+            _, g, current = heappop(open_set)
+            if closed[current] == generation or g != g_cost[current]:
+                continue  # Stale entry superseded by a cheaper push
+
+            if current == end_index:
+                path = []
+                while current != start_index:
+                    path.append((current % width, current // width))
+                    current = parent[current]
+                path.reverse()
+                return path
+
+            closed[current] = generation
+            cx = current % width
+            tentative_g = g + 1  # Uniform cost
+
+            for neighbor, valid in (
+                (current - 1, cx > 0),
+                (current + 1, cx < width - 1),
+                (current - width, current >= width),
+                (current + width, current < size - width),
+            ):
+                if not valid or not walkable[neighbor] or closed[neighbor] == generation:
+                    continue
+                if seen[neighbor] == generation and g_cost[neighbor] <= tentative_g:
+                    continue
+                seen[neighbor] = generation
+                g_cost[neighbor] = tentative_g
+                parent[neighbor] = current
+                h = abs(neighbor % width - ex) + abs(neighbor // width - ey)
+                heappush(open_set, (tentative_g + h, tentative_g, neighbor))
+
+        return []  # No path found
+
+
+class HierarchicalPathfinder:
+    """HPA*: A* over cluster entrances first, then grid paths one cluster leg at a time.
+
+    The grid is split into cluster_size x cluster_size clusters. Every run of
+    open cells along a shared cluster border gets one entrance (a pair of cells
+    facing each other, cost 1 to cross), and the walking distance between
+    the entrances of a cluster is precomputed with a BFS limited to that cluster.
+    A query links start and end to the entrances of their clusters, searches
+    that small graph, and refines each leg with a search inside one cluster,
+    so only the next leg is refined when iter_path() is consumed lazily.
+
+    Paths are near-optimal, not optimal: a leg never leaves its cluster. Call
+    set_walkable() instead of editing the grid directly to keep the graph current.
+    """
+
+    def __init__(self, grid, cluster_size=16):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.columns = (grid.width + cluster_size - 1) // cluster_size
+        self.rows = (grid.height + cluster_size - 1) // cluster_size
+        size = grid.size
+        self._parent = array('i', bytes(4 * size))
+        self._distance = array('i', bytes(4 * size))
+        self._stamp = array('I', bytes(4 * size))
+        self._generation = 0
+
+        self.borders = {}  # (cluster, east or south neighbour) -> [(cell in cluster, cell in neighbour)]
+        self.transitions = {}  # Entrance cell -> set of cells it crosses to (cost 1)
+        self.entrances = [set() for _ in range(self.columns * self.rows)]
+        self.edges = [{} for _ in range(self.columns * self.rows)]  # Per cluster: cell -> {cell: distance}
+        for cluster in range(self.columns * self.rows):
+            for neighbour, east in self._forward_neighbours(cluster):
+                self._build_border(cluster, neighbour, east)
+        for cluster in range(self.columns * self.rows):
+            self._build_cluster(cluster)
+
+    # Clusters
+
+    def cluster_of(self, index):
+        width = self.grid.width
+        return (index // width) // self.cluster_size * self.columns + (index % width) // self.cluster_size
+
+    def cluster_bounds(self, cluster):
+        """(x0, y0, x1, y1) of a cluster, exclusive upper bounds."""
+        size = self.cluster_size
+        x0 = cluster % self.columns * size
+        y0 = cluster // self.columns * size
+        return x0, y0, min(x0 + size, self.grid.width), min(y0 + size, self.grid.height)
+
+    def _forward_neighbours(self, cluster):
+        """(neighbour, east) for the east and south neighbours of a cluster; east is False for the south one.
+
+        The axis is explicit because a grid one cluster wide has cluster + 1 == cluster + columns.
+        """
+        result = []
+        if cluster % self.columns < self.columns - 1:
+            result.append((cluster + 1, True))
+        if cluster + self.columns < self.columns * self.rows:
+            result.append((cluster + self.columns, False))
+        return result
+
+    def _build_border(self, cluster, neighbour, east):
+        for a, b in self.borders.pop((cluster, neighbour), ()):
+            self.transitions[a].discard(b)
+            self.transitions[b].discard(a)
+        grid = self.grid
+        width = grid.width
+        walkable = grid.walkable
+        x0, y0, x1, y1 = self.cluster_bounds(cluster)
+        if east:
+            cells = [(y * width + x1 - 1, y * width + x1) for y in range(y0, y1)]
+        else:
+            cells = [((y1 - 1) * width + x, y1 * width + x) for x in range(x0, x1)]
+
+        pairs = []
+        run = []
+        for a, b in cells + [(None, None)]:
+            if a is not None and walkable[a] and walkable[b]:
+                run.append((a, b))
+            elif run:
+                pairs.append(run[len(run) // 2])  # One entrance in the middle of each open run
+                run = []
+        self.borders[(cluster, neighbour)] = pairs
+        for a, b in pairs:
+            self.transitions.setdefault(a, set()).add(b)
+            self.transitions.setdefault(b, set()).add(a)
+
+    def _build_cluster(self, cluster):
+        """Recollect a cluster's entrances and the distances between them."""
+        columns = self.columns
+        entrances = set()
+        for neighbour, _ in self._forward_neighbours(cluster):
+            entrances.update(a for a, _ in self.borders[(cluster, neighbour)])
+        if cluster % columns > 0:
+            entrances.update(b for _, b in self.borders[(cluster - 1, cluster)])
+        if cluster >= columns:
+            entrances.update(b for _, b in self.borders[(cluster - columns, cluster)])
+        for cell in self.entrances[cluster] - entrances:
+            if not self.transitions.get(cell):
+                self.transitions.pop(cell, None)
+        self.entrances[cluster] = entrances
+
+        edges = {}
+        for cell in entrances:
+            distances = self._cluster_distances(cell, cluster, entrances)
+            edges[cell] = {other: distance for other, distance in distances.items() if other != cell}
+        self.edges[cluster] = edges
+
+    def set_walkable(self, x, y, walkable):
+        """Change a tile and rebuild only the borders and clusters it can affect."""
+        self.grid.set_walkable(x, y, walkable)
+        cluster = self.cluster_of(self.grid.index(x, y))
+        columns = self.columns
+        touched = {cluster}
+        for neighbour, east in self._forward_neighbours(cluster):
+            self._build_border(cluster, neighbour, east)
+            touched.add(neighbour)
+        if cluster % columns > 0:
+            self._build_border(cluster - 1, cluster, True)
+            touched.add(cluster - 1)
+        if cluster >= columns:
+            self._build_border(cluster - columns, cluster, False)
+            touched.add(cluster - columns)
+        for touched_cluster in touched:
+            self._build_cluster(touched_cluster)
+
+    # Searches limited to one cluster
+
+    def _next_generation(self):
+        self._generation += 1
+        if self._generation > 0xFFFFFFFF:
+            self._stamp = array('I', bytes(4 * self.grid.size))
+            self._generation = 1
+        return self._generation
+
+    def _flood(self, source, cluster, goal=-1, targets=None):
+        """BFS from source inside one cluster, stopping at goal or once every target is reached."""
+        grid = self.grid
+        width = grid.width
+        walkable = grid.walkable
+        x0, y0, x1, y1 = self.cluster_bounds(cluster)
+        generation = self._next_generation()
+        stamp = self._stamp
+        distance = self._distance
+        parent = self._parent
+        stamp[source] = generation
+        distance[source] = 0
+        parent[source] = -1
+        remaining = len(targets) - (source in targets) if targets else -1
+
+        frontier = [source]
+        while frontier and remaining:
+            next_frontier = []
+            append = next_frontier.append
+            for current in frontier:
+                if current == goal:
+                    return
+                cx = current % width
+                cy = current // width
+                next_distance = distance[current] + 1
+                for neighbour, valid in (
+                    (current - 1, cx > x0),
+                    (current + 1, cx < x1 - 1),
+                    (current - width, cy > y0),
+                    (current + width, cy < y1 - 1),
+                ):
+                    if valid and walkable[neighbour] and stamp[neighbour] != generation:
+                        stamp[neighbour] = generation
+                        distance[neighbour] = next_distance
+                        parent[neighbour] = current
+                        append(neighbour)
+                        if targets and neighbour in targets:
+                            remaining -= 1
+            frontier = next_frontier
+
+    def _cluster_distances(self, source, cluster, targets):
+        """{target: steps} for the targets reachable from source without leaving the cluster."""
+        self._flood(source, cluster, targets=targets)
+        generation = self._generation
+        stamp = self._stamp
+        distance = self._distance
+        return {target: distance[target] for target in targets if stamp[target] == generation}
+
+    def _cluster_path(self, start, end, cluster):
+        """Cell indices from start (exclusive) to end inside one cluster, or None."""
+        self._flood(start, cluster, goal=end)
+        if self._stamp[end] != self._generation:
+            return None
+        parent = self._parent
+        path = []
+        current = end
+        while current != start:
+            path.append(current)
+            current = parent[current]
+        path.reverse()
+        return path
+
+    # Queries
+
+    def abstract_path(self, start, end):
+        """Entrance cells (as indices) a path from start to end passes, with both ends; None if unreachable."""
+        grid = self.grid
+        width = grid.width
+        if not grid.is_walkable(*start) or not grid.is_walkable(*end):
+            return None
+        start_index = start[1] * width + start[0]
+        end_index = end[1] * width + end[0]
+        start_cluster = self.cluster_of(start_index)
+        end_cluster = self.cluster_of(end_index)
+
+        start_links = self._cluster_distances(start_index, start_cluster, self.entrances[start_cluster] | {end_index})
+        if start_cluster == end_cluster and end_index in start_links:
+            return [start_index, end_index]
+        start_links.pop(end_index, None)
+        end_links = self._cluster_distances(end_index, end_cluster, self.entrances[end_cluster])
+
+        ex, ey = end
+        edges = self.edges
+        transitions = self.transitions
+        cluster_of = self.cluster_of
+        g_cost = {start_index: 0}
+        parent = {start_index: None}
+        closed = set()
+        open_set = [(0, 0, start_index)]
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        while open_set:
+            _, g, current = heappop(open_set)
+            if current in closed or g != g_cost[current]:
+                continue
+            if current == end_index:
+                path = []
+                while current is not None:
+                    path.append(current)
+                    current = parent[current]
+                path.reverse()
+                return path
+            closed.add(current)
+
+            if current == start_index:
+                links = list(start_links.items())  # Replaces the start's own intra-cluster edges
+            else:
+                links = list(edges[cluster_of(current)].get(current, {}).items())
+            links.extend((other, 1) for other in transitions.get(current, ()))
+            if current in end_links:
+                links.append((end_index, end_links[current]))
+            for neighbour, cost in links:
+                if neighbour in closed:
+                    continue
+                tentative_g = g + cost
+                if tentative_g >= g_cost.get(neighbour, tentative_g + 1):
+                    continue
+                g_cost[neighbour] = tentative_g
+                parent[neighbour] = current
+                h = abs(neighbour % width - ex) + abs(neighbour // width - ey)
+                heappush(open_set, (tentative_g + h, tentative_g, neighbour))
+        return None
+
+    def iter_path(self, start, end):
+        """Yield the (x, y) cells from start (exclusive) to end, refining one abstract leg at a time."""
+        abstract = self.abstract_path(start, end)
+        if abstract is None:
+            return
+        width = self.grid.width
+        for a, b in zip(abstract, abstract[1:]):
+            if b in self.transitions.get(a, ()):
+                yield b % width, b // width  # Border crossing: neighbouring cells
+                continue
+            for cell in self._cluster_path(a, b, self.cluster_of(a)) or ():
+                yield cell % width, cell // width
+
+    def find_path(self, start, end):
+        """Return the list of (x, y) cells from start (exclusive) to end (inclusive), or [] if unreachable.
+
+        Same contract as GridPathfinder.find_path, so the two are interchangeable.
+        """
+        if start == end:
+            return []
+        return list(self.iter_path(start, end))
+
+    def next_waypoint(self, start, end):
+        """The first cell to step to from start toward end (None if unreachable); only the first leg is refined."""
+        if start == end:
+            return None
+        return next(self.iter_path(start, end), None)
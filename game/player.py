@@ -3,6 +3,7 @@ from ursina import (
     Text, camera, application, color, Entity, load_texture, held_keys, raycast, Vec3, invoke, time, sin, cos
 )
 
+from game import events
 from game.BaseEnemy import BaseEnemy
 from game.projectile import Projectile
 
@@ -24,6 +25,17 @@ class Player(FirstPersonController):
         self.attack_cooldown = 0.5  # Cooldown in seconds for melee
         self.last_attack_time = 0  # Time of the last attack
 
+        # Optional GridCollision for walls/floors built without engine colliders
+        self.grid_collision = None
+        self.collision_radius = 0.5
+
+        # Optional SpatialHash of enemies, used for melee hits instead of a scene raycast
+        self.enemy_index = None
+        self.enemy_hit_radius = 0.75
+
+        # Optional ProjectilePool; without one each shot spawns a Projectile entity
+        self.projectile_pool = None
+
         # Weapon selection (1: Spear, 2: Projectile)
         self.weapon = 1  # Default to spear
         self.weapon_name_text = Text(
@@ -74,7 +86,8 @@ class Player(FirstPersonController):
     def reduce_health(self, amount):
         """Reduce player's health when hit by an enemy."""
         self.health -= amount
-        print(f"Player took {amount} damage. Remaining health: {self.health}")
+        if events.DAMAGE.enabled:
+            events.emit(events.DAMAGE, target='player', amount=amount, health=self.health)
 
         # Update the health display
         self.health_text.text = f'Health: {self.health}'
@@ -82,7 +95,8 @@ class Player(FirstPersonController):
         # Check if player's health drops to zero or below
         if self.health <= 0:
             self.health = 0
-            print("Player died. Game over.")
+            if events.GAME_OVER.enabled:
+                events.emit(events.GAME_OVER, reason='player died')
             self.game_over()
 
     def game_over(self):
@@ -114,48 +128,60 @@ class Player(FirstPersonController):
 
     def attack(self):
         """Player performs a melee attack with the spear."""
-        print("Player is attacking with spear")
+        if events.PLAYER_ACTION.enabled:
+            events.emit(events.PLAYER_ACTION, action='spear')
 
         # Adjust the attack origin to be at chest/weapon level
         attack_origin = self.position + Vec3(0, self.height * 0.8, 0)  # Adjust to player's head/weapon level
         attack_direction = self.forward  # Forward direction from the player
 
-        # Perform a raycast to detect entities within attack range
-        hit_info = raycast(
-            origin=attack_origin,
-            direction=attack_direction,
-            distance=self.attack_range,
-            ignore=(self,),  # Ignore the player itself
-            debug=True  # Visualize the raycast line for debugging
-        )
+        # Walls without colliders still block the spear: cut the reach at the first wall
+        attack_distance = self.attack_range
+        if self.grid_collision:
+            attack_distance = min(attack_distance, self.grid_collision.raycast(attack_origin, attack_direction, attack_distance, hit_floor=False).distance)
+
+        if self.enemy_index is not None:
+            # Sweep the spear through the enemy spatial hash instead of ray casting the scene
+            attack_end = attack_origin + attack_direction * attack_distance
+            hits = self.enemy_index.query_segment(attack_origin.x, attack_origin.z, attack_end.x, attack_end.z, self.enemy_hit_radius)
+            hit_entity = hits[0][1] if hits else None
+        else:
+            # Perform a raycast to detect entities within attack range
+            hit_info = raycast(
+                origin=attack_origin,
+                direction=attack_direction,
+                distance=attack_distance,
+                ignore=(self,),  # Ignore the player itself
+                debug=True  # Visualize the raycast line for debugging
+            )
+            hit_entity = hit_info.entity if hit_info.hit else None
 
         # Check if we hit anything
-        if hit_info.hit:
-            print(f"Hit entity: {hit_info.entity}, Type: {type(hit_info.entity)}")
+        if hit_entity:
+            if events.HIT.enabled:
+                events.emit(events.HIT, source='spear', target=type(hit_entity).__name__)
 
             # Ensure the hit entity is a valid enemy and can take damage
-            if hasattr(hit_info.entity, 'take_damage'):
-                print("Hit an enemy, dealing damage")
+            if hasattr(hit_entity, 'take_damage'):
 
                 # Capture enemy's position before applying damage
-                enemy_position = hit_info.entity.position
+                enemy_position = hit_entity.position
 
                 # Apply damage to the enemy
-                hit_info.entity.take_damage(self.attack_damage)  # Apply damage to the enemy
+                hit_entity.take_damage(self.attack_damage)  # Apply damage to the enemy
 
                 # Check if the enemy is still enabled before applying knockback
-                if hit_info.entity.enabled:
+                if hit_entity.enabled:
                     knockback_direction = enemy_position - self.position  # Knockback direction away from player
-                    hit_info.entity.apply_knockback(knockback_direction, self.knockback_force)
-                else:
-                    print("Enemy was destroyed before knockback could be applied")
-            else:
-                print("Hit entity is not an enemy")
-        else:
-            print("No hit detected")
+                    hit_entity.apply_knockback(knockback_direction, self.knockback_force)
+        elif events.HIT.enabled:
+            events.emit(events.HIT, source='spear', target=None)
 
     def update(self):
+        previous_position = self.position
         super().update()
+        if self.grid_collision:
+            self.resolve_wall_collision(previous_position)
 
         # Apply camera bobbing effect when player is moving
         if held_keys['w'] or held_keys['a'] or held_keys['s'] or held_keys['d']:
@@ -164,6 +190,19 @@ class Player(FirstPersonController):
             # Reset camera position when not moving
             camera.position = Vec3(camera.position.x, self.original_camera_y, camera.position.z)
 
+    def resolve_wall_collision(self, previous_position):
+        """Keep the player out of wall tiles, sliding along them one axis at a time."""
+        radius = self.collision_radius
+        overlaps = self.grid_collision.circle_overlaps_wall
+        if not overlaps(self.x, self.z, radius):
+            return
+        if not overlaps(self.x, previous_position.z, radius):
+            self.z = previous_position.z
+        elif not overlaps(previous_position.x, self.z, radius):
+            self.x = previous_position.x
+        else:
+            self.x, self.z = previous_position.x, previous_position.z
+
     def apply_camera_bob(self):
         """Applies a smooth camera bobbing effect based on player movement."""
         self.bob_phase += self.bob_speed * time.dt
@@ -195,21 +234,30 @@ class Player(FirstPersonController):
         if key == '1':
             self.weapon = 1
             self.weapon_name_text.text = 'Weapon: Spear'
-            print("Spear selected")
+            if events.PLAYER_ACTION.enabled:
+                events.emit(events.PLAYER_ACTION, action='select', weapon='spear')
 
         if key == '2':
             self.weapon = 2
             self.weapon_name_text.text = 'Weapon: Projectile'
-            print("Projectile selected")
+            if events.PLAYER_ACTION.enabled:
+                events.emit(events.PLAYER_ACTION, action='select', weapon='projectile')
 
     def fire_projectile(self):
         """Create and fire a projectile from the player."""
         direction = self.forward  # Fire in the forward direction of the player
         position = self.position + Vec3(0, 1, 0)  # Adjust for player height
 
+        if self.projectile_pool is not None:
+            slot = self.projectile_pool.fire(position, direction)
+            if events.PLAYER_ACTION.enabled:
+                events.emit(events.PLAYER_ACTION, action='fire', fired=slot is not None)
+            return
+
         # Create a new projectile
-        projectile = Projectile(position=position, direction=direction)
-        print(f"Fired projectile from {position} in direction {direction}")
+        projectile = Projectile(position=position, direction=direction, grid_collision=self.grid_collision, enemy_index=self.enemy_index)
+        if events.PLAYER_ACTION.enabled:
+            events.emit(events.PLAYER_ACTION, action='fire', fired=True)
 
 
 # Ensure this function is at the module level
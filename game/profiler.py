@@ -0,0 +1,226 @@
+# game/profiler.py
+#
+# Per-frame timing of named scopes, counters and GC pauses, kept for the last
+# `history` frames so percentiles can be read at any time and the frames can be
+# dumped to CSV/JSON for offline analysis. Engine-free; the on-screen view is
+# game/profiler_overlay.py.
+#
+#     with profiler.scope('enemies'):
+#         game.update_enemies()
+#
+# While disabled, scope() hands back one shared no-op context manager and
+# instrumented methods are restored to the originals, so the cost is one
+# attribute check per scope.
+
+import csv
+import gc
+import json
+import math
+import time
+from collections import deque
+
+FRAME = 'frame'  # Scope name of the whole frame (begin_frame to begin_frame)
+GC = 'gc'  # Scope name the garbage collector pauses are recorded under
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = self.profiler.clock()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_time(self.name, self.profiler.clock() - self.started)
+        return False
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (0.0 for an empty one)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(fraction * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+class Profiler:
+    """Rolling per-frame timings (seconds) per scope, plus per-frame counters."""
+
+    def __init__(self, history=600, clock=time.perf_counter):
+        self.history = history
+        self.clock = clock
+        self.enabled = False
+        self.frames = deque(maxlen=history)  # (times by scope, counters) per finished frame
+        self.frame_count = 0
+        self._times = {}
+        self._counters = {}
+        self._frame_started = None
+        self._gc_started = None
+        self._instrumented = []  # (owner, attribute, original, scope name)
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._frame_started = None
+        gc.callbacks.append(self._on_gc)
+        for owner, attribute, original, name in self._instrumented:
+            setattr(owner, attribute, self._wrap(original, name))
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        for owner, attribute, original, _ in self._instrumented:
+            setattr(owner, attribute, original)
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    # Recording
+
+    def scope(self, name):
+        """Context manager timing its body under name (adds up when entered several times per frame)."""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Scope(self, name)
+
+    def add_time(self, name, seconds):
+        times = self._times
+        times[name] = times.get(name, 0.0) + seconds
+
+    def count(self, name, value):
+        """Record a per-frame counter, e.g. live enemies or draw calls."""
+        if self.enabled:
+            self._counters[name] = value
+
+    def begin_frame(self):
+        """Close the previous frame (its length includes rendering) and start a new one."""
+        if not self.enabled:
+            return
+        now = self.clock()
+        if self._frame_started is not None:
+            self._times[FRAME] = now - self._frame_started
+            self.frames.append((self._times, self._counters))
+            self.frame_count += 1
+        self._times = {}
+        self._counters = dict(self._counters)  # Counters not updated this frame keep their last value
+        self._frame_started = now
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._gc_started = self.clock()
+        elif self._gc_started is not None:
+            self.add_time(GC, self.clock() - self._gc_started)
+            self._gc_started = None
+
+    # Hooks
+
+    def instrument(self, owner, attribute, name=None):
+        """Time every call of owner.attribute (a class or module function) under name while enabled.
+
+        The wrapper is only installed while the profiler is enabled, so a
+        disabled profiler leaves the original function in place.
+        """
+        original = getattr(owner, attribute)
+        name = name or f'{getattr(owner, "__name__", owner)}.{attribute}'
+        self._instrumented.append((owner, attribute, original, name))
+        if self.enabled:
+            setattr(owner, attribute, self._wrap(original, name))
+
+    def _wrap(self, function, name):
+        profiler = self
+
+        def timed(*args, **kwargs):
+            started = profiler.clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.add_time(name, profiler.clock() - started)
+
+        timed.__wrapped__ = function
+        return timed
+
+    # Reading
+
+    def scope_names(self):
+        names = []
+        for times, _ in self.frames:
+            for name in times:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def counter_names(self):
+        names = []
+        for _, counters in self.frames:
+            for name in counters:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def percentiles(self, name, fractions=(0.5, 0.95, 0.99)):
+        """Per-frame time of a scope at each fraction over the history (frames without it count as 0)."""
+        values = sorted(times.get(name, 0.0) for times, _ in self.frames)
+        return tuple(percentile(values, fraction) for fraction in fractions)
+
+    def latest_counters(self):
+        return dict(self.frames[-1][1]) if self.frames else {}
+
+    def summary(self):
+        """{scope: (p50, p95, p99)} in seconds, frame first."""
+        names = self.scope_names()
+        names.sort(key=lambda name: name != FRAME)
+        return {name: self.percentiles(name) for name in names}
+
+    # Trace dumps
+
+    def rows(self):
+        """One dict per recorded frame: the frame index, every scope in ms and every counter."""
+        scopes = self.scope_names()
+        counters = self.counter_names()
+        first = self.frame_count - len(self.frames)
+        for offset, (times, frame_counters) in enumerate(self.frames):
+            row = {'frame': first + offset}
+            for name in scopes:
+                row[f'{name}_ms'] = round(times.get(name, 0.0) * 1000, 4)
+            for name in counters:
+                row[name] = frame_counters.get(name)
+            yield row
+
+    def dump(self, path):
+        """Write the recorded frames to path; .json gives a list of rows, anything else CSV."""
+        rows = list(self.rows())
+        if path.endswith('.json'):
+            with open(path, 'w') as file:
+                json.dump(rows, file, indent=1)
+            return path
+        with open(path, 'w', newline='') as file:
+            fields = list(rows[0]) if rows else ['frame']
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
@@ -0,0 +1,62 @@
+# game/profiler_overlay.py
+
+import time as wall_time
+
+from ursina import Entity, Text, camera, color, scene
+
+from game.profiler import FRAME
+
+
+def count_geom_nodes(root):
+    """Visible GeomNodes under root: each is at least one draw call."""
+    return sum(1 for node in root.find_all_matches('**/+GeomNode') if not node.is_hidden())
+
+
+class ProfilerOverlay(Entity):
+    """Text panel in camera.ui with p50/p95/p99 per profiler scope and the latest counters.
+
+    toggle_key turns the profiler and the panel on and off, dump_key writes the
+    recorded frames to dump_path. Scene counts (entities, GeomNodes) are sampled
+    every refresh_interval seconds, not every frame.
+    """
+
+    def __init__(self, profiler, toggle_key='f3', dump_key='f4', dump_path='profile_trace.csv', refresh_interval=0.5, **kwargs):
+        super().__init__(**kwargs)
+        self.profiler = profiler
+        self.toggle_key = toggle_key
+        self.dump_key = dump_key
+        self.dump_path = dump_path
+        self.refresh_interval = refresh_interval
+        self.next_refresh = 0
+        self.panel = Text(
+            text='', position=(0.35, 0.48), scale=0.9, color=color.white, background=True,
+            parent=camera.ui, enabled=profiler.enabled
+        )
+
+    def input(self, key):
+        if key == self.toggle_key:
+            self.panel.enabled = self.profiler.toggle()
+        elif key == self.dump_key and self.profiler.frames:
+            self.panel.text = f'Trace written to {self.profiler.dump(self.dump_path)}'
+            self.next_refresh = wall_time.perf_counter() + 2 * self.refresh_interval
+
+    def update(self):
+        profiler = self.profiler
+        if not profiler.enabled:
+            return
+        now = wall_time.perf_counter()
+        if now < self.next_refresh:
+            return
+        self.next_refresh = now + self.refresh_interval
+        profiler.count('entities', len(scene.entities))
+        profiler.count('geom_nodes', count_geom_nodes(scene))
+
+        lines = [f'{"scope":<18}{"p50":>7}{"p95":>7}{"p99":>7}  ms']
+        for name, (p50, p95, p99) in profiler.summary().items():
+            lines.append(f'{name:<18}{p50 * 1000:>7.2f}{p95 * 1000:>7.2f}{p99 * 1000:>7.2f}')
+        frame_p50 = profiler.percentiles(FRAME)[0]
+        if frame_p50:
+            lines.append(f'fps (p50 frame)   {1 / frame_p50:>7.1f}')
+        for name, value in profiler.latest_counters().items():
+            lines.append(f'{name:<18}{value:>7}')
+        self.panel.text = '\n'.join(lines)
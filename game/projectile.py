@@ -2,43 +2,66 @@
 from ursina import *
 from typing import TYPE_CHECKING
 
+from game import events
+
 
 class Projectile(Entity):
-    def __init__(self, position, direction, **kwargs):
+    def __init__(self, position, direction, grid_collision=None, enemy_index=None, **kwargs):
         super().__init__(
             model='sphere',
             color=color.yellow,
             scale=0.2,
             position=position,
-            collider='sphere',  # Ensures the projectile has a collider
+            collider=None if enemy_index is not None else 'sphere',  # The enemy index replaces the collider
             **kwargs
         )
         self.direction = direction.normalized()
         self.speed = 20  # Speed of the projectile
+        self.grid_collision = grid_collision  # Optional GridCollision for walls/floors without colliders
+        self.enemy_index = enemy_index  # Optional SpatialHash of enemies to test hits against
+        self.hit_radius = 0.85  # Enemy half-width plus the projectile radius
 
     def update(self):
         # Move the projectile in the given direction
-        self.position += self.direction * self.speed * time.dt
+        step = self.direction * self.speed * time.dt
+        if self.grid_collision and self.grid_collision.raycast(self.position, self.direction, step.length()).hit:
+            if events.PROJECTILE_EXPIRE.enabled:
+                events.emit(events.PROJECTILE_EXPIRE, reason='wall')
+            destroy(self)
+            return
+        start = self.position
+        self.position += step
 
         # Destroy the projectile if it is too far away from the camera/player
         if distance(self.position, camera.position) > 50:
-            print(f"Projectile destroyed due to range limit.")
+            if events.PROJECTILE_EXPIRE.enabled:
+                events.emit(events.PROJECTILE_EXPIRE, reason='range')
             destroy(self)
             return  # Prevent further execution after destruction
 
+        if self.enemy_index is not None:
+            # Only enemies near the segment travelled this frame are tested
+            hits = self.enemy_index.query_segment(start.x, start.z, self.x, self.z, self.hit_radius)
+            if hits:
+                enemy = hits[0][1]
+                if events.HIT.enabled:
+                    events.emit(events.HIT, source='projectile', target=type(enemy).__name__)
+                enemy.take_damage(25)  # Apply 25 damage to the enemy
+                destroy(self)
+            return
+
         # Check for collision with any entity
         hit_info = self.intersects()
         if hit_info.hit:
-            print(f"Projectile hit entity: {hit_info.entity}, Type: {type(hit_info.entity)}")
+            if events.HIT.enabled:
+                events.emit(events.HIT, source='projectile', target=type(hit_info.entity).__name__)
 
             # Check if the hit entity has the 'take_damage' method (i.e., it's an enemy)
             if hasattr(hit_info.entity, 'take_damage') and hit_info.entity.enabled:
-                print("Projectile hit an enemy! Applying damage...")
                 hit_info.entity.take_damage(25)  # Apply 25 damage to the enemy
                 destroy(self)
                 return  # Prevent further execution after destruction
             else:
-                print("Projectile hit something, but it's not an enemy.")
                 # Optionally destroy the projectile if it hits something else
                 destroy(self)
                 return  # Prevent further execution after destruction
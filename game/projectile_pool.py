@@ -0,0 +1,165 @@
+# game/projectile_pool.py
+
+import math
+from array import array
+
+from game import events
+
+
+class ProjectilePool:
+    """Fixed-capacity projectile store with a batched per-frame step.
+
+    Live projectiles are packed in slots [0, count) of flat arrays. Entities, when an
+    entity_factory is given, are created once up front and only enabled/disabled as
+    slots are used, so firing never allocates. Each step tests the whole segment a
+    projectile travels that frame against walls (GridCollision) and enemies
+    (SpatialHash), so fast projectiles cannot tunnel through thin sprites.
+    """
+
+    COLUMNS = ('x', 'y', 'z', 'direction_x', 'direction_y', 'direction_z', 'travelled',
+               'previous_x', 'previous_y', 'previous_z')
+
+    def __init__(self, capacity=64, grid_collision=None, enemy_index=None, entity_factory=None):
+        self.capacity = capacity
+        self.grid_collision = grid_collision
+        self.enemy_index = enemy_index
+        self.speed = 20  # Same as Projectile
+        self.damage = 25
+        self.max_range = 50
+        self.hit_radius = 0.85  # Enemy half-width plus the projectile radius
+        self.enemy_height = 2.5
+
+        self.count = 0
+        for name in self.COLUMNS:
+            setattr(self, name, array('d', [0.0]) * capacity)
+        self.entities = [entity_factory() for _ in range(capacity)] if entity_factory else None
+
+    def __len__(self):
+        return self.count
+
+    def fire(self, position, direction):
+        """Launch a projectile. Returns its slot, or None if every projectile is in flight."""
+        if self.count == self.capacity:
+            return None
+        dx, dy, dz = direction[0], direction[1], direction[2]
+        length = math.sqrt(dx * dx + dy * dy + dz * dz)
+        if length == 0:
+            return None
+        slot = self.count
+        self.count += 1
+        self.x[slot], self.y[slot], self.z[slot] = position[0], position[1], position[2]
+        self.previous_x[slot], self.previous_y[slot], self.previous_z[slot] = position[0], position[1], position[2]
+        self.direction_x[slot] = dx / length
+        self.direction_y[slot] = dy / length
+        self.direction_z[slot] = dz / length
+        self.travelled[slot] = 0.0
+        if self.entities:
+            entity = self.entities[slot]
+            entity.position = (position[0], position[1], position[2])
+            entity.enabled = True
+        return slot
+
+    def release(self, slot):
+        """Return a projectile to the pool, moving the last live one into its slot."""
+        last = self.count - 1
+        if slot != last:
+            for name in self.COLUMNS:
+                column = getattr(self, name)
+                column[slot] = column[last]
+            if self.entities:
+                # Swap entities too so enabled entities stay packed at the front
+                self.entities[slot], self.entities[last] = self.entities[last], self.entities[slot]
+        if self.entities:
+            self.entities[last].enabled = False
+        self.count = last
+
+    def snapshot(self):
+        """Remember the current positions as the previous tick's, for interpolated syncs."""
+        count = self.count
+        self.previous_x[:count] = self.x[:count]
+        self.previous_y[:count] = self.y[:count]
+        self.previous_z[:count] = self.z[:count]
+
+    def step(self, dt):
+        """Move every live projectile and resolve wall/enemy hits along its swept segment."""
+        xs, ys, zs = self.x, self.y, self.z
+        dir_x, dir_y, dir_z = self.direction_x, self.direction_y, self.direction_z
+        travelled = self.travelled
+        grid_collision = self.grid_collision
+        enemy_index = self.enemy_index
+        travel = self.speed * dt
+        hit_radius = self.hit_radius
+        enemy_height = self.enemy_height
+        max_range = self.max_range
+        log_hits = events.HIT.enabled
+        log_expiry = events.PROJECTILE_EXPIRE.enabled
+
+        expired = []
+        enemy_hits = []
+        for slot in range(self.count):
+            x, y, z = xs[slot], ys[slot], zs[slot]
+            end_x = x + dir_x[slot] * travel
+            end_y = y + dir_y[slot] * travel
+            end_z = z + dir_z[slot] * travel
+
+            # Fraction of this frame's segment at which the projectile stops
+            stop_t = 1.0
+            if grid_collision is not None:
+                wall = grid_collision.raycast((x, y, z), (dir_x[slot], dir_y[slot], dir_z[slot]), travel)
+                if wall.hit:
+                    stop_t = wall.distance / travel if travel else 0.0
+
+            hit_enemy = None
+            if enemy_index is not None:
+                for t, enemy in enemy_index.query_segment(x, z, end_x, end_z, hit_radius):
+                    if t > stop_t:
+                        break
+                    hit_y = y + (end_y - y) * t
+                    if 0 <= hit_y <= enemy_height:
+                        hit_enemy = enemy
+                        stop_t = t
+                        break
+
+            if hit_enemy is not None:
+                enemy_hits.append(hit_enemy)
+                expired.append(slot)
+                if log_hits:
+                    events.emit(events.HIT, source='projectile', target=type(hit_enemy).__name__)
+                continue
+            if stop_t < 1.0:
+                expired.append(slot)
+                if log_expiry:
+                    events.emit(events.PROJECTILE_EXPIRE, reason='wall')
+                continue
+
+            xs[slot], ys[slot], zs[slot] = end_x, end_y, end_z
+            travelled[slot] += travel
+            if travelled[slot] > max_range:
+                expired.append(slot)
+                if log_expiry:
+                    events.emit(events.PROJECTILE_EXPIRE, reason='range')
+
+        # Release from the back so swap-removal never moves a slot still waiting to be released
+        for slot in reversed(expired):
+            self.release(slot)
+
+        damage = self.damage
+        for enemy in enemy_hits:
+            if enemy.enabled:
+                enemy.take_damage(damage)
+        return enemy_hits
+
+    def sync_entities(self, alpha=None):
+        """Copy live projectile positions onto their entities, blended from the last snapshot() by alpha if given."""
+        if not self.entities:
+            return
+        xs, ys, zs = self.x, self.y, self.z
+        entities = self.entities
+        if alpha is None:
+            for slot in range(self.count):
+                entities[slot].position = (xs[slot], ys[slot], zs[slot])
+            return
+        previous_x, previous_y, previous_z = self.previous_x, self.previous_y, self.previous_z
+        for slot in range(self.count):
+            x0, y0, z0 = previous_x[slot], previous_y[slot], previous_z[slot]
+            entities[slot].position = (x0 + (xs[slot] - x0) * alpha, y0 + (ys[slot] - y0) * alpha, z0 + (zs[slot] - z0) * alpha)
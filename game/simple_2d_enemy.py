@@ -1,9 +1,10 @@
 from ursina import BoxCollider, Vec3, time, destroy
+from game import events
 from game.BaseEnemy import BaseEnemy  # Ensure you are importing BaseEnemy
 
 class SimpleSpriteEnemy(BaseEnemy):  # Make sure it inherits from BaseEnemy
-    def __init__(self, player, position=(0, 0, 0), texture='assets/textures/enemy.png', **kwargs):
-        super().__init__(player, position=position, texture=texture, **kwargs)
+    def __init__(self, player, position=(0, 0, 0), texture='assets/textures/enemy.png', flow_field=None, manager=None, **kwargs):
+        super().__init__(player, position=position, texture=texture, flow_field=flow_field, **kwargs)
         self.model = 'quad'
         self.double_sided = True
         self.scale = Vec3(1.5, 2.5, 1)  # Adjust size
@@ -16,29 +17,47 @@ class SimpleSpriteEnemy(BaseEnemy):  # Make sure it inherits from BaseEnemy
         self.knockback = 0  # Initialize knockback force
         self.knockback_direction = Vec3(0, 0, 0)  # Initialize knockback direction
 
+        # When an EnemyManager is given, it simulates this enemy and only pushes transforms back
+        self.manager = manager
+        self.enemy_slot = None
+        self.recycle = None  # Set by EnemySpawner: called instead of destroy() so the entity can be reused
+        if manager is not None:
+            manager.add(self.x, self.y, self.z, entity=self, health=self.health)
+            self.ignore = True  # Skip the per-entity update() call
+
     def take_damage(self, damage):
         """Handles the enemy taking damage."""
-        self.health -= damage
-        print(f"Enemy took {damage} damage. Remaining health: {self.health}")
-        if self.health <= 0:
+        if self.manager is not None:
+            if self.enemy_slot is None:
+                return  # Already dead, e.g. hit by two projectiles in the same frame
+            killed = self.manager.damage(self.enemy_slot, damage)
+            self.health = self.manager.health[self.enemy_slot]
+        else:
+            self.health -= damage
+            killed = self.health <= 0
+        if events.DAMAGE.enabled:
+            events.emit(events.DAMAGE, target='enemy', amount=damage, health=self.health)
+        if killed:
             self.die()
 
     def apply_knockback(self, knockback_direction, knockback_force):
         """Apply knockback to the enemy."""
+        if self.manager is not None:
+            if self.enemy_slot is not None:
+                self.manager.apply_knockback(self.enemy_slot, knockback_direction.x, knockback_direction.z, knockback_force)
+            return
         self.knockback = knockback_force
         self.knockback_direction = knockback_direction.normalized()
 
     def update(self):
         """Handles enemy movement and knockback."""
-        super().update()  # Ensure the base update logic (like gravity) is executed
+        self.apply_gravity()
 
-        # Apply knockback if any
+        # Apply knockback if any, otherwise keep moving toward the player
         if self.knockback > 0:
             self.position += self.knockback_direction * self.knockback * time.dt
             self.knockback -= time.dt * 10  # Reduce knockback over time
-
-        # Ensure the enemy continues moving toward the player after knockback wears off
-        if self.knockback <= 0:
+        else:
             self.move_towards_player()
 
         # Make the sprite face the player
@@ -46,5 +65,21 @@ class SimpleSpriteEnemy(BaseEnemy):  # Make sure it inherits from BaseEnemy
 
     def die(self):
         """Handle enemy death."""
-        print(f"Enemy at {self.position} died.")
-        destroy(self)
+        if events.DEATH.enabled:
+            events.emit(events.DEATH, x=round(self.x, 2), z=round(self.z, 2))
+        if self.manager is not None and self.enemy_slot is not None:
+            self.manager.remove(self.enemy_slot)
+        if self.recycle is not None:
+            self.recycle(self)
+        else:
+            destroy(self)
+
+    def respawn(self, x, y, z):
+        """Bring a recycled enemy back to life at a new position."""
+        self.position = Vec3(x, y, z)
+        self.health = 100
+        self.knockback = 0
+        self.velocity_y = 0
+        self.enabled = True
+        if self.manager is not None:
+            self.manager.add(x, y, z, entity=self, health=self.health)
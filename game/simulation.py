@@ -0,0 +1,285 @@
+# game/simulation.py
+
+import argparse
+import json
+import math
+import random
+import time
+
+from game.enemy_ai import AIScheduler
+from game.enemy_manager import EnemyManager, HeadlessEnemy
+from game.flow_field import FlowField
+from game.grid_collision import GridCollision
+from game.parallel_planning import BatchPlanner
+from game.projectile_pool import ProjectilePool
+from game.spatial_hash import SpatialHash
+from game.spawner import EnemySpawner
+from game.tile_grid import FLOOR, TileGrid, find_player_start
+from game.visibility import VisibilityMap
+
+
+class SimulationClock:
+    """Injected clock: time only moves when the simulation ticks it."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, dt):
+        self.now += dt
+
+
+class HeadlessPlayer:
+    """Player state and stats matching game/player.py, without the first person controller."""
+
+    def __init__(self, x, z):
+        self.x = x
+        self.z = z
+        self.health = 100
+        self.speed = 5
+        self.radius = 0.5
+        self.attack_damage = 50
+        self.attack_range = 5.0
+        self.attack_cooldown = 0.5
+        self.last_attack_time = -math.inf
+        self.fire_cooldown = 0.25  # Stands in for how fast a human can click
+        self.last_fire_time = -math.inf
+        self.knockback_force = 15
+        self.facing_x = 0.0
+        self.facing_z = 1.0
+
+    def reduce_health(self, amount):
+        self.health = max(self.health - amount, 0)
+
+
+def turret_controller(simulation):
+    """Default bot: stand still, face the nearest enemy, stab it in reach or shoot it otherwise."""
+    player = simulation.player
+    nearest = simulation.enemy_index.nearest(player.x, player.z, 1)
+    if not nearest:
+        return
+    distance, enemy = nearest[0]
+    manager = simulation.enemy_manager
+    dx = manager.x[enemy.enemy_slot] - player.x
+    dz = manager.z[enemy.enemy_slot] - player.z
+    if distance > 0:
+        player.facing_x, player.facing_z = dx / distance, dz / distance
+    if distance <= player.attack_range:
+        simulation.player_attack()
+    else:
+        simulation.player_fire()
+
+
+class Simulation:
+    """Headless, deterministic game core: player, enemies, projectiles and spawning at a fixed timestep.
+
+    Uses the same EnemyManager, ProjectilePool, EnemySpawner, FlowField and grid
+    collision as the windowed game, but with a seeded RNG and an injected clock
+    so a run can be replayed exactly and stepped as fast as the CPU allows.
+    """
+
+    def __init__(self, dungeon_layout, seed=0, tick_rate=30, controller=turret_controller, tile_size=4, wall_height=4,
+                 enemy_ai=True, view_radius=16, planner_workers=0):
+        layout = [list(row) for row in dungeon_layout]
+        start = find_player_start(layout)
+        if start is None:
+            raise ValueError("Player start position not found in dungeon layout!")
+        layout[start[1]][start[0]] = FLOOR
+        self.layout = layout
+
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.clock = SimulationClock()
+        self.dt = 1 / tick_rate
+        self.tick_count = 0
+        self.controller = controller
+
+        self.grid = TileGrid.from_layout(layout, tile_size=tile_size)
+        self.collision = GridCollision(self.grid, wall_height=wall_height)
+        self.flow_field = FlowField(self.grid)
+        self.enemy_index = SpatialHash(cell_size=tile_size)
+        self.enemy_manager = EnemyManager(
+            flow_field=self.flow_field, attack_callback=self.on_enemy_attack, spatial_hash=self.enemy_index
+        )
+        self.projectiles = ProjectilePool(grid_collision=self.collision, enemy_index=self.enemy_index)
+        self.visibility = None
+        self.enemy_ai = None
+        self.planner = None
+        if enemy_ai:
+            # Enemies perceive the player through the player's own (symmetric) field of view
+            self.visibility = VisibilityMap(self.grid, radius=view_radius)
+            # Waiting for each batch keeps worker-planned runs as reproducible as single-process ones
+            self.planner = BatchPlanner(self.grid, workers=planner_workers, wait=True) if planner_workers else None
+            self.enemy_ai = AIScheduler(
+                self.enemy_manager, self.grid, can_see=self.visibility.is_visible_world, rng=self.rng,
+                planner=self.planner, replans_per_frame=16 if self.planner is not None else 2
+            )
+
+        spawn_positions = [
+            self.grid.cell_to_world(x, y)
+            for y in range(self.grid.height) for x in range(self.grid.width)
+            if self.grid.is_walkable(x, y)
+        ]
+        self.spawner = EnemySpawner(
+            spawn_positions, self.enemy_manager, self.create_enemy, spatial_hash=self.enemy_index,
+            rng=self.rng, frame_budget=math.inf, clock=self.clock
+        )
+
+        self.player = HeadlessPlayer(*self.grid.cell_to_world(*start))
+
+        # Spawn ramp, same numbers as Game in main.py
+        self.enemy_spawn_rate = 2
+        self.spawn_interval = 5
+        self.spawn_increment_time = 60
+        self.next_spawn_time = self.spawn_interval
+        self.last_increment_time = 0.0
+
+        self.kills = 0
+        self.shots = 0
+        self.game_over = False
+        self.spawner.request(self.enemy_spawn_rate)
+
+    def create_enemy(self, x, y, z):
+        return HeadlessEnemy(self.enemy_manager, x, y, z, on_death=self.on_enemy_death)
+
+    def on_enemy_attack(self, slot, damage):
+        self.player.reduce_health(damage)
+        if self.player.health <= 0:
+            self.game_over = True
+
+    def on_enemy_death(self, enemy):
+        self.kills += 1
+
+    def move_player(self, direction_x, direction_z):
+        """Walk the player one tick in a direction, sliding along walls."""
+        length = math.hypot(direction_x, direction_z)
+        if length == 0:
+            return
+        player = self.player
+        step = player.speed * self.dt / length
+        new_x = player.x + direction_x * step
+        new_z = player.z + direction_z * step
+        overlaps = self.collision.circle_overlaps_wall
+        if not overlaps(new_x, new_z, player.radius):
+            player.x, player.z = new_x, new_z
+        elif not overlaps(new_x, player.z, player.radius):
+            player.x = new_x
+        elif not overlaps(player.x, new_z, player.radius):
+            player.z = new_z
+
+    def player_attack(self):
+        """Spear attack along the facing direction, with the same cooldown, reach and knockback as Player."""
+        player = self.player
+        now = self.clock.now
+        if now - player.last_attack_time < player.attack_cooldown:
+            return False
+        player.last_attack_time = now
+
+        origin = (player.x, 1.6, player.z)
+        direction = (player.facing_x, 0, player.facing_z)
+        reach = min(player.attack_range, self.collision.raycast(origin, direction, player.attack_range, hit_floor=False).distance)
+        hits = self.enemy_index.query_segment(
+            player.x, player.z, player.x + player.facing_x * reach, player.z + player.facing_z * reach,
+            self.enemy_manager.radius
+        )
+        if not hits:
+            return False
+        enemy = hits[0][1]
+        enemy.take_damage(player.attack_damage)
+        if enemy.enemy_slot is not None:
+            enemy.apply_knockback(player.facing_x, player.facing_z, player.knockback_force)
+        return True
+
+    def player_fire(self):
+        player = self.player
+        now = self.clock.now
+        if now - player.last_fire_time < player.fire_cooldown:
+            return False
+        if self.projectiles.fire((player.x, 1, player.z), (player.facing_x, 0, player.facing_z)) is None:
+            return False
+        player.last_fire_time = now
+        self.shots += 1
+        return True
+
+    def update_spawn_logic(self):
+        now = self.clock.now
+        if now >= self.next_spawn_time:
+            self.spawner.request(self.enemy_spawn_rate)
+            self.next_spawn_time = now + self.spawn_interval
+        if now - self.last_increment_time >= self.spawn_increment_time:
+            self.enemy_spawn_rate += 2
+            self.last_increment_time = now
+
+    def tick(self):
+        """Advance the whole game by one fixed timestep."""
+        player = self.player
+        if self.controller:
+            self.controller(self)
+        player_cell = self.grid.world_to_cell(player.x, player.z)
+        self.flow_field.update(player_cell)
+        if self.enemy_ai:
+            self.visibility.update(player_cell)
+            self.enemy_ai.tick(self.clock.now, player.x, player.z)
+        self.enemy_manager.step(self.dt, player.x, player.z, self.clock.now)
+        self.projectiles.step(self.dt)
+        self.update_spawn_logic()
+        self.spawner.process(player.x, player.z)
+        self.clock.advance(self.dt)
+        self.tick_count += 1
+
+    def run(self, ticks=None, seconds=None, stop_on_game_over=True):
+        """Run for a number of ticks (or simulated seconds) and return a stats dict."""
+        if ticks is None:
+            ticks = int(round((seconds or 0) / self.dt))
+        started = time.perf_counter()
+        for _ in range(ticks):
+            if stop_on_game_over and self.game_over:
+                break
+            self.tick()
+        return self.stats(time.perf_counter() - started)
+
+    def close(self):
+        """Stop the planner's worker processes, if any."""
+        if self.planner is not None:
+            self.planner.shutdown()
+            self.planner = None
+
+    def stats(self, wall_seconds=None):
+        stats = {
+            'seed': self.seed,
+            'ticks': self.tick_count,
+            'simulated_seconds': round(self.clock.now, 6),
+            'enemies_alive': len(self.enemy_manager),
+            'kills': self.kills,
+            'shots': self.shots,
+            'player_health': self.player.health,
+            'game_over': self.game_over,
+        }
+        if wall_seconds is not None:
+            stats['wall_seconds'] = round(wall_seconds, 6)
+            stats['speedup'] = round(self.clock.now / wall_seconds, 2) if wall_seconds else None
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the game logic headless at a fixed timestep.')
+    parser.add_argument('--seconds', type=float, default=300, help='Simulated seconds to run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tick-rate', type=int, default=30, help='Simulation ticks per second')
+    parser.add_argument('--no-ai', action='store_true', help='Enemies always chase instead of perceiving the player')
+    parser.add_argument('--planner-workers', type=int, default=0, help='Plan enemy paths on this many worker processes')
+    args = parser.parse_args(argv)
+
+    from game.manual_dungeon_layout import dungeon_layout
+    simulation = Simulation(dungeon_layout, seed=args.seed, tick_rate=args.tick_rate, enemy_ai=not args.no_ai,
+                            planner_workers=args.planner_workers)
+    try:
+        print(json.dumps(simulation.run(seconds=args.seconds)))
+    finally:
+        simulation.close()
+
+
+if __name__ == '__main__':
+    main()
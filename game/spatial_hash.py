@@ -0,0 +1,178 @@
+# game/spatial_hash.py
+
+import heapq
+import math
+
+
+class SpatialHash:
+    """Uniform grid index over the X/Z plane, bucketed by dungeon cell.
+
+    Objects are registered with a position and only change bucket when they cross
+    a cell boundary, so moving actors costs a dict lookup per update. Queries only
+    look at the buckets their area touches.
+    """
+
+    def __init__(self, cell_size=4):
+        self.cell_size = cell_size
+        self.buckets = {}
+        self.positions = {}  # obj -> (x, z)
+        self.cells = {}  # obj -> bucket key
+        # Buckets are dicts used as insertion-ordered sets, so iteration order is reproducible
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, obj):
+        return obj in self.positions
+
+    def key(self, x, z):
+        # Buckets line up with dungeon tiles, which are centered on multiples of cell_size
+        half = self.cell_size / 2
+        return math.floor((x + half) / self.cell_size), math.floor((z + half) / self.cell_size)
+
+    def insert(self, obj, x, z):
+        key = self.key(x, z)
+        self.positions[obj] = (x, z)
+        self.cells[obj] = key
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = bucket = {}
+        bucket[obj] = None
+
+    def remove(self, obj):
+        key = self.cells.pop(obj, None)
+        if key is None:
+            return
+        del self.positions[obj]
+        bucket = self.buckets[key]
+        del bucket[obj]
+        if not bucket:
+            del self.buckets[key]
+
+    def move(self, obj, x, z):
+        """Update an object's position, re-bucketing only when it changes cell."""
+        old_key = self.cells.get(obj)
+        if old_key is None:
+            self.insert(obj, x, z)
+            return
+        self.positions[obj] = (x, z)
+        key = self.key(x, z)
+        if key == old_key:
+            return
+        bucket = self.buckets[old_key]
+        del bucket[obj]
+        if not bucket:
+            del self.buckets[old_key]
+        self.cells[obj] = key
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = bucket = {}
+        bucket[obj] = None
+
+    def clear(self):
+        self.buckets.clear()
+        self.positions.clear()
+        self.cells.clear()
+
+    def _keys_in_box(self, min_x, min_z, max_x, max_z):
+        x0, z0 = self.key(min_x, min_z)
+        x1, z1 = self.key(max_x, max_z)
+        buckets = self.buckets
+        for bz in range(z0, z1 + 1):
+            for bx in range(x0, x1 + 1):
+                bucket = buckets.get((bx, bz))
+                if bucket:
+                    yield bucket
+
+    def query_radius(self, x, z, radius):
+        """Return the objects within radius of (x, z)."""
+        result = []
+        radius_sq = radius * radius
+        positions = self.positions
+        for bucket in self._keys_in_box(x - radius, z - radius, x + radius, z + radius):
+            for obj in bucket:
+                ox, oz = positions[obj]
+                if (ox - x) ** 2 + (oz - z) ** 2 <= radius_sq:
+                    result.append(obj)
+        return result
+
+    def any_within(self, x, z, radius):
+        """True if at least one object is within radius of (x, z)."""
+        radius_sq = radius * radius
+        positions = self.positions
+        for bucket in self._keys_in_box(x - radius, z - radius, x + radius, z + radius):
+            for obj in bucket:
+                ox, oz = positions[obj]
+                if (ox - x) ** 2 + (oz - z) ** 2 <= radius_sq:
+                    return True
+        return False
+
+    def query_segment(self, start_x, start_z, end_x, end_z, radius):
+        """Return (t, obj) pairs, sorted by t in [0, 1], for objects within radius of the segment."""
+        seg_x = end_x - start_x
+        seg_z = end_z - start_z
+        length_sq = seg_x * seg_x + seg_z * seg_z
+        radius_sq = radius * radius
+        positions = self.positions
+        hits = []
+        for bucket in self._keys_in_box(
+            min(start_x, end_x) - radius, min(start_z, end_z) - radius,
+            max(start_x, end_x) + radius, max(start_z, end_z) + radius
+        ):
+            for obj in bucket:
+                ox, oz = positions[obj]
+                if length_sq:
+                    t = ((ox - start_x) * seg_x + (oz - start_z) * seg_z) / length_sq
+                    t = 0.0 if t < 0 else 1.0 if t > 1 else t
+                else:
+                    t = 0.0
+                px = start_x + seg_x * t - ox
+                pz = start_z + seg_z * t - oz
+                if px * px + pz * pz <= radius_sq:
+                    hits.append((t, obj))
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+
+    def nearest(self, x, z, k=1, max_radius=None):
+        """Return up to k (distance, obj) pairs closest to (x, z), searching outward ring by ring."""
+        if not self.positions:
+            return []
+        cell_size = self.cell_size
+        center_x, center_z = self.key(x, z)
+        positions = self.positions
+        buckets = self.buckets
+        if max_radius is None:
+            max_ring = max(
+                max(abs(bx - center_x), abs(bz - center_z)) for bx, bz in buckets
+            )
+        else:
+            max_ring = int(math.ceil(max_radius / cell_size)) + 1
+
+        best = []  # Max-heap of (-distance_sq, order, obj) holding the k closest so far
+        order = 0
+        ring = 0
+        while ring <= max_ring:
+            for bz in range(center_z - ring, center_z + ring + 1):
+                edge = bz == center_z - ring or bz == center_z + ring
+                step = 1 if edge else 2 * ring
+                for bx in range(center_x - ring, center_x + ring + 1, step or 1):
+                    bucket = buckets.get((bx, bz))
+                    if not bucket:
+                        continue
+                    for obj in bucket:
+                        ox, oz = positions[obj]
+                        distance_sq = (ox - x) ** 2 + (oz - z) ** 2
+                        if max_radius is not None and distance_sq > max_radius * max_radius:
+                            continue
+                        order += 1
+                        entry = (-distance_sq, -order, obj)
+                        if len(best) < k:
+                            heapq.heappush(best, entry)
+                        elif distance_sq < -best[0][0]:
+                            heapq.heapreplace(best, entry)
+            # Everything in rings further out is at least ring * cell_size away
+            if len(best) == k and -best[0][0] <= (ring * cell_size) ** 2:
+                break
+            ring += 1
+
+        return [(math.sqrt(-neg_sq), obj) for neg_sq, _, obj in sorted(best, reverse=True)]
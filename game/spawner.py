@@ -0,0 +1,89 @@
+# game/spawner.py
+
+import random
+import time
+
+from game import events
+
+
+class EnemySpawner:
+    """Pooled enemy lifecycle with a precomputed spawn index and a per-frame spawn budget.
+
+    Dead enemies are disabled and parked in a free list instead of destroyed, and
+    are revived in place on the next spawn. Spawn requests are queued and worked
+    off a few at a time so a big wave is spread over several frames.
+    """
+
+    def __init__(self, spawn_positions, manager, enemy_factory, spatial_hash=None, rng=None,
+                 safe_radius=8, frame_budget=0.002, clock=time.perf_counter):
+        self.spawn_positions = list(spawn_positions)  # World (x, z) of every floor tile
+        self.manager = manager
+        self.enemy_factory = enemy_factory  # Called as enemy_factory(x, y, z) for a brand new enemy
+        self.spatial_hash = spatial_hash
+        self.rng = rng or random.Random()
+        self.safe_radius = safe_radius  # No spawns this close to the player
+        self.frame_budget = frame_budget  # Seconds of spawning work allowed per frame
+        self.clock = clock
+        self.spawn_y = 1
+        self.max_attempts = 16
+
+        self.free = []  # Dead enemies waiting to be reused
+        self.pending = 0
+
+    def request(self, count):
+        """Queue enemies to be spawned over the next frames."""
+        self.pending += count
+
+    def pick_position(self, player_x, player_z):
+        """Pick a random floor tile away from the player and not occupied by another enemy."""
+        positions = self.spawn_positions
+        if not positions:
+            return None
+        safe_radius_sq = self.safe_radius * self.safe_radius
+        occupied_radius = self.manager.radius * 2
+        spatial_hash = self.spatial_hash
+        choice = self.rng.choice
+        for _ in range(self.max_attempts):
+            x, z = choice(positions)
+            if (x - player_x) ** 2 + (z - player_z) ** 2 <= safe_radius_sq:
+                continue
+            if spatial_hash is not None and spatial_hash.any_within(x, z, occupied_radius):
+                continue
+            return x, z
+        return None
+
+    def spawn(self, x, z):
+        """Spawn one enemy, reusing a dead one when possible."""
+        reused = bool(self.free)
+        if reused:
+            enemy = self.free.pop()
+            enemy.respawn(x, self.spawn_y, z)
+        else:
+            enemy = self.enemy_factory(x, self.spawn_y, z)
+        enemy.recycle = self.release
+        if events.SPAWN.enabled:
+            events.emit(events.SPAWN, x=x, z=z, reused=reused)
+        return enemy
+
+    def release(self, enemy):
+        """Take a dead enemy out of the simulation and keep it for reuse."""
+        enemy.enabled = False
+        self.free.append(enemy)
+
+    def process(self, player_x, player_z):
+        """Spawn queued enemies until the queue is empty or this frame's budget is spent."""
+        if not self.pending:
+            return 0
+        clock = self.clock
+        deadline = clock() + self.frame_budget
+        spawned = 0
+        while self.pending:
+            position = self.pick_position(player_x, player_z)
+            if position is None:
+                break  # Nowhere safe right now; retry next frame
+            self.spawn(*position)
+            self.pending -= 1
+            spawned += 1
+            if clock() >= deadline:
+                break
+        return spawned
@@ -0,0 +1,81 @@
+# game/tile_grid.py
+
+import math
+
+# Legend (same as manual_dungeon_layout.py):
+# 0 - Wall
+# 1 - Floor
+# 3 - Torch
+# 4 - Player
+WALL = 0
+FLOOR = 1
+TORCH = 3
+PLAYER_START = 4
+
+_WALKABLE_TABLE = bytes([0] + [1] * 255)  # Tile code -> walkable byte, for bytes.translate
+
+
+class TileGrid:
+    """Compact row-major walkability grid built from a dungeon layout."""
+
+    def __init__(self, width, height, walkable, tile_size=4):
+        self.width = width
+        self.height = height
+        self.walkable = walkable  # bytearray, one byte per cell, 1 = walkable
+        self.tile_size = tile_size  # World units per tile (cell_size * floor_tile_size)
+
+    @classmethod
+    def from_layout(cls, dungeon_layout, tile_size=4):
+        """Build a grid from a list-of-lists layout; every non-wall tile is walkable."""
+        height = len(dungeon_layout)
+        width = len(dungeon_layout[0]) if height else 0
+        walkable = bytearray(width * height)
+        for y, row in enumerate(dungeon_layout):
+            offset = y * width
+            for x, tile in enumerate(row):
+                if tile != WALL:
+                    walkable[offset + x] = 1
+        return cls(width, height, walkable, tile_size)
+
+    @classmethod
+    def from_tiles(cls, width, height, tiles, tile_size=4):
+        """Build a grid from row-major tile codes (bytes or a byte memoryview) in one bulk translate."""
+        return cls(width, height, bytearray(bytes(tiles).translate(_WALKABLE_TABLE)), tile_size)
+
+    @property
+    def size(self):
+        return self.width * self.height
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def coords(self, index):
+        return index % self.width, index // self.width
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def is_walkable(self, x, y):
+        """Return True if the cell is inside the grid and not a wall."""
+        return 0 <= x < self.width and 0 <= y < self.height and self.walkable[y * self.width + x] == 1
+
+    def set_walkable(self, x, y, walkable):
+        self.walkable[y * self.width + x] = 1 if walkable else 0
+
+    def world_to_cell(self, world_x, world_z):
+        """Map a world position to the tile it stands on (tiles are centered on x * tile_size)."""
+        half = self.tile_size / 2
+        return math.floor((world_x + half) / self.tile_size), math.floor((world_z + half) / self.tile_size)
+
+    def cell_to_world(self, x, y):
+        """Return the world X/Z of a tile's center."""
+        return x * self.tile_size, y * self.tile_size
+
+
+def find_player_start(dungeon_layout):
+    """Return the (x, y) of the first player start tile, or None if the layout has none."""
+    for y, row in enumerate(dungeon_layout):
+        for x, tile in enumerate(row):
+            if tile == PLAYER_START:
+                return x, y
+    return None
@@ -0,0 +1,81 @@
+# game/torches.py
+
+import math
+
+from PIL import Image
+from panda3d.core import TextureStage
+from ursina import Entity, Texture, Vec2
+
+
+def build_atlas(frames):
+    """Paste the animation frames side by side into one texture (frame i covers u in [i/n, (i+1)/n])."""
+    images = [Image.open(frame.path).convert('RGBA') for frame in frames]
+    width, height = images[0].size
+    atlas = Image.new('RGBA', (width * len(images), height))
+    for i, image in enumerate(images):
+        atlas.paste(image.resize((width, height)), (i * width, 0))
+    return Texture(atlas)
+
+
+def flicker_intensity(phase, time_passed, min_intensity=0.6, max_intensity=1.0):
+    """Deterministic flicker in [min_intensity, max_intensity]; two detuned sines keep torches out of step."""
+    wave = math.sin(time_passed * 7.3 + phase * 6.283) * 0.6 + math.sin(time_passed * 13.1 + phase * 17.9) * 0.4
+    return min_intensity + (max_intensity - min_intensity) * (wave * 0.5 + 0.5)
+
+
+class TorchSystem:
+    """Animates every torch through one shared atlas material.
+
+    Torches are parented to a handful of phase groups. Each group carries the UV
+    scale and offset that select the current atlas frame, so advancing the
+    animation (and the sprite flicker) touches one node per group instead of one
+    per torch, and the engine billboards each torch during culling instead of a
+    Python look_at.
+    """
+
+    def __init__(self, torch_frames, frame_delay=0.3, phase_groups=3):
+        self.atlas = build_atlas(torch_frames)
+        self.frame_count = len(torch_frames)
+        self.frame_delay = frame_delay
+        self.frame_index = 0
+        self.frame_timer = 0
+        self.time_passed = 0
+        self.groups = [Entity(name=f'torch_group_{i}') for i in range(phase_groups)]
+        frame_scale = Vec2(1 / self.frame_count, 1)
+        for group in self.groups:
+            group.setTexScale(TextureStage.getDefault(), frame_scale.x, frame_scale.y)
+            group.set_shader_input('texture_scale', frame_scale)
+        self._apply_frame()
+
+    def add(self, torch):
+        """Hand a torch over to the system: shared atlas, phase group, engine-side billboarding."""
+        # Spread torches over the groups by position so a rebuilt chunk keeps its phases
+        phase = int(round(torch.x) * 7 + round(torch.z) * 13) % len(self.groups)
+        torch.torch_phase = phase / len(self.groups)
+        torch.texture = self.atlas
+        torch.parent = self.groups[phase]
+        # Per-entity UV inputs would override the group's; drop them so the group's frame shows through
+        torch.clear_shader_input('texture_scale')
+        torch.clear_shader_input('texture_offset')
+        torch.rotation = (0, 0, 0)
+        torch.setBillboardAxis()
+
+    def _apply_frame(self):
+        for i, group in enumerate(self.groups):
+            offset = Vec2(((self.frame_index + i) % self.frame_count) / self.frame_count, 0)
+            group.setTexOffset(TextureStage.getDefault(), offset.x, offset.y)
+            group.set_shader_input('texture_offset', offset)
+
+    def update(self, dt):
+        """Flicker each phase group and advance the shared animation once per frame_delay."""
+        self.time_passed += dt
+        for i, group in enumerate(self.groups):
+            intensity = flicker_intensity(i / len(self.groups), self.time_passed)
+            group.setColorScale(intensity, intensity, intensity, 1)
+
+        self.frame_timer += dt
+        if self.frame_timer < self.frame_delay:
+            return
+        self.frame_timer %= self.frame_delay
+        self.frame_index = (self.frame_index + 1) % self.frame_count
+        self._apply_frame()
@@ -0,0 +1,199 @@
+# game/visibility.py
+
+import math
+from array import array
+from fractions import Fraction
+
+HALF = Fraction(1, 2)
+
+
+def _round_ties_up(value):
+    return math.floor(value + HALF)
+
+
+def _round_ties_down(value):
+    return math.ceil(value - HALF)
+
+
+def shadowcast(origin, is_blocking, reveal, radius):
+    """Symmetric shadowcasting field of view on a tile grid.
+
+    Calls reveal(x, y) for every tile visible from origin within radius (walls
+    bounding the visible area included). Visibility is symmetric: if A sees B,
+    B sees A, so the result doubles as a line-of-sight test toward the origin.
+    """
+    ox, oy = origin
+    reveal(ox, oy)
+    transforms = (
+        lambda row, col: (ox + col, oy - row),  # North
+        lambda row, col: (ox + row, oy + col),  # East
+        lambda row, col: (ox + col, oy + row),  # South
+        lambda row, col: (ox - row, oy + col),  # West
+    )
+    radius_sq = radius * radius
+
+    for transform in transforms:
+        # Each row is (depth, start_slope, end_slope); scanned depth first
+        rows = [(1, Fraction(-1), Fraction(1))]
+        while rows:
+            depth, start_slope, end_slope = rows.pop()
+            if depth > radius:
+                continue
+            previous_blocking = None
+            min_col = _round_ties_up(depth * start_slope)
+            max_col = _round_ties_down(depth * end_slope)
+            for col in range(min_col, max_col + 1):
+                x, y = transform(depth, col)
+                blocking = is_blocking(x, y)
+                in_range = depth * depth + col * col <= radius_sq
+                symmetric = depth * start_slope <= col <= depth * end_slope
+                if in_range and (blocking or symmetric):
+                    reveal(x, y)
+                if previous_blocking and not blocking:
+                    start_slope = Fraction(2 * col - 1, 2 * depth)
+                if previous_blocking is False and blocking:
+                    rows.append((depth + 1, start_slope, Fraction(2 * col - 1, 2 * depth)))
+                previous_blocking = blocking
+            if previous_blocking is False:
+                rows.append((depth + 1, start_slope, end_slope))
+
+
+class VisibilityMap:
+    """Potentially visible set of cells around the player, recomputed only when the player changes cell.
+
+    Cells are stamped with the generation of the update that saw them, so asking
+    whether a cell is visible is one array lookup and nothing needs clearing.
+    """
+
+    def __init__(self, grid, radius=16, chunk_size=16):
+        self.grid = grid
+        self.radius = radius
+        self.chunk_size = chunk_size
+        self._stamp = array('I', bytes(4 * grid.size))
+        self.generation = 0
+        self.origin = None
+        self.visible = []  # Indices of the visible cells
+        self.visible_chunks = set()
+
+    def update(self, cell):
+        """Recompute the visible set if the origin moved to another cell. Returns True if it changed."""
+        if cell == self.origin:
+            return False
+        self.origin = cell
+        self.generation += 1
+        generation = self.generation
+        grid = self.grid
+        width = grid.width
+        walkable = grid.walkable
+        stamp = self._stamp
+        visible = self.visible = []
+        chunk_size = self.chunk_size
+        chunks = self.visible_chunks = set()
+
+        def is_blocking(x, y):
+            return not (0 <= x < width and 0 <= y < grid.height) or not walkable[y * width + x]
+
+        def reveal(x, y):
+            if 0 <= x < width and 0 <= y < grid.height:
+                index = y * width + x
+                if stamp[index] != generation:
+                    stamp[index] = generation
+                    visible.append(index)
+                    chunks.add((x // chunk_size, y // chunk_size))
+
+        if grid.in_bounds(*cell):
+            shadowcast(cell, is_blocking, reveal, self.radius)
+        return True
+
+    def is_visible(self, x, y):
+        grid = self.grid
+        return grid.in_bounds(x, y) and self._stamp[y * grid.width + x] == self.generation
+
+    def is_visible_world(self, world_x, world_z):
+        return self.is_visible(*self.grid.world_to_cell(world_x, world_z))
+
+    def can_see_origin(self, x, y):
+        """Line of sight between (x, y) and the cell the map was computed from (the player)."""
+        return self.is_visible(x, y)
+
+
+class VisibilityCuller:
+    """Hides registered entities whose cell (or chunk) is outside the visible set.
+
+    Entities are indexed by the chunk they sit in, and apply() only touches the
+    chunks that entered or left the visible set, plus the cell-registered
+    entities (torches) of chunks still in view, whose cells may have changed.
+    The cost per update follows the view, not the number of registered entities.
+
+    Uses entity.visible rather than enabled so it does not fight the chunk
+    streamer, which owns enabled.
+    """
+
+    def __init__(self, visibility, set_visible=None):
+        self.visibility = visibility
+        self.set_visible = set_visible or (lambda entity, visible: setattr(entity, 'visible', visible))
+        self.by_cell = {}  # entity -> (x, y)
+        self.by_chunk = {}  # entity -> chunk key
+        self.chunk_entities = {}  # chunk key -> {entity: None} registered with register_chunk
+        self.cell_entities = {}  # chunk key -> {entity: (x, y)} registered by cell or position
+        self.shown_chunks = visibility.visible_chunks  # The visible chunks as of the last apply()
+
+    def _chunk_of(self, x, y):
+        chunk_size = self.visibility.chunk_size
+        return x // chunk_size, y // chunk_size
+
+    def register_cell(self, entity, x, y):
+        self.unregister(entity)
+        self.by_cell[entity] = (x, y)
+        self.cell_entities.setdefault(self._chunk_of(x, y), {})[entity] = (x, y)
+        self.set_visible(entity, self.visibility.is_visible(x, y))
+
+    def register_position(self, entity, world_x, world_z):
+        self.register_cell(entity, *self.visibility.grid.world_to_cell(world_x, world_z))
+
+    def register_chunk(self, entity, bounds):
+        self.unregister(entity)
+        key = self._chunk_of(bounds[0], bounds[1])
+        self.by_chunk[entity] = key
+        self.chunk_entities.setdefault(key, {})[entity] = None
+        self.set_visible(entity, key in self.visibility.visible_chunks)
+
+    def unregister(self, entity):
+        cell = self.by_cell.pop(entity, None)
+        if cell is not None:
+            _discard(self.cell_entities, self._chunk_of(*cell), entity)
+        key = self.by_chunk.pop(entity, None)
+        if key is not None:
+            _discard(self.chunk_entities, key, entity)
+
+    def apply(self):
+        """Push the changes since the last apply() onto the entities of the affected chunks."""
+        visibility = self.visibility
+        is_visible = visibility.is_visible
+        current = visibility.visible_chunks
+        previous = self.shown_chunks
+        set_visible = self.set_visible
+        chunk_entities = self.chunk_entities
+        cell_entities = self.cell_entities
+        for key in previous - current:
+            for entity in chunk_entities.get(key, ()):
+                set_visible(entity, False)
+            for entity in cell_entities.get(key, ()):
+                set_visible(entity, False)
+        for key in current - previous:
+            for entity in chunk_entities.get(key, ()):
+                set_visible(entity, True)
+        for key in current:
+            entities = cell_entities.get(key)
+            if entities:
+                for entity, cell in entities.items():
+                    set_visible(entity, is_visible(*cell))
+        self.shown_chunks = current  # VisibilityMap.update() builds a new set, so keeping this one is safe
+
+
+def _discard(index, key, entity):
+    entities = index.get(key)
+    if entities is not None:
+        entities.pop(entity, None)
+        if not entities:
+            del index[key]
@@ -0,0 +1,135 @@
+# game/world_streaming.py
+
+import time
+from collections import OrderedDict
+
+from game.dungeon_mesh import chunk_bounds
+
+
+class ChunkStreamer:
+    """Loads dungeon chunks around the player and releases the ones left behind.
+
+    The map is split into chunk_size x chunk_size tile squares. Chunks whose center
+    comes within load_radius tiles of the player are queued and built a piece at a
+    time under a per-frame time budget; chunks further than unload_radius are
+    disabled and parked in a small LRU cache, and destroyed once they fall out of it.
+
+    build_chunk(bounds) must return an iterable of entities (typically a generator,
+    so one chunk can be built over several frames). The callbacks keep this class
+    free of any engine code.
+    """
+
+    def __init__(self, width, height, chunk_size, build_chunk, set_enabled, destroy_entity,
+                 load_radius=24, unload_radius=None, cache_size=8, frame_budget=0.004, clock=time.perf_counter):
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.build_chunk = build_chunk
+        self.set_enabled = set_enabled  # Called as set_enabled(entity, bool)
+        self.destroy_entity = destroy_entity
+        self.load_radius = load_radius
+        self.unload_radius = unload_radius if unload_radius is not None else load_radius + chunk_size  # Hysteresis
+        self.cache_size = cache_size
+        self.frame_budget = frame_budget
+        self.clock = clock
+
+        self.bounds = {
+            (x0 // chunk_size, y0 // chunk_size): (x0, y0, x1, y1)
+            for x0, y0, x1, y1 in chunk_bounds(width, height, chunk_size)
+        }
+        self.loaded = {}  # chunk key -> entities
+        self.cache = OrderedDict()  # chunk key -> disabled entities, least recently used first
+        self.queue = []  # chunk keys waiting to be built, nearest last
+        self.building = None  # (key, iterator, entities built so far)
+        self.player_chunk = None
+
+    def chunk_of(self, cell_x, cell_y):
+        return cell_x // self.chunk_size, cell_y // self.chunk_size
+
+    def _distance_sq(self, key, cell_x, cell_y):
+        x0, y0, x1, y1 = self.bounds[key]
+        # Distance from the player to the nearest point of the chunk, in tiles
+        dx = max(x0 - cell_x, 0, cell_x - (x1 - 1))
+        dy = max(y0 - cell_y, 0, cell_y - (y1 - 1))
+        return dx * dx + dy * dy
+
+    def update(self, cell_x, cell_y):
+        """Re-plan which chunks should be resident; cheap unless the player changed chunk."""
+        player_chunk = self.chunk_of(cell_x, cell_y)
+        if player_chunk == self.player_chunk:
+            return
+        self.player_chunk = player_chunk
+
+        load_sq = self.load_radius ** 2
+        unload_sq = self.unload_radius ** 2
+        reach = self.load_radius // self.chunk_size + 1
+        pcx, pcy = player_chunk
+
+        wanted = []
+        for cy in range(pcy - reach, pcy + reach + 1):
+            for cx in range(pcx - reach, pcx + reach + 1):
+                key = (cx, cy)
+                if key in self.bounds and self._distance_sq(key, cell_x, cell_y) <= load_sq:
+                    wanted.append(key)
+
+        for key in wanted:
+            if key in self.loaded or (self.building and self.building[0] == key):
+                continue
+            if key in self.cache:
+                entities = self.cache.pop(key)
+                for entity in entities:
+                    self.set_enabled(entity, True)
+                self.loaded[key] = entities
+            elif key not in self.queue:
+                self.queue.append(key)
+
+        for key in [key for key in self.loaded if self._distance_sq(key, cell_x, cell_y) > unload_sq]:
+            self._unload(key)
+
+        # Drop queued chunks the player already walked away from, build the nearest first
+        self.queue = [key for key in self.queue if self._distance_sq(key, cell_x, cell_y) <= unload_sq]
+        self.queue.sort(key=lambda key: -self._distance_sq(key, cell_x, cell_y))
+
+    def _unload(self, key):
+        entities = self.loaded.pop(key)
+        for entity in entities:
+            self.set_enabled(entity, False)
+        self.cache[key] = entities
+        while len(self.cache) > self.cache_size:
+            _, evicted = self.cache.popitem(last=False)
+            for entity in evicted:
+                self.destroy_entity(entity)
+
+    def process(self):
+        """Build queued chunks until this frame's time budget is spent. Returns True while work remains."""
+        deadline = self.clock() + self.frame_budget
+        while True:
+            if self.building is None:
+                if not self.queue:
+                    return False
+                key = self.queue.pop()
+                self.building = (key, iter(self.build_chunk(self.bounds[key])), [])
+            key, pieces, entities = self.building
+            for entity in pieces:
+                entities.append(entity)
+                if self.clock() >= deadline:
+                    return True
+            self.loaded[key] = entities
+            self.building = None
+            if self.clock() >= deadline:
+                return bool(self.queue)
+
+    def load_all_near(self, cell_x, cell_y):
+        """Synchronously build everything around a position, e.g. the spawn point before the first frame."""
+        self.update(cell_x, cell_y)
+        budget = self.frame_budget
+        self.frame_budget = float('inf')
+        try:
+            self.process()
+        finally:
+            self.frame_budget = budget
+
+    @property
+    def resident_entities(self):
+        for entities in self.loaded.values():
+            yield from entities
@@ -1,13 +1,40 @@
 from ursina import *
 from game.player import create_player
-from game.dungeon_build import create_dungeon_entities
+from game.dungeon_build import create_streamed_dungeon, iter_dungeon_entities
+from game.level_loading import FrameBudgetBuilder, LevelLoader, prepare_generated_level, prepare_level, prepare_level_file
 from game.manual_dungeon_layout import dungeon_layout
+from game.enemy_ai import AIScheduler
+from game.enemy_manager import EnemyManager
+from game.grid_collision import GridCollision
+from game.spatial_hash import SpatialHash
+from game.projectile_pool import ProjectilePool
+from game.visibility import VisibilityCuller, VisibilityMap
+from game.torches import TorchSystem, flicker_intensity
+from game.light_manager import LightManager
+from game.fixed_timestep import FixedTimestepScheduler
+from game.parallel_planning import BatchPlanner
+from game import events
+from game.profiler import Profiler
+from game.profiler_overlay import ProfilerOverlay
+from game.projectile import Projectile
+from game.player import Player
+import atexit
 import time
+import traceback
 
 from game.simple_2d_enemy import SimpleSpriteEnemy
+from game.instanced_sprites import InstancedEnemy, InstancedSpriteRenderer
+from game.spawner import EnemySpawner
 
 app = Ursina()
 
+# Frame profiler, off until F3; F4 writes the recorded frames to profile_trace.csv
+profiler = Profiler()
+profiler.instrument(SimpleSpriteEnemy, 'update', 'enemy.update')  # Only runs for enemies without a manager
+profiler.instrument(Projectile, 'update', 'projectile.update')
+profiler.instrument(Player, 'update', 'player.update')
+profiler_overlay = ProfilerOverlay(profiler)
+
 # Load textures
 wall_texture = load_texture('assets/textures/wall.png')
 floor_texture = load_texture('assets/textures/floor2.png')
@@ -19,40 +46,42 @@ enemy_texture = load_texture('assets/textures/enemy.png')
 
 # Set parameters
 cell_size = 2
+floor_tile_size = 2
+stream_world = False  # Build the dungeon in chunks around the player; meant for large generated levels
+level_path = None  # Packed level from `python -m game.level_format build`; None uses the manual layout
+level_seed = 0
+next_level_size = 101  # Tiles per side of the level pre-generated in the background
+chunk_size = 16  # Tiles per side of a merged/streamed chunk, also the granularity of chunk culling
+view_radius = 16  # Tiles; the fog hides everything further away anyway
+max_torch_lights = 4  # Real PointLights shared by all torches; the rest are lit by their own sprite only
+simulation_rate = 30  # Fixed ticks per second for enemies, projectiles and spawning
+max_catch_up_ticks = 4  # Ticks per frame before the simulation drops time instead of catching up
+simulation_budget = None  # Seconds of ticking per frame on weak machines, None = only the tick cap
+instanced_enemies = True  # Draw all enemies in one instanced draw call instead of one quad Entity each
+planner_workers = 0  # Worker processes for enemy path planning, 0 plans on the main thread
+event_log_level = events.OFF  # e.g. events.DEBUG to log hits, damage, spawns and deaths
+event_log_path = None  # None writes to stderr
+
+if event_log_level < events.OFF:
+    events.configure(event_log_level, path=event_log_path)
 
-# Initialize frame-related variables for torch animation
-frame_index = 0
-frame_timer = 0
-frame_delay = 0.3  # Time between torch frame updates
-
-# Find player start position from layout
-player_start_x = None
-player_start_y = None
-
-for y, row in enumerate(dungeon_layout):
-    for x, tile in enumerate(row):
-        if tile == 4:  # '4' represents the player start
-            player_start_x, player_start_y = x, y
-            dungeon_layout[y][x] = 1
-            break
-    if player_start_x is not None:
-        break
-
-if player_start_x is None or player_start_y is None:
-    print("Error: Player start position not found in dungeon layout!")
-    application.quit()
-
-# Generate dungeon entities
-dungeon_entities, floor_positions, torches = create_dungeon_entities(
-    dungeon_layout,
-    wall_texture=wall_texture,
-    floor_texture=floor_texture,
-    roof_texture=roof_texture,
-    torch_frames=torch_frames,
-    cell_size=2,
-    floor_tile_size=2,
-    debug_mode=False
-)
+# Shared torch animation: one atlas material, advanced once per frame_delay for all torches
+torch_system = TorchSystem(torch_frames, frame_delay=0.3)
+
+# Level preparation (grid, chase field, torches, light bake, chunk meshes) runs on a worker thread;
+# only entity creation happens here, a few entities per frame, behind a progress text
+level_loader = LevelLoader()
+if level_path:
+    level_future = level_loader.submit(prepare_level_file, level_path)
+else:
+    level_future = level_loader.submit(
+        prepare_level, dungeon_layout, tile_size=cell_size * floor_tile_size, wall_height=cell_size * 2,
+        chunk_size=chunk_size, build_meshes=not stream_world
+    )
+loading_text = Text(text='Preparing level...', origin=(0, 0), scale=2, color=color.white, parent=camera.ui)
+level_builder = None
+game = None
+world_streamer = None
 
 # Fog and lighting settings
 scene.fog_density = 0.05
@@ -64,43 +93,172 @@ directional_light.color = color.rgb(100, 100, 100)
 directional_light.direction = Vec3(0, -1, -1)
 directional_light.parent = scene
 
-# Create the player
-player = create_player(hands_texture)
-player.position = (player_start_x * cell_size, 0, player_start_y * cell_size)
+# Torch lights: a fixed pool handed to the torches nearest the player
+def apply_torch_light(light, torch, x, y, z, brightness):
+    light.position = (x, y + 0.5, z)  # Slightly above the torch, as the per-torch lights were
+    light.color = color.rgb(int(255 * brightness), int(140 * brightness), 0)
+
+def start_building(prepared):
+    """Set up the world state from a prepared level and queue its entities for creation."""
+    global prepared_level, dungeon_layout, player_start_x, player_start_y, dungeon_grid, dungeon_collision, enemy_index
+    global visibility, culler, light_manager, world_streamer, floor_positions, torches, level_builder
+    global level_cell_size, level_floor_tile_size
+    prepared_level = prepared
+    dungeon_layout = prepared.layout
+    player_start_x, player_start_y = prepared.start
+
+    # Walkability grid shared by the enemy navigation, the static collision queries and visibility
+    dungeon_grid = prepared.grid
+    dungeon_collision = GridCollision(dungeon_grid, wall_height=prepared.wall_height)
+    enemy_index = SpatialHash(cell_size=prepared.tile_size)
+    visibility = VisibilityMap(dungeon_grid, radius=view_radius, chunk_size=prepared.chunk_size)
+    visibility.update(prepared.start)
+    culler = VisibilityCuller(visibility)
+
+    light_manager = LightManager(
+        [PointLight(attenuation=(0.1, 0.05, 0.02), radius=3) for _ in range(max_torch_lights)],
+        apply_torch_light,
+        grid=dungeon_grid,
+        visibility=visibility,
+        flicker=lambda torch, time_passed: flicker_intensity(getattr(torch, 'torch_phase', 0), time_passed)
+    )
+
+    # A level file may use other sizes than the settings above; the builders take cell and floor tile sizes
+    level_cell_size = prepared.wall_height / 2
+    level_floor_tile_size = prepared.tile_size / level_cell_size
+
+    torches = []
+    floor_positions = prepared.floor_positions
+    if stream_world:
+        world_streamer, _, torches = create_streamed_dungeon(
+            dungeon_layout,
+            wall_texture=wall_texture,
+            floor_texture=floor_texture,
+            roof_texture=roof_texture,
+            torch_frames=torch_frames,
+            cell_size=level_cell_size,
+            floor_tile_size=level_floor_tile_size,
+            chunk_size=prepared.chunk_size,
+            culler=culler,
+            torch_system=torch_system,
+            light_manager=light_manager,
+            placements=prepared.torch_placements,
+            lightmap=prepared.lightmap
+        )
+        world_streamer.update(*prepared.start)
+
+        def initial_chunks():
+            # Each step spends the streamer's own budget; the count of queued chunks is only a progress estimate
+            while world_streamer.process():
+                yield
+
+        level_builder = FrameBudgetBuilder(initial_chunks(), len(world_streamer.queue))
+    else:
+        level_builder = FrameBudgetBuilder(
+            iter_dungeon_entities(
+                prepared.chunk_meshes, prepared.torch_placements, prepared.width, prepared.height,
+                wall_texture, floor_texture, roof_texture, torch_frames, level_cell_size, level_floor_tile_size,
+                torches=torches, torch_system=torch_system, light_manager=light_manager, culler=culler
+            ),
+            len(prepared.chunk_meshes) + len(prepared.torch_placements) + 2
+        )
+
+def finish_loading():
+    """Create the player and the game once the level is built, then start preparing the next level."""
+    global player, game
+    player = create_player(hands_texture)
+    player.grid_collision = dungeon_collision
+    player.enemy_index = enemy_index
+    player.projectile_pool = ProjectilePool(
+        capacity=64,
+        grid_collision=dungeon_collision,
+        enemy_index=enemy_index,
+        entity_factory=lambda: Entity(model='sphere', color=color.yellow, scale=0.2, enabled=False)
+    )
+    player_world_x, player_world_z = dungeon_grid.cell_to_world(player_start_x, player_start_y)
+    player.position = (player_world_x, 0, player_world_z)
+
+    game = Game(prepared_level.flow_field)
+    game.update_flow_field()
+    game.spawn_enemies(game.enemy_spawn_rate)
+    loading_text.enabled = False
+    score_text.enabled = True
+    survival_time_text.enabled = True
+
+    # Nothing switches levels yet; the next one is ready in the background when something does
+    level_loader.prefetch(
+        'next', prepare_generated_level, next_level_size, level_seed + 1,
+        tile_size=cell_size * floor_tile_size, wall_height=cell_size * 2, chunk_size=chunk_size,
+        build_meshes=not stream_world
+    )
+
+def update_loading():
+    if level_builder is None:
+        if not level_future.done():
+            return
+        try:
+            prepared = level_future.result()
+        except Exception as error:
+            # A bad level file, an OSError or a bug in preparation: report it and quit instead of loading forever
+            if events.LEVEL_LOAD_FAILED.enabled:
+                events.emit(events.LEVEL_LOAD_FAILED, path=level_path, error=repr(error))
+            print(f"Error: could not load the level: {error}")
+            traceback.print_exception(error)
+            application.quit()
+            return
+        start_building(prepared)
+    if level_builder.process():
+        loading_text.text = f'Building level... {int(level_builder.progress * 100)}%'
+        return
+    finish_loading()
 
 # Game class definition
 class Game(Entity):
-    def __init__(self):
+    def __init__(self, flow_field):
         super().__init__()
         self.score = 0
-        self.enemies = []
-        self.cell_size = cell_size
+        self.cell_size = level_cell_size
         self.enemy_spawn_rate = 2
         self.spawn_interval = 5
-        self.next_spawn_time = time.time() + self.spawn_interval
+        self.next_spawn_time = self.spawn_interval  # Simulation seconds, like everything tick() drives
         self.survival_start_time = time.time()
         self.spawn_increment_time = 60
-        self.last_increment_time = time.time()
+        self.last_increment_time = 0.0
+        self.flow_field = flow_field  # Prepared with the level, already pointed at the player start
+        self.simulation = FixedTimestepScheduler(
+            self.tick, tick_rate=simulation_rate, max_ticks_per_frame=max_catch_up_ticks, tick_budget=simulation_budget
+        )
+        self.enemy_manager = EnemyManager(flow_field=self.flow_field, attack_callback=self.on_enemy_attack, spatial_hash=enemy_index)
+        self.enemy_renderer = InstancedSpriteRenderer(
+            enemy_texture, sprite_size=(1.5, 2.5), fog_color=scene.fog_color, fog_density=scene.fog_density
+        ) if instanced_enemies else None
+        # Chase / search / wander decisions for a few enemies per frame; line of sight is the player's own view
+        # With worker processes, replans only queue requests, so far more of them fit in a frame
+        self.planner = BatchPlanner(dungeon_grid, workers=planner_workers) if planner_workers else None
+        if self.planner is not None:
+            atexit.register(self.planner.shutdown)
+        self.enemy_ai = AIScheduler(
+            self.enemy_manager, dungeon_grid, can_see=visibility.is_visible_world, pathfinder=prepared_level.pathfinder,
+            planner=self.planner, replans_per_frame=16 if self.planner is not None else 2
+        )
+        self.spawner = EnemySpawner(
+            [(pos[0], pos[2]) for pos in floor_positions],
+            self.enemy_manager,
+            self.create_enemy,
+            spatial_hash=enemy_index
+        )
 
     def spawn_enemies(self, count):
-        valid_floor_positions = [(pos[0], pos[2]) for pos in floor_positions]
+        """Queue enemies; the spawner creates them over the next frames within its time budget."""
+        self.spawner.request(count)
 
-        if not valid_floor_positions:
-            print("No valid positions to spawn enemies.")
-            return
-
-        enemy_count = min(count, len(valid_floor_positions))
-        selected_positions = random.sample(valid_floor_positions, enemy_count)
-
-        for (x, z) in selected_positions:
-            enemy_position = (x, 1, z)
-            enemy = SimpleSpriteEnemy(player=player, position=enemy_position, texture='enemy.png')
-            enemy.enabled = True
-            enemy.visible = True
-            self.enemies.append(enemy)
+    def create_enemy(self, x, y, z):
+        if self.enemy_renderer:
+            return InstancedEnemy(self.enemy_manager, x, y, z)
+        return SimpleSpriteEnemy(player=player, position=(x, y, z), texture='enemy.png', manager=self.enemy_manager)
 
     def update_spawn_logic(self):
-        current_time = time.time()
+        current_time = self.simulation.time
         if current_time >= self.next_spawn_time:
             self.spawn_enemies(self.enemy_spawn_rate)
             self.next_spawn_time = current_time + self.spawn_interval
@@ -108,29 +266,85 @@ class Game(Entity):
             self.enemy_spawn_rate += 2
             self.last_increment_time = current_time
 
+    def on_enemy_attack(self, slot, damage):
+        if events.HIT.enabled:
+            events.emit(events.HIT, source='enemy', target='player')
+        player.reduce_health(damage)
+
+    def tick(self, dt):
+        """One fixed simulation step: chase field, AI, enemies, projectiles, the spawn timer and queued spawns."""
+        now = self.simulation.time
+        self.enemy_manager.snapshot()
+        player.projectile_pool.snapshot()
+        self.update_flow_field()
+        self.enemy_ai.tick(now, player.position.x, player.position.z)
+        self.enemy_manager.step(dt, player.position.x, player.position.z, now)
+        player.projectile_pool.step(dt)
+        self.update_spawn_logic()
+        self.update_spawner()
+
+    def update_enemies(self):
+        """Push the enemy transforms to their entities (or the instance buffer), interpolated between the last two ticks."""
+        if self.enemy_renderer:
+            self.enemy_renderer.update(self.enemy_manager, time.dt, self.simulation.alpha, visibility)
+            return
+        self.enemy_manager.sync_entities(visibility, self.simulation.alpha)
+
+    def update_spawner(self):
+        self.spawner.process(player.position.x, player.position.z)
+
+    def update_projectiles(self):
+        player.projectile_pool.sync_entities(self.simulation.alpha)
+
+    def update_flow_field(self):
+        """Rebuild the shared chase field only when the player enters a new cell."""
+        self.flow_field.update(dungeon_grid.world_to_cell(player.position.x, player.position.z))
+
+    def update_visibility(self):
+        """Recompute what the player can see when they enter a new cell, and hide everything else."""
+        if visibility.update(dungeon_grid.world_to_cell(player.position.x, player.position.z)):
+            culler.apply()
+
     def update_survival_time(self):
         return int(time.time() - self.survival_start_time)
 
-game = Game()
-game.spawn_enemies(game.enemy_spawn_rate)
-
-# UI text for score and survival time
-score_text = Text(text=f'Score: {game.score}', position=(-0.85, 0.4), scale=2, color=color.white, parent=camera.ui)
-survival_time_text = Text(text='Survival Time: 0', position=(-0.85, 0.35), scale=2, color=color.white, parent=camera.ui)
+# UI text for score and survival time, shown once the level is loaded
+score_text = Text(text='Score: 0', position=(-0.85, 0.4), scale=2, color=color.white, parent=camera.ui, enabled=False)
+survival_time_text = Text(text='Survival Time: 0', position=(-0.85, 0.35), scale=2, color=color.white, parent=camera.ui, enabled=False)
 
 # Update logic
 def update():
+    profiler.begin_frame()
+    if game is None:
+        with profiler.scope('loading'):
+            update_loading()
+        return
+
     player.health_text.text = f'Health: {player.health}'
     score_text.text = f'Score: {game.score}'
-    game.update_spawn_logic()
+    with profiler.scope('simulation'):
+        game.simulation.advance(time.dt)
+    with profiler.scope('visibility'):
+        game.update_visibility()
+    with profiler.scope('enemies'):
+        game.update_enemies()
+    with profiler.scope('projectiles'):
+        game.update_projectiles()
     survival_time_text.text = f'Survival Time: {game.update_survival_time()}s'
 
-    # Update torch frames
-    global frames
-    for torch in torches:
-        torch.texture = torch_frames[frame_index]
-        player_position = Vec3(player.position.x, torch.position.y, player.position.z)
-        torch.look_at(player_position)
-    game.enemies = [enemy for enemy in game.enemies if enemy.enabled]
+    if world_streamer:
+        with profiler.scope('streaming'):
+            world_streamer.update(*dungeon_grid.world_to_cell(player.position.x, player.position.z))
+            world_streamer.process()
+
+    with profiler.scope('torches'):
+        torch_system.update(time.dt)
+        light_manager.update(time.dt, player.position.x, player.position.z)
+
+    if profiler.enabled:
+        profiler.count('enemies', len(game.enemy_manager))
+        profiler.count('projectiles', len(player.projectile_pool))
+        profiler.count('enemy_replans', game.enemy_ai.replans)
+        profiler.count('dropped_ticks', game.simulation.dropped_ticks)
 
 app.run()
@@ -0,0 +1,54 @@
+# tests/conftest.py
+#
+# The game modules under test are engine-free; nothing here needs ursina.
+
+import random
+from collections import deque
+
+import pytest
+
+from game.tile_grid import TileGrid
+
+
+def random_grid(width, height, seed, wall_chance=0.3, tile_size=4):
+    rng = random.Random(seed)
+    layout = [[0 if rng.random() < wall_chance else 1 for _ in range(width)] for _ in range(height)]
+    return TileGrid.from_layout(layout, tile_size)
+
+
+def bfs_distances(grid, start):
+    """Steps from start to every reachable cell, as {(x, y): steps}."""
+    if not grid.is_walkable(*start):
+        return {}
+    distances = {start: 0}
+    queue = deque((start,))
+    while queue:
+        x, y = queue.popleft()
+        for neighbour in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if neighbour not in distances and grid.is_walkable(*neighbour):
+                distances[neighbour] = distances[(x, y)] + 1
+                queue.append(neighbour)
+    return distances
+
+
+def assert_valid_path(grid, start, end, path):
+    """path runs from start (exclusive) to end through walkable, 4-adjacent cells."""
+    assert path[-1] == end
+    previous = start
+    for cell in path:
+        assert grid.is_walkable(*cell)
+        assert abs(cell[0] - previous[0]) + abs(cell[1] - previous[1]) == 1
+        previous = cell
+
+
+@pytest.fixture
+def open_grid():
+    """A 6 x 5 room with a wall segment in the middle column."""
+    layout = [
+        [1, 1, 1, 1, 1, 1],
+        [1, 1, 1, 0, 1, 1],
+        [1, 1, 1, 0, 1, 1],
+        [1, 1, 1, 0, 1, 1],
+        [1, 1, 1, 1, 1, 1],
+    ]
+    return TileGrid.from_layout(layout)
@@ -0,0 +1,72 @@
+# tests/test_enemy_manager.py
+
+from game.enemy_manager import EnemyManager, HeadlessEnemy
+from game.flow_field import FlowField
+from game.spatial_hash import SpatialHash
+from game.tile_grid import TileGrid
+
+# Two rooms; the east one (x >= 4) is sealed off from the west one by the wall column x = 3
+LAYOUT = [
+    [0, 0, 0, 0, 0, 0, 0],
+    [0, 1, 1, 0, 1, 1, 0],
+    [0, 1, 1, 0, 1, 1, 0],
+    [0, 0, 0, 0, 0, 0, 0],
+]
+
+
+def make_manager(spatial_hash=None):
+    grid = TileGrid.from_layout(LAYOUT, tile_size=4)
+    field = FlowField(grid)
+    field.update((1, 1))
+    return grid, EnemyManager(flow_field=field, spatial_hash=spatial_hash)
+
+
+def run(manager, target, ticks=120, dt=1 / 30):
+    for tick in range(ticks):
+        manager.step(dt, *target, tick * dt)
+
+
+def in_walls(grid, manager):
+    return [slot for slot in range(manager.count) if not grid.is_walkable(*grid.world_to_cell(manager.x[slot], manager.z[slot]))]
+
+
+def test_unreachable_enemy_holds_position():
+    grid, manager = make_manager()
+    slot = manager.add(20, 1.25, 4)  # East room
+    run(manager, grid.cell_to_world(1, 1))
+    assert (manager.x[slot], manager.z[slot]) == (20, 4)
+
+
+def test_reachable_enemy_still_closes_in():
+    grid, manager = make_manager()
+    slot = manager.add(8, 1.25, 8)
+    run(manager, grid.cell_to_world(1, 1))
+    assert abs(manager.x[slot] - 4) + abs(manager.z[slot] - 4) <= manager.attack_range * 2
+
+
+def test_knockback_does_not_push_through_walls():
+    grid, manager = make_manager()
+    slot = manager.add(8, 1.25, 4)
+    manager.apply_knockback(slot, 1, 0, 40)
+    run(manager, grid.cell_to_world(1, 1), ticks=30)
+    assert not in_walls(grid, manager)
+    assert manager.x[slot] < 10  # Stopped at the wall column, tile x = 3 starts at 10
+
+
+def test_knockback_slides_along_a_wall():
+    grid, manager = make_manager()
+    slot = manager.add(8, 1.25, 4)
+    manager.apply_knockback(slot, 1, 1, 20)
+    manager.step(0.1, 4, 4, 0)
+    assert not in_walls(grid, manager)
+    assert manager.z[slot] > 4  # The blocked x half was dropped, the z half kept
+
+
+def test_separation_keeps_a_crowd_out_of_walls():
+    index = SpatialHash(cell_size=4)
+    grid, manager = make_manager(spatial_hash=index)
+    for i in range(12):
+        HeadlessEnemy(manager, 7.5 + i * 0.05, 1.25, 7.5 - i * 0.05)
+    for tick in range(90):
+        manager.step(1 / 30, 4, 4, tick / 30)
+        assert not in_walls(grid, manager)
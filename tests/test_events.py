@@ -0,0 +1,74 @@
+# tests/test_events.py
+
+import io
+import json
+
+from game import events
+
+
+class ListWriter:
+    def __init__(self):
+        self.lines = []
+
+    def put(self, line):
+        self.lines.append(line)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_level_filtering():
+    writer = ListWriter()
+    log = events.EventLog(writer, level=events.INFO, clock=FakeClock())
+    log.emit(events.DAMAGE, amount=1)  # DEBUG
+    log.emit(events.GAME_OVER, score=3)
+    assert [json.loads(line)['event'] for line in writer.lines] == ['game_over']
+
+
+def test_rate_limit_aggregates_the_rest():
+    writer = ListWriter()
+    clock = FakeClock()
+    log = events.EventLog(writer, level=events.DEBUG, clock=clock)
+    for _ in range(events.DAMAGE.rate_limit + 5):
+        log.emit(events.DAMAGE, target='enemy', amount=10, killed=False)
+    assert len(writer.lines) == events.DAMAGE.rate_limit
+
+    clock.now += 1.5
+    log.close_expired()
+    aggregate = json.loads(writer.lines[-1])
+    assert aggregate['suppressed'] == 5
+    assert aggregate['amount_total'] == 50
+    assert 'killed_total' not in aggregate  # Booleans are not summed
+    log.close_expired()
+    assert len(writer.lines) == events.DAMAGE.rate_limit + 1
+
+
+def test_next_event_after_the_window_writes_the_aggregate():
+    writer = ListWriter()
+    clock = FakeClock()
+    log = events.EventLog(writer, level=events.DEBUG, format='text', clock=clock)
+    for _ in range(events.PROJECTILE_EXPIRE.rate_limit + 2):
+        log.emit(events.PROJECTILE_EXPIRE, reason='wall')
+    clock.now += 1.0
+    log.emit(events.PROJECTILE_EXPIRE, reason='range')
+    assert 'suppressed=2' in writer.lines[-2]
+    assert writer.lines[-1].endswith('reason=range')
+
+
+def test_configure_writes_json_and_shutdown_disables():
+    stream = io.StringIO()
+    events.configure(events.INFO, stream=stream, flush_interval=0.01)
+    try:
+        assert events.DEATH.enabled and not events.DAMAGE.enabled
+        events.emit(events.DEATH, x=1.5, z=2.0)
+    finally:
+        events.shutdown()
+    assert not events.DEATH.enabled
+    record = json.loads(stream.getvalue())
+    assert record['event'] == 'death' and record['x'] == 1.5
+    assert not stream.closed  # Streams passed in are not ours to close
@@ -0,0 +1,56 @@
+# tests/test_fixed_timestep.py
+
+import pytest
+
+from game.fixed_timestep import FixedTimestepScheduler
+
+
+class FakeClock:
+    def __init__(self, step=0.0):
+        self.now = 0.0
+        self.step = step  # Seconds each reading advances, to simulate slow ticks
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+def make(tick_rate=10, **options):
+    ticks = []
+    scheduler = FixedTimestepScheduler(ticks.append, tick_rate=tick_rate, clock=FakeClock(), **options)
+    return scheduler, ticks
+
+
+def test_accumulates_partial_frames():
+    scheduler, ticks = make()
+    assert scheduler.advance(0.05) == 0
+    assert scheduler.alpha == pytest.approx(0.5)
+    assert scheduler.advance(0.07) == 1
+    assert ticks == [pytest.approx(0.1)]
+    assert scheduler.alpha == pytest.approx(0.2)
+    assert scheduler.time == pytest.approx(0.1)
+
+
+def test_long_frame_runs_catch_up_ticks():
+    scheduler, ticks = make()
+    assert scheduler.advance(0.35) == 3
+    assert scheduler.tick_count == 3
+    assert scheduler.alpha == pytest.approx(0.5)
+
+
+def test_tick_cap_drops_whole_ticks_but_keeps_the_fraction():
+    scheduler, _ = make(max_ticks_per_frame=2)
+    assert scheduler.advance(1.05) == 2
+    assert scheduler.dropped_ticks == 8
+    assert scheduler.alpha == pytest.approx(0.5)
+    assert scheduler.time == pytest.approx(0.2)
+
+
+def test_tick_budget_limits_time_spent():
+    ticks = []
+    scheduler = FixedTimestepScheduler(
+        ticks.append, tick_rate=10, max_ticks_per_frame=100, tick_budget=0.25, clock=FakeClock(step=0.1)
+    )
+    ran = scheduler.advance(1.0)
+    assert 0 < ran < 10
+    assert ran + scheduler.dropped_ticks == 10
@@ -0,0 +1,51 @@
+# tests/test_flow_field.py
+
+import pytest
+
+from conftest import bfs_distances, random_grid
+from game.flow_field import UNREACHABLE, FlowField
+from game.tile_grid import TileGrid
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_distances_match_bfs(seed):
+    grid = random_grid(20, 15, seed)
+    target = next((x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y))
+    field = FlowField(grid)
+    field.update(target)
+    distances = bfs_distances(grid, target)
+    for y in range(grid.height):
+        for x in range(grid.width):
+            assert field.distance_at(x, y) == distances.get((x, y), UNREACHABLE)
+
+
+def test_next_step_walks_down_to_the_target(open_grid):
+    field = FlowField(open_grid)
+    field.update((5, 2))
+    cell = (0, 2)
+    steps = 0
+    while cell != (5, 2):
+        following = field.next_step(*cell)
+        assert open_grid.is_walkable(*following)
+        assert field.distance_at(*following) == field.distance_at(*cell) - 1
+        cell = following
+        steps += 1
+    assert steps == bfs_distances(open_grid, (0, 2))[(5, 2)]
+    assert field.next_step(5, 2) is None
+
+
+def test_update_only_rebuilds_on_a_new_cell(open_grid):
+    field = FlowField(open_grid)
+    assert field.update((0, 0))
+    assert not field.update((0, 0))
+    assert field.update((1, 0))
+
+
+def test_unreachable_cells_have_no_direction():
+    grid = TileGrid.from_layout([[1, 1, 0, 1]], tile_size=4)
+    field = FlowField(grid)
+    field.update((0, 0))
+    assert field.distance_at(3, 0) == UNREACHABLE
+    assert field.next_step(3, 0) is None
+    assert field.direction_from(*grid.cell_to_world(3, 0)) is None
+    assert field.direction_from(*grid.cell_to_world(1, 0)) == (-1.0, 0.0)
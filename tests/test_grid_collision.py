@@ -0,0 +1,56 @@
+# tests/test_grid_collision.py
+
+import math
+
+import pytest
+
+from game.grid_collision import GridCollision
+from game.tile_grid import TileGrid
+
+# Tiles are 4 units, centered on multiples of 4: tile x spans [4x - 2, 4x + 2)
+LAYOUT = [
+    [0, 0, 0, 0, 0],
+    [0, 1, 1, 1, 0],
+    [0, 1, 0, 1, 0],
+    [0, 1, 1, 1, 0],
+    [0, 0, 0, 0, 0],
+]
+
+
+@pytest.fixture
+def collision():
+    return GridCollision(TileGrid.from_layout(LAYOUT), wall_height=4)
+
+
+def test_points_and_circles(collision):
+    assert not collision.point_in_wall(4, 1, 4)
+    assert collision.point_in_wall(8, 1, 8)
+    assert not collision.point_in_wall(8, 5, 8)  # Above the walls
+    assert not collision.circle_overlaps_wall(4, 4, 1.5)
+    assert collision.circle_overlaps_wall(4, 4, 2.5)
+
+
+def test_ray_stops_at_the_first_wall(collision):
+    hit = collision.raycast((4, 1, 8), (1, 0, 0))
+    assert hit.hit and hit.cell == (2, 2)
+    assert hit.distance == pytest.approx(2.0)
+    assert hit.normal == (-1, 0, 0)
+    assert collision.raycast((4, 1, 4), (1, 0, 0)).cell == (4, 1)
+
+
+def test_ray_hits_floor_and_roof(collision):
+    hit = collision.raycast((4, 1, 4), (0, -1, 0))
+    assert hit.hit and hit.cell is None and hit.normal == (0, 1, 0)
+    assert collision.raycast((4, 1, 4), (0, -1, 0), hit_floor=False) is not hit
+    assert collision.raycast((4, 1, 4), (0, 1, 0)).distance == pytest.approx(3.0)
+
+
+def test_segment_shorter_than_the_gap_misses(collision):
+    assert not collision.segment_hit((4, 1, 8), (5.5, 1, 8), hit_floor=False).hit
+    assert collision.segment_hit((4, 1, 8), (6.5, 1, 8), hit_floor=False).hit
+
+
+def test_diagonal_ray_does_not_slip_between_tiles(collision):
+    hit = collision.raycast((4, 1, 4), (1, 0, 1))
+    assert hit.hit and hit.cell == (2, 2)
+    assert hit.distance == pytest.approx(math.hypot(2, 2))
@@ -0,0 +1,52 @@
+# tests/test_level_format.py
+
+import random
+
+import pytest
+
+from game.dungeon_generation import place_torches
+from game.flow_field import FlowField
+from game.level_format import FLOOR_MESH, WALL_MESH, load_level, write_level
+from game.manual_dungeon_layout import dungeon_layout
+from game.tile_grid import FLOOR, TileGrid, find_player_start
+
+
+@pytest.fixture
+def level_path(tmp_path):
+    path = str(tmp_path / 'manual.lvl')
+    torches = place_torches(dungeon_layout, 6, rng=random.Random(0))
+    write_level(path, dungeon_layout, tile_size=6, wall_height=5, chunk_size=8, torch_placements=torches)
+    return path, torches
+
+
+def test_round_trip(level_path):
+    path, torches = level_path
+    layout = [list(row) for row in dungeon_layout]
+    start = find_player_start(layout)
+    layout[start[1]][start[0]] = FLOOR
+    with load_level(path) as level:
+        assert (level.width, level.height) == (len(layout[0]), len(layout))
+        assert (level.tile_size, level.wall_height, level.chunk_size) == (6, 5, 8)
+        assert level.player_start == start
+        assert level.layout() == layout
+        assert level.grid().walkable == TileGrid.from_layout(layout, 6).walkable
+
+        field = FlowField(TileGrid.from_layout(layout, 6))
+        field.update(start)
+        assert list(level.start_distance) == list(field.distance)
+
+        assert [(x, y) for x, y, _, _ in level.torch_placements()] == [(x, y) for x, y, _, _ in torches]
+        for (_, _, stored, rotation), (_, _, original, original_rotation) in zip(level.torch_placements(), torches):
+            assert stored == pytest.approx(original) and rotation == pytest.approx(original_rotation)
+
+        meshes = list(level.chunk_meshes())
+        assert {kind for _, kind, _ in meshes} == {WALL_MESH, FLOOR_MESH}
+        assert all(bounds[2] - bounds[0] <= 8 and len(mesh.vertices) == len(mesh.uvs) for bounds, _, mesh in meshes)
+        assert level.lightmap_levels is not None
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'not_a_level.lvl'
+    path.write_bytes(b'\0' * 128)
+    with pytest.raises(ValueError):
+        load_level(str(path))
@@ -0,0 +1,21 @@
+# tests/test_level_loading.py
+
+from game.level_format import write_level
+from game.level_loading import prepare_level, prepare_level_file
+from game.manual_dungeon_layout import dungeon_layout
+
+
+def test_same_layout_prepares_the_same_torches():
+    first = prepare_level(dungeon_layout, bake_lighting=False, build_meshes=False)
+    second = prepare_level(dungeon_layout, bake_lighting=False, build_meshes=False)
+    assert first.torch_placements == second.torch_placements
+    seeded = prepare_level(dungeon_layout, seed=3, bake_lighting=False, build_meshes=False)
+    assert seeded.torch_placements == prepare_level(dungeon_layout, seed=3, bake_lighting=False, build_meshes=False).torch_placements
+
+
+def test_level_file_carries_its_own_sizes(tmp_path):
+    path = str(tmp_path / 'wide.lvl')
+    write_level(path, dungeon_layout, tile_size=6, wall_height=5, chunk_size=32, bake_lighting=False)
+    prepared = prepare_level_file(path)
+    assert (prepared.tile_size, prepared.wall_height, prepared.chunk_size) == (6, 5, 32)
+    assert prepared.pathfinder.cluster_size == 32
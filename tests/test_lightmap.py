@@ -0,0 +1,39 @@
+# tests/test_lightmap.py
+
+import os
+
+from game.dungeon_generation import place_torches
+from game.lightmap import load_or_bake_lightmap
+from game.manual_dungeon_layout import dungeon_layout
+from game.tile_grid import TileGrid
+
+
+def test_same_layout_same_torches():
+    first = place_torches(dungeon_layout, 4)
+    assert first == place_torches([list(row) for row in dungeon_layout], 4)
+    other = [list(row) for row in dungeon_layout]
+    other[1][1] = 0 if other[1][1] else 1
+    assert place_torches(other, 4) != first
+
+
+def light_cells(grid):
+    return [grid.world_to_cell(position[0], position[2]) for _, _, position, _ in place_torches(dungeon_layout, grid.tile_size)]
+
+
+def test_repeated_starts_hit_the_cache(tmp_path):
+    cache_dir = str(tmp_path)
+    grid = TileGrid.from_layout(dungeon_layout)
+    first = load_or_bake_lightmap(grid, light_cells(grid), cache_dir=cache_dir)
+    second = load_or_bake_lightmap(grid, light_cells(grid), cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    assert first.levels == second.levels
+
+
+def test_cache_keeps_only_the_most_recent_bakes(tmp_path):
+    cache_dir = str(tmp_path)
+    grid = TileGrid.from_layout([[1] * 8 for _ in range(8)])
+    for x in range(6):
+        load_or_bake_lightmap(grid, [(x, 0)], cache_dir=cache_dir, max_cached=3)
+    assert len(os.listdir(cache_dir)) == 3
+    load_or_bake_lightmap(grid, [(5, 0)], cache_dir=cache_dir, max_cached=3)  # Hit: nothing baked or pruned
+    assert len(os.listdir(cache_dir)) == 3
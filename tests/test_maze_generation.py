@@ -0,0 +1,37 @@
+# tests/test_maze_generation.py
+
+import pytest
+
+from conftest import bfs_distances
+from game.maze_generation import ALGORITHMS, generate_maze, spawn_cells
+from game.tile_grid import FLOOR, TileGrid
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_same_seed_same_maze(algorithm):
+    first = generate_maze(31, 25, algorithm=algorithm, seed=5)
+    second = generate_maze(31, 25, algorithm=algorithm, seed=5)
+    assert first.tiles == second.tiles and first.start == second.start
+    assert generate_maze(31, 25, algorithm=algorithm, seed=6).tiles != first.tiles
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+def test_every_floor_tile_is_reachable_from_the_start(algorithm):
+    maze = generate_maze(41, 41, algorithm=algorithm, seed=1)
+    grid = TileGrid.from_tiles(maze.width, maze.height, maze.tiles)
+    reachable = bfs_distances(grid, maze.start)
+    floor = spawn_cells(maze.tiles)
+    assert floor and len(reachable) == len(floor)
+
+
+def test_border_stays_solid():
+    maze = generate_maze(21, 21, seed=2)
+    width, height = maze.width, maze.height
+    layout = maze.to_layout()
+    assert all(tile != FLOOR for tile in layout[0] + layout[-1])
+    assert all(row[0] != FLOOR and row[width - 1] != FLOOR for row in layout[:height])
+
+
+def test_unknown_algorithm():
+    with pytest.raises(ValueError):
+        generate_maze(11, 11, algorithm='drunkard')
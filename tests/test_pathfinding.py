@@ -0,0 +1,97 @@
+# tests/test_pathfinding.py
+
+import pytest
+
+from conftest import assert_valid_path, bfs_distances, random_grid
+from game.pathfinding import GridPathfinder, HierarchicalPathfinder
+from game.tile_grid import TileGrid
+
+
+def test_path_goes_around_a_wall(open_grid):
+    path = GridPathfinder(open_grid).find_path((2, 2), (4, 2))
+    assert_valid_path(open_grid, (2, 2), (4, 2), path)
+    assert len(path) == bfs_distances(open_grid, (2, 2))[(4, 2)]
+
+
+def test_same_cell_and_blocked_ends_give_no_path(open_grid):
+    pathfinder = GridPathfinder(open_grid)
+    assert pathfinder.find_path((1, 1), (1, 1)) == []
+    assert pathfinder.find_path((1, 1), (3, 2)) == []
+    assert pathfinder.find_path((3, 2), (1, 1)) == []
+    assert pathfinder.find_path((1, 1), (10, 10)) == []
+
+
+def test_unreachable_goal():
+    grid = TileGrid.from_layout([[1, 0, 1]])
+    assert GridPathfinder(grid).find_path((0, 0), (2, 0)) == []
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_bfs_on_random_grids(seed):
+    grid = random_grid(24, 18, seed)
+    pathfinder = GridPathfinder(grid)
+    cells = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y)]
+    start = cells[0]
+    distances = bfs_distances(grid, start)
+    for end in cells[1:]:
+        path = pathfinder.find_path(start, end)
+        if end in distances:
+            assert len(path) == distances[end]
+            assert_valid_path(grid, start, end, path)
+        else:
+            assert path == []
+
+
+def test_generation_stamps_do_not_leak_between_searches():
+    grid = random_grid(16, 16, seed=7)
+    pathfinder = GridPathfinder(grid)
+    cells = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y)]
+    first = [pathfinder.find_path(cells[0], end) for end in cells[1:]]
+    pathfinder._generation = 0xFFFFFFFF  # Force the wrap-around reset on the next search
+    second = [pathfinder.find_path(cells[0], end) for end in cells[1:]]
+    assert [len(path) for path in first] == [len(path) for path in second]
+
+
+def check_against_grid_astar(grid, cluster_size, pairs=None):
+    hierarchical = HierarchicalPathfinder(grid, cluster_size=cluster_size)
+    astar = GridPathfinder(grid)
+    cells = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y)]
+    for start in cells[:pairs]:
+        for end in cells:
+            if start == end:
+                continue
+            expected = astar.find_path(start, end)
+            path = hierarchical.find_path(start, end)
+            assert bool(path) == bool(expected), (start, end)
+            if path:
+                assert_valid_path(grid, start, end, path)
+                assert len(path) >= len(expected)
+    return hierarchical
+
+
+def test_hierarchical_single_column_of_clusters():
+    grid = TileGrid.from_layout([[1, 1], [1, 1], [0, 1], [1, 1]])
+    path = HierarchicalPathfinder(grid, cluster_size=3).find_path((0, 0), (0, 3))
+    assert_valid_path(grid, (0, 0), (0, 3), path)
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('width, height', [(3, 17), (5, 12), (17, 4), (2, 9)])
+def test_hierarchical_matches_grid_astar_on_narrow_grids(seed, width, height):
+    check_against_grid_astar(random_grid(width, height, seed), cluster_size=5)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_hierarchical_matches_grid_astar_on_random_grids(seed):
+    check_against_grid_astar(random_grid(23, 19, seed, wall_chance=0.25), cluster_size=6, pairs=4)
+
+
+def test_incremental_updates_match_a_fresh_build():
+    grid = random_grid(20, 14, seed=9, wall_chance=0.2)
+    hierarchical = HierarchicalPathfinder(grid, cluster_size=5)
+    for x, y in ((4, 4), (5, 9), (10, 0), (19, 13), (0, 5)):
+        hierarchical.set_walkable(x, y, not grid.is_walkable(x, y))
+    fresh = HierarchicalPathfinder(grid, cluster_size=5)
+    assert hierarchical.borders == fresh.borders
+    assert hierarchical.edges == fresh.edges
+    check_against_grid_astar(grid, cluster_size=5, pairs=4)
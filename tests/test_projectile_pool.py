@@ -0,0 +1,75 @@
+# tests/test_projectile_pool.py
+
+import pytest
+
+from game.grid_collision import GridCollision
+from game.projectile_pool import ProjectilePool
+from game.spatial_hash import SpatialHash
+from game.tile_grid import TileGrid
+
+CORRIDOR = [
+    [0, 0, 0, 0, 0, 0, 0],
+    [0, 1, 1, 1, 1, 1, 0],
+    [0, 0, 0, 0, 0, 0, 0],
+]
+
+
+class Target:
+    def __init__(self):
+        self.enabled = True
+        self.damage_taken = 0
+
+    def take_damage(self, amount):
+        self.damage_taken += amount
+
+
+@pytest.fixture
+def pool():
+    grid = TileGrid.from_layout(CORRIDOR)
+    return ProjectilePool(capacity=4, grid_collision=GridCollision(grid), enemy_index=SpatialHash(cell_size=4))
+
+
+def test_fast_projectile_stops_at_the_wall(pool):
+    pool.speed = 1000  # Crosses the whole corridor in one step
+    pool.fire((4, 1, 4), (1, 0, 0))
+    assert pool.step(1 / 30) == []
+    assert len(pool) == 0
+
+
+def test_swept_segment_hits_an_enemy_it_would_skip_over(pool):
+    target = Target()
+    pool.enemy_index.insert(target, 12, 4)
+    pool.speed = 300  # 10 units per tick: starts before the target and would end past it
+    pool.fire((6, 1, 4), (1, 0, 0))
+    assert pool.step(1 / 30) == [target]
+    assert target.damage_taken == pool.damage
+    assert len(pool) == 0
+
+
+def test_enemy_behind_a_wall_is_not_hit(pool):
+    target = Target()
+    pool.enemy_index.insert(target, 26, 4)  # Past the east wall
+    pool.speed = 1000
+    pool.fire((20, 1, 4), (1, 0, 0))
+    assert pool.step(1 / 30) == []
+    assert target.damage_taken == 0
+
+
+def test_capacity_and_swap_release(pool):
+    slots = [pool.fire((4, 1, 4), (1, 0, 0)) for _ in range(4)]
+    assert slots == [0, 1, 2, 3]
+    assert pool.fire((4, 1, 4), (1, 0, 0)) is None
+    pool.x[3] = 99
+    pool.release(0)
+    assert len(pool) == 3 and pool.x[0] == 99
+
+
+def test_range_expiry_and_interpolation(pool):
+    pool.grid_collision = None
+    pool.max_range = 5
+    pool.fire((4, 1, 4), (1, 0, 0))
+    pool.snapshot()
+    pool.step(0.1)  # 2 units
+    assert pool.previous_x[0] == 4 and pool.x[0] == pytest.approx(6)
+    pool.step(0.2)  # 6 units travelled in total, past max_range
+    assert len(pool) == 0
@@ -0,0 +1,50 @@
+# tests/test_spatial_hash.py
+
+import math
+import random
+
+from game.spatial_hash import SpatialHash
+
+
+def scattered(count=200, seed=0, extent=60):
+    rng = random.Random(seed)
+    return {f'enemy{i}': (rng.uniform(-extent, extent), rng.uniform(-extent, extent)) for i in range(count)}
+
+
+def test_queries_match_brute_force():
+    objects = scattered()
+    index = SpatialHash(cell_size=4)
+    for name, (x, z) in objects.items():
+        index.insert(name, x, z)
+
+    for x, z, radius in ((0, 0, 10), (25, -13, 3.5), (-60, 60, 20)):
+        expected = {name for name, (ox, oz) in objects.items() if math.hypot(ox - x, oz - z) <= radius}
+        assert set(index.query_radius(x, z, radius)) == expected
+        assert index.any_within(x, z, radius) == bool(expected)
+
+    nearest = index.nearest(3, 7, k=5)
+    expected = sorted(math.hypot(ox - 3, oz - 7) for ox, oz in objects.values())[:5]
+    assert [distance for distance, _ in nearest] == expected
+
+
+def test_move_rebuckets_and_remove_forgets():
+    index = SpatialHash(cell_size=4)
+    index.insert('a', 0, 0)
+    index.move('a', 1, 1)
+    assert index.cells['a'] == (0, 0)
+    index.move('a', 9, 0)
+    assert index.query_radius(0, 0, 2) == []
+    assert index.query_radius(9, 0, 0.5) == ['a']
+    index.remove('a')
+    assert len(index) == 0 and not index.buckets
+    index.remove('a')  # Removing twice is harmless
+
+
+def test_segment_hits_are_ordered_along_the_segment():
+    index = SpatialHash(cell_size=4)
+    index.insert('far', 10, 0.5)
+    index.insert('near', 2, -0.5)
+    index.insert('off', 5, 6)
+    hits = index.query_segment(0, 0, 12, 0, 1.0)
+    assert [obj for _, obj in hits] == ['near', 'far']
+    assert hits[0][0] < hits[1][0]
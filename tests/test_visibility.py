@@ -0,0 +1,65 @@
+# tests/test_visibility.py
+
+import random
+
+from conftest import random_grid
+from game.dungeon_mesh import chunk_bounds
+from game.visibility import VisibilityCuller, VisibilityMap
+
+
+def make_culler(grid, chunk_size=4):
+    shown = {}
+    calls = []
+
+    def set_visible(entity, visible):
+        shown[entity] = visible
+        calls.append(entity)
+
+    visibility = VisibilityMap(grid, radius=6, chunk_size=chunk_size)
+    visibility.update((0, 0))
+    culler = VisibilityCuller(visibility, set_visible)
+    for bounds in chunk_bounds(grid.width, grid.height, chunk_size):
+        culler.register_chunk(('chunk', bounds), bounds)
+    torches = [(x, y) for y in range(grid.height) for x in range(grid.width) if (x * 7 + y * 3) % 5 == 0]
+    for cell in torches:
+        culler.register_cell(('torch', cell), *cell)
+    return visibility, culler, shown, calls
+
+
+def expected_visibility(visibility, entity):
+    kind, where = entity
+    if kind == 'torch':
+        return visibility.is_visible(*where)
+    chunk_size = visibility.chunk_size
+    return (where[0] // chunk_size, where[1] // chunk_size) in visibility.visible_chunks
+
+
+def test_apply_matches_a_full_pass_while_walking():
+    grid = random_grid(40, 40, seed=4, wall_chance=0.2)
+    visibility, culler, shown, calls = make_culler(grid)
+    rng = random.Random(0)
+    walkable = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y)]
+    touched = 0
+    for _ in range(60):
+        if visibility.update(rng.choice(walkable)):
+            calls.clear()
+            culler.apply()
+            touched += len(calls)
+        for entity, visible in shown.items():
+            assert visible == expected_visibility(visibility, entity), entity
+    assert touched < 60 * len(shown)
+
+
+def test_unregistered_entities_are_left_alone():
+    grid = random_grid(20, 20, seed=1, wall_chance=0.0)
+    visibility, culler, shown, calls = make_culler(grid)
+    culler.unregister(('torch', (0, 0)))
+    culler.register_position('moved', *grid.cell_to_world(19, 19))
+    culler.register_position('moved', *grid.cell_to_world(1, 1))  # Re-registering replaces the old cell
+    visibility.update((19, 19))
+    calls.clear()
+    culler.apply()
+    assert ('torch', (0, 0)) not in calls
+    assert shown['moved'] is False
+    assert culler.by_cell['moved'] == (1, 1)
+    assert 'moved' not in culler.cell_entities.get((4, 4), {})